@@ -0,0 +1,177 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import numpy as np
+from utils import puntaje_y_no_usados, JUGADA_PLANTARSE, JUGADA_TIRAR
+from fuente_dados import FuenteDados
+from jugador import JugadorAleatorio, JugadorSiempreSePlanta
+from diezmil import JuegoDiezMil
+from qlearning import AmbienteDiezMil, AgenteQLearning, JugadorEntrenado, TablaQ
+from politica import guardar_politica_binaria
+
+POLITICA_DEFAULT: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'best_training_policy.json')
+BASE_DEFAULT: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks_base.json')
+
+
+# Cada benchmark recibe el archivo de la política y un directorio temporal
+# (que se borra al terminar de medirlo) y devuelve una función sin argumentos
+# (ya preparada, con semilla fija) y cuántas operaciones hace cada llamada.
+# Se mide en operaciones por segundo: más es mejor.
+
+def _bench_puntaje(politica_filename, directorio):
+    fuente = FuenteDados(0)
+    tiradas = [fuente.caras(1 + i % 6) for i in range(10000)]
+
+    def correr():
+        for tirada in tiradas:
+            puntaje_y_no_usados(tirada)
+    return correr, len(tiradas)
+
+
+def _bench_step(politica_filename, directorio):
+    fuente = FuenteDados(0)
+    ambiente = AmbienteDiezMil(dados=fuente)
+    acciones = [JUGADA_TIRAR if fuente.uniforme() < 0.7 else JUGADA_PLANTARSE for _ in range(10000)]
+
+    def correr():
+        for accion in acciones:
+            ambiente.step(accion)
+    return correr, len(acciones)
+
+
+def _bench_entrenar(politica_filename, directorio):
+    fuente = FuenteDados(0)
+    agente = AgenteQLearning(AmbienteDiezMil(dados=fuente), 0.1, 0.9, 0.1, dados=fuente)
+    episodios = 200
+
+    def correr():
+        agente.entrenar(episodios)
+    return correr, episodios
+
+
+def _bench_jugar(crear_jugador):
+    def preparar(politica_filename, directorio):
+        juego = JuegoDiezMil(crear_jugador(politica_filename), FuenteDados(0))
+        partidas = 100
+
+        def correr():
+            for _ in range(partidas):
+                juego.jugar()
+        return correr, partidas
+    return preparar
+
+
+def _bench_cargar(binaria: bool):
+    def preparar(politica_filename, directorio):
+        if binaria:
+            with open(politica_filename, 'r') as jsonfile:
+                tabla = TablaQ.desde_dict(json.load(jsonfile))
+            politica_filename = os.path.join(directorio, 'politica.bin')
+            guardar_politica_binaria(tabla.valores[:tabla.filas_usadas], politica_filename)
+        cargas = 20
+
+        def correr():
+            for _ in range(cargas):
+                JugadorEntrenado('qlearning', politica_filename)
+        return correr, cargas
+    return preparar
+
+
+BENCHMARKS: dict = {
+    'puntaje_y_no_usados': (_bench_puntaje, 'llamadas/s'),
+    'AmbienteDiezMil.step': (_bench_step, 'pasos/s'),
+    'AgenteQLearning.entrenar': (_bench_entrenar, 'episodios/s'),
+    'JuegoDiezMil.jugar[JugadorAleatorio]': (_bench_jugar(lambda f: JugadorAleatorio('random', FuenteDados(1))), 'partidas/s'),
+    'JuegoDiezMil.jugar[JugadorSiempreSePlanta]': (_bench_jugar(lambda f: JugadorSiempreSePlanta('plantón')), 'partidas/s'),
+    'JuegoDiezMil.jugar[JugadorEntrenado]': (_bench_jugar(lambda f: JugadorEntrenado('qlearning', f)), 'partidas/s'),
+    'JugadorEntrenado(json)': (_bench_cargar(binaria=False), 'cargas/s'),
+    'JugadorEntrenado(binario)': (_bench_cargar(binaria=True), 'cargas/s'),
+}
+
+
+def medir(preparar, politica_filename: str, repeticiones: int = 5, tiempo_min: float = 0.2) -> float:
+    '''
+    Mide un benchmark: repite la función hasta tardar al menos tiempo_min
+    segundos, repeticiones veces, y se queda con la mejor vuelta (la menos
+    afectada por el resto del sistema).
+
+    Returns:
+        float: Operaciones por segundo.
+    '''
+    with tempfile.TemporaryDirectory() as directorio:
+        correr, operaciones = preparar(politica_filename, directorio)
+        correr()  # Calentamiento: cachés, lru_cache, páginas del archivo.
+        mejor = 0.0
+        for _ in range(repeticiones):
+            llamadas = 0
+            inicio = time.perf_counter()
+            while True:
+                correr()
+                llamadas += 1
+                transcurrido = time.perf_counter() - inicio
+                if transcurrido >= tiempo_min:
+                    break
+            mejor = max(mejor, llamadas * operaciones / transcurrido)
+    return mejor
+
+
+def correr_benchmarks(nombres: list[str], politica_filename: str, repeticiones: int = 5) -> dict:
+    resultados = {}
+    for nombre in nombres:
+        preparar, unidad = BENCHMARKS[nombre]
+        resultados[nombre] = {'valor': medir(preparar, politica_filename, repeticiones), 'unidad': unidad}
+    return {
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'plataforma': platform.platform(),
+        'benchmarks': resultados,
+    }
+
+
+def informar(resultados: dict, base: dict | None = None) -> None:
+    '''
+    Imprime los resultados y, si se pasa una base, la diferencia porcentual
+    contra ella (positiva es más rápido).
+    '''
+    for nombre, resultado in resultados['benchmarks'].items():
+        linea = f"{nombre:45} {resultado['valor']:14.1f} {resultado['unidad']}"
+        if base is not None and nombre in base['benchmarks']:
+            anterior = base['benchmarks'][nombre]['valor']
+            linea += f"   {100 * (resultado['valor'] / anterior - 1):+7.1f}%"
+        print(linea)
+
+
+def main(guardar_filename, comparar_filename, politica_filename, repeticiones, nombres):
+    nombres = nombres or list(BENCHMARKS)
+    resultados = correr_benchmarks(nombres, politica_filename, repeticiones)
+
+    base = None
+    if comparar_filename is not None and os.path.exists(comparar_filename):
+        with open(comparar_filename, 'r') as jsonfile:
+            base = json.load(jsonfile)
+    informar(resultados, base)
+
+    if guardar_filename is not None:
+        with open(guardar_filename, 'w') as jsonfile:
+            json.dump(resultados, jsonfile, indent=4)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Medir el rendimiento de las partes críticas de 'Diez Mil' y compararlo contra una base guardada.")
+
+    # Agregar argumentos
+    parser.add_argument('-g', '--guardar', type=str, default=None, help='Archivo JSON donde guardar los resultados como nueva base')
+    parser.add_argument('-c', '--comparar', type=str, default=BASE_DEFAULT, help='Archivo JSON de una base contra la que comparar (default: benchmarks_base.json, si existe)')
+    parser.add_argument('-f', '--politica_filename', type=str, default=POLITICA_DEFAULT, help='Política JSON para los benchmarks de JugadorEntrenado')
+    parser.add_argument('-r', '--repeticiones', type=int, default=5, help='Repeticiones de cada benchmark (default: 5)')
+    parser.add_argument('-b', '--benchmark', type=str, action='append', choices=list(BENCHMARKS), help='Correr solo este benchmark (se puede repetir)')
+
+    # Parsear los argumentos
+    args = parser.parse_args()
+
+    # Llamar a la función principal con los argumentos proporcionados
+    main(args.guardar, args.comparar, args.politica_filename, args.repeticiones, args.benchmark)
@@ -0,0 +1,129 @@
+import numpy as np
+from evaluacion import evaluar_exacto
+from simulador import PoliticaTabla
+
+
+class CriterioConvergencia:
+    def __init__(self, ventana: int = 10000, ventanas_estables: int = 5, tolerancia_relativa: float = 0.01,
+                 tolerancia_q: float | None = None):
+        '''
+        Decide cuándo cortar un entrenamiento de AgenteQLearning.entrenar. Al
+        final de cada ventana de episodios compara la tabla con la de la
+        ventana anterior en los estados visitados (los que el agente actualizó
+        alguna vez, ver AgenteQLearning.visitados): el cambio relativo (el
+        cambio medio de los Q-values sobre su valor absoluto medio), el mayor
+        cambio de un Q-value y la cantidad de estados en los que cambió la
+        acción greedy. Se considera estable una ventana con cambio relativo de a
+        lo sumo tolerancia_relativa (y, si se pasa tolerancia_q, en la que
+        ningún Q-value se movió más que eso). Con ventanas_estables ventanas
+        estables seguidas, el entrenamiento termina.
+
+        Con alpha constante los Q-values no dejan de moverse: cada ventana
+        cambian en proporción a alpha aunque la política ya no mejore (con
+        alpha 0.05, alrededor de un 5%), y la acción greedy sigue cambiando por
+        ruido en los estados en los que plantarse y tirar valen casi lo mismo.
+        El cambio relativo solo baja de la tolerancia cuando la tasa de
+        aprendizaje baja (omega_visitas, o un alpha chico); si no, el
+        entrenamiento corre todos sus episodios.
+
+        Args:
+            ventana (int, optional): Episodios de cada ventana. Defaults to 10000.
+            ventanas_estables (int, optional): Ventanas estables seguidas para cortar. Defaults to 5.
+            tolerancia_relativa (float, optional): Cambio relativo de los Q-values tolerado en una
+                ventana estable. Defaults to 0.01.
+            tolerancia_q (float, optional): Mayor cambio de Q-value tolerado por ventana. Si es None,
+                solo se mira el cambio relativo.
+        '''
+
+        self.ventana = ventana
+        self.ventanas_estables = ventanas_estables
+        self.tolerancia_relativa = tolerancia_relativa
+        self.tolerancia_q = tolerancia_q
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.anterior: np.ndarray | None = None
+        self.estables = 0
+        self.episodio_convergencia: int | None = None
+        # (episodio, cambio relativo, mayor cambio de Q-value, cambios de acción greedy) de cada ventana.
+        self.historial: list[tuple[int, float, float, int]] = []
+
+    def revisar(self, tabla, episodio: int, visitados: np.ndarray | None = None) -> bool:
+        '''
+        Compara la tabla con la de la ventana anterior y devuelve True si ya convergió.
+
+        Args:
+            tabla (TablaQ | TablaQTotal): Tabla del agente.
+            episodio (int): Episodios entrenados hasta ahora.
+            visitados (np.ndarray, optional): Estados de la tabla que se actualizaron alguna
+                vez, con forma (filas_usadas, 7) (ver AgenteQLearning.visitados). Si es None,
+                se toman como visitados los que tienen algún Q-value distinto de valor_inicial.
+        '''
+        actual = np.array(tabla.valores[:tabla.filas_usadas])
+        if self.anterior is None:
+            self.anterior = actual
+            return False
+
+        # Las filas nuevas se comparan contra una tabla sin visitar.
+        anterior = np.full_like(actual, tabla.valor_inicial)
+        anterior[:len(self.anterior)] = self.anterior[:len(actual)]
+        self.anterior = actual
+        if visitados is None:
+            visitados = (actual != tabla.valor_inicial).any(axis=2)
+        if not visitados.any():
+            self.historial.append((episodio, 0.0, 0.0, 0))
+            self.estables = 0
+            return False
+
+        cambio = np.abs(actual - anterior)[visitados]
+        escala = float(np.abs(actual[visitados]).mean())
+        cambio_relativo = float(cambio.mean()) / escala if escala > 0 else 0.0
+        cambio_q = float(cambio.max())
+        # Igual que JugadorEntrenado: ante un empate se planta.
+        cambios = int(np.count_nonzero(((actual[..., 1] > actual[..., 0]) != (anterior[..., 1] > anterior[..., 0])) & visitados))
+        self.historial.append((episodio, cambio_relativo, cambio_q, cambios))
+
+        estable = cambio_relativo <= self.tolerancia_relativa and (self.tolerancia_q is None or cambio_q <= self.tolerancia_q)
+        self.estables = self.estables + 1 if estable else 0
+        if self.estables >= self.ventanas_estables:
+            self.episodio_convergencia = episodio
+            return True
+        return False
+
+
+class CriterioTurnos:
+    def __init__(self, objetivo: float, ventana: int = 10000, cortar: bool = True):
+        '''
+        Criterio para AgenteQLearning.entrenar (en lugar de un
+        CriterioConvergencia) que mide cuántos episodios hacen falta para que
+        la política greedy llegue a un promedio de turnos. Al final de cada
+        ventana de episodios calcula los turnos esperados exactos de la
+        política (evaluar_exacto, unos milisegundos) y el primer episodio en el
+        que no pasan de objetivo queda en episodio_convergencia.
+
+        Args:
+            objetivo (float): Turnos esperados a los que se quiere llegar.
+            ventana (int, optional): Episodios entre dos evaluaciones. Defaults to 10000.
+            cortar (bool, optional): Terminar el entrenamiento al llegar. Defaults to True.
+        '''
+
+        self.objetivo = objetivo
+        self.ventana = ventana
+        self.cortar = cortar
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.episodio_convergencia: int | None = None
+        # (episodio, turnos esperados) de cada ventana.
+        self.historial: list[tuple[int, float]] = []
+
+    def revisar(self, tabla, episodio: int, visitados: np.ndarray | None = None) -> bool:
+        '''
+        Evalúa la política greedy de la tabla y devuelve True si llegó al objetivo y hay que cortar.
+        Los visitados no se usan: la política se evalúa en todos los estados.
+        '''
+        turnos, _ = evaluar_exacto(PoliticaTabla.desde_tabla_q(tabla))
+        self.historial.append((episodio, turnos))
+        if turnos <= self.objetivo and self.episodio_convergencia is None:
+            self.episodio_convergencia = episodio
+        return self.cortar and self.episodio_convergencia is not None
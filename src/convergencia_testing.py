@@ -0,0 +1,119 @@
+import os
+import unittest
+import numpy as np
+from qlearning import JugadorEntrenado, TablaQ
+from convergencia import CriterioConvergencia, CriterioTurnos
+
+POLITICA: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'best_training_policy.json')
+
+
+def _revisar_serie(criterio: CriterioConvergencia, tablas: list[np.ndarray]) -> int | None:
+    '''
+    Revisa una tabla por ventana y devuelve el episodio en el que cortó (None si no cortó).
+    '''
+    for k, valores in enumerate(tablas, start=1):
+        if criterio.revisar(TablaQ(valores=valores), k * criterio.ventana):
+            return k * criterio.ventana
+    return None
+
+
+class TestCriterioConvergencia(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.base = rng.uniform(1.0, 3.0, size=(30, 7, 2))
+        self.ruido = rng.normal(size=(40, 30, 7, 2))
+
+    def test_ruido_constante_no_converge(self):
+        # Como con alpha constante: cada ventana los Q-values se mueven un 5% al azar y
+        # la acción greedy cambia en unos pocos estados, sin ir a ningún lado.
+        tablas = [self.base * (1 + 0.05 * r) for r in self.ruido]
+        criterio = CriterioConvergencia(1000, ventanas_estables=5)
+        self.assertIsNone(_revisar_serie(criterio, tablas))
+        self.assertEqual(len(criterio.historial), len(tablas) - 1)
+        self.assertTrue(all(cambio > 0.01 for _, cambio, _, _ in criterio.historial))
+        self.assertTrue(any(cambios > 0 for _, _, _, cambios in criterio.historial))
+
+    def test_cambio_que_decae_converge(self):
+        # Con una tasa de aprendizaje que baja, el cambio entre ventanas se achica como 1/k.
+        tablas = [self.base * (1 + 0.2 / k * r) for k, r in enumerate(self.ruido, start=1)]
+        criterio = CriterioConvergencia(1000, ventanas_estables=3)
+        episodio = _revisar_serie(criterio, tablas)
+        cambios = [cambio for _, cambio, _, _ in criterio.historial]
+        primera_estable = next(i for i in range(len(cambios)) if all(c <= 0.01 for c in cambios[i:i + 3]))
+        # La primera revisión solo guarda la tabla; historial[i] es la ventana i + 2.
+        self.assertEqual(episodio, (primera_estable + 2 + 2) * 1000)
+        self.assertEqual(criterio.episodio_convergencia, episodio)
+
+    def test_una_ventana_inestable_reinicia_la_cuenta(self):
+        # Dos ventanas estables, un salto y otras dos: nunca llega a tres seguidas.
+        tablas = [self.base] * 3 + [self.base * 1.5] * 3
+        criterio = CriterioConvergencia(10, ventanas_estables=3)
+        self.assertIsNone(_revisar_serie(criterio, tablas))
+        self.assertEqual(criterio.estables, 2)
+        self.assertAlmostEqual(criterio.historial[2][1], 0.5 / 1.5)
+
+    def test_filas_nuevas_contra_tabla_sin_visitar(self):
+        criterio = CriterioConvergencia(10, ventanas_estables=1, tolerancia_q=0.5)
+        criterio.revisar(TablaQ(valores=self.base[:10].copy()), 10)
+        self.assertFalse(criterio.revisar(TablaQ(valores=self.base.copy()), 20))
+        _, _, cambio_q, _ = criterio.historial[-1]
+        self.assertEqual(cambio_q, self.base[10:].max())
+        self.assertTrue(criterio.revisar(TablaQ(valores=self.base.copy()), 30))
+
+    def test_visitados_con_valor_inicial(self):
+        # Con q_inicial distinto de 0 los estados sin visitar no cuentan, ni en el
+        # cambio ni en la escala.
+        inicial = np.full((30, 7, 2), 5.0)
+        anterior, actual = inicial.copy(), inicial.copy()
+        anterior[2, 3] = [1.0, 2.0]
+        actual[2, 3] = [1.0, 2.2]
+        visitados = np.zeros((30, 7), dtype=bool)
+        visitados[2, 3] = True
+        for argumento in [None, visitados]:
+            criterio = CriterioConvergencia(10, ventanas_estables=1)
+            criterio.revisar(TablaQ(valores=anterior, valor_inicial=5.0), 10, argumento)
+            criterio.revisar(TablaQ(valores=actual, valor_inicial=5.0), 20, argumento)
+            _, cambio_relativo, cambio_q, _ = criterio.historial[-1]
+            self.assertAlmostEqual(cambio_relativo, 0.1 / 1.6)
+            self.assertAlmostEqual(cambio_q, 0.2)
+
+    def test_reiniciar(self):
+        criterio = CriterioConvergencia(10, ventanas_estables=1)
+        self.assertFalse(criterio.revisar(TablaQ(valores=self.base), 10))
+        self.assertTrue(criterio.revisar(TablaQ(valores=self.base), 20))
+        criterio.reiniciar()
+        self.assertIsNone(criterio.episodio_convergencia)
+        self.assertFalse(criterio.revisar(TablaQ(valores=self.base), 10))
+
+
+
+class TestCriterioTurnos(unittest.TestCase):
+    def setUp(self):
+        self.entrenada = TablaQ(valores=JugadorEntrenado('entrenada', POLITICA).a_arreglo().copy())
+        # Sin entrenar empatan en todos lados y la política greedy se planta siempre.
+        self.sin_entrenar = TablaQ(20)
+
+    def test_corta_al_llegar_al_objetivo(self):
+        criterio = CriterioTurnos(23.0, ventana=10)
+        self.assertFalse(criterio.revisar(self.sin_entrenar, 10))
+        self.assertIsNone(criterio.episodio_convergencia)
+        self.assertTrue(criterio.revisar(self.entrenada, 20))
+        self.assertEqual(criterio.episodio_convergencia, 20)
+        self.assertEqual([episodio for episodio, _ in criterio.historial], [10, 20])
+        self.assertGreater(criterio.historial[0][1], 23.0)
+        self.assertLessEqual(criterio.historial[1][1], 23.0)
+
+    def test_sin_cortar_guarda_el_primer_episodio(self):
+        criterio = CriterioTurnos(23.0, ventana=10, cortar=False)
+        self.assertFalse(criterio.revisar(self.entrenada, 10))
+        self.assertFalse(criterio.revisar(self.sin_entrenar, 20))
+        self.assertFalse(criterio.revisar(self.entrenada, 30))
+        self.assertEqual(criterio.episodio_convergencia, 10)
+        self.assertEqual(len(criterio.historial), 3)
+        criterio.reiniciar()
+        self.assertIsNone(criterio.episodio_convergencia)
+        self.assertEqual(criterio.historial, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
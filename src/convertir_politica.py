@@ -0,0 +1,29 @@
+import json
+import argparse
+from qlearning import TablaQ, TablaQTotal
+from politica import guardar_politica_binaria, EJES_PARTIDA
+
+def main(politica_filename, salida_filename):
+    with open(politica_filename, 'r') as jsonfile:
+        politica = json.load(jsonfile)
+    # Las políticas con el puntaje total en el estado (TablaQTotal.a_dict) guardan paso_total.
+    if 'paso_total' in politica:
+        tabla = TablaQTotal.desde_dict(politica)
+        guardar_politica_binaria(tabla.a_arreglo(), salida_filename, EJES_PARTIDA, paso_total=tabla.paso_total)
+    else:
+        tabla = TablaQ.desde_dict(politica)
+        guardar_politica_binaria(tabla.valores[:tabla.filas_usadas], salida_filename)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Convertir una política guardada en JSON al formato binario que JugadorEntrenado mapea en memoria.")
+
+    # Agregar argumentos
+    parser.add_argument('politica_filename', type=str, help='Archivo JSON con la política entrenada (con o sin el puntaje total en el estado)')
+    parser.add_argument('salida_filename', type=str, help='Archivo binario a generar')
+
+    # Parsear los argumentos
+    args = parser.parse_args()
+
+    # Llamar a la función principal con los argumentos proporcionados
+    main(args.politica_filename, args.salida_filename)
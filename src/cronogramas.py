@@ -0,0 +1,44 @@
+import math
+
+TIPOS_DECAIMIENTO: list[str] = ['lineal', 'exponencial']
+
+
+class CronogramaEpsilon:
+    def __init__(self, tipo: str, inicial: float, final: float, episodios: int):
+        '''
+        Epsilon que baja de inicial a final a lo largo de episodios episodios
+        y después queda fijo en final. AgenteQLearning lo consulta al terminar
+        cada episodio.
+
+        Args:
+            tipo (str): 'lineal' (baja lo mismo en cada episodio) o 'exponencial'
+                (se multiplica por lo mismo en cada episodio; inicial y final tienen que ser mayores a 0).
+            inicial (float): Epsilon del primer episodio (a lo sumo 0.5).
+            final (float): Epsilon desde el episodio episodios en adelante.
+            episodios (int): Episodios que dura el decaimiento.
+        '''
+
+        assert tipo in TIPOS_DECAIMIENTO, f'tipo tiene que ser uno de {TIPOS_DECAIMIENTO}'
+        # En AgenteQLearning explorar es elegir la acción que no es la greedy:
+        # con epsilon 0.5 ya juega al azar, y con más elige peor a propósito
+        # (con 1, plantarse siempre con 0 puntos no termina nunca el episodio).
+        assert 0 <= final <= 0.5 and 0 <= inicial <= 0.5, 'epsilon tiene que estar entre 0 y 0.5'
+        assert tipo == 'lineal' or (inicial > 0 and final > 0), \
+            'el decaimiento exponencial necesita epsilons inicial y final mayores a 0'
+        self.tipo = tipo
+        self.inicial = inicial
+        self.final = final
+        self.episodios = episodios
+
+    def __call__(self, episodio: int) -> float:
+        avance = min(episodio / self.episodios, 1.0) if self.episodios > 0 else 1.0
+        if self.tipo == 'lineal':
+            return self.inicial + (self.final - self.inicial) * avance
+        return self.inicial * math.pow(self.final / self.inicial, avance)
+
+    def a_dict(self) -> dict:
+        return {'tipo': self.tipo, 'inicial': self.inicial, 'final': self.final, 'episodios': self.episodios}
+
+    @staticmethod
+    def desde_dict(datos: dict) -> 'CronogramaEpsilon':
+        return CronogramaEpsilon(datos['tipo'], datos['inicial'], datos['final'], datos['episodios'])
@@ -4,14 +4,36 @@ from tqdm import tqdm
 from random import randint
 from utils import puntaje_y_no_usados, separar, JUGADA_PLANTARSE, JUGADA_TIRAR
 from jugador import Jugador
+from fuente_dados import FuenteDados
+from eventos import (ImpresorEventos, EVENTO_TIRADA, EVENTO_PLANTARSE, EVENTO_TIRAR,
+                     EVENTO_PERDIO, EVENTO_FIN_TURNO, EVENTO_FIN_PARTIDA)
 from qlearning import AmbienteDiezMil, AgenteQLearning, JugadorEntrenado
 
 TRAIN = False
 RUN_AVG_TURN_TEST = True
 
+def _tirar_con_random(n: int) -> list[int]:
+    return [randint(1, 6) for _ in range(n)]
+
 class JuegoDiezMil:
-    def __init__(self, jugador: Jugador):
+    def __init__(self, jugador: Jugador, dados: FuenteDados | None = None):
         self.jugador: Jugador = jugador
+        # Sin fuente de dados se usa el módulo random.
+        self._tirar = dados.caras if dados is not None else _tirar_con_random
+        self.suscriptores: list = []
+
+    def suscribir(self, suscriptor) -> None:
+        '''
+        Agrega un suscriptor que recibe los eventos de las partidas (ver eventos.py).
+        '''
+        self.suscriptores.append(suscriptor)
+
+    def desuscribir(self, suscriptor) -> None:
+        self.suscriptores.remove(suscriptor)
+
+    def _emitir(self, evento: int, turno: int, dados: list[int], puntaje_turno: int, puntaje_total: int) -> None:
+        for suscriptor in self.suscriptores:
+            suscriptor(evento, turno, dados, puntaje_turno, puntaje_total)
 
     def jugar(self, verbose: bool = False, tope_turnos: int = 1000) -> tuple[int, int]:
         ''' 
@@ -19,13 +41,22 @@ class JuegoDiezMil:
         llegar a tope_turnos turnos. Devuelve la cantidad de turnos que
         necesitó y el puntaje final.
         '''
+        if verbose:
+            impresor = ImpresorEventos()
+            self.suscribir(impresor)
+            try:
+                return self.jugar(tope_turnos=tope_turnos)
+            finally:
+                self.desuscribir(impresor)
+
+        # Sin suscriptores no se arma ningún evento.
+        emitir = self._emitir if self.suscriptores else None
         turno: int = 0
         puntaje_total: int = 0
         while puntaje_total < 10000 and turno < tope_turnos:
             # Nuevo turno
             turno += 1
             puntaje_turno: int = 0
-            msg: str = 'turno ' + str(turno) + ':'
 
             # Un turno siempre empieza tirando los 6 dados.
             jugada: int = JUGADA_TIRAR
@@ -34,37 +65,48 @@ class JuegoDiezMil:
 
             while not fin_de_turno:
                 # Tira los dados que correspondan y calcula su puntaje.
-                dados: list[int] = [randint(1, 6) for _ in range(len(dados_a_tirar))]
-                (puntaje_tirada, _) = puntaje_y_no_usados(dados)
-                msg += ' ' + ''.join(map(str, dados)) + ' '
+                dados: list[int] = self._tirar(len(dados_a_tirar))
+                (puntaje_tirada, no_usados) = puntaje_y_no_usados(dados)
+                if emitir:
+                    emitir(EVENTO_TIRADA, turno, dados, puntaje_turno, puntaje_total)
 
                 if puntaje_tirada == 0:
                     # Mala suerte, no suma nada. Pierde el turno.
                     fin_de_turno = True
                     puntaje_turno = 0
+                    if emitir:
+                        emitir(EVENTO_PERDIO, turno, dados, puntaje_turno, puntaje_total)
 
                 else:
-                    # Bien, suma puntos. Preguntamos al jugador qué quiere hacer.
-                    jugada, dados_a_tirar = self.jugador.jugar(puntaje_turno, dados)
+                    # Bien, suma puntos. Preguntamos al jugador qué quiere hacer,
+                    # pasándole el puntaje ya calculado.
+                    jugada, dados_a_tirar = self.jugador.jugar_con_puntaje(puntaje_total, puntaje_turno, dados,
+                                                                          puntaje_tirada, no_usados)
 
                     if jugada == JUGADA_PLANTARSE:
-                        msg += 'P'
                         fin_de_turno = True
                         puntaje_turno += puntaje_tirada
+                        if emitir:
+                            emitir(EVENTO_PLANTARSE, turno, dados, puntaje_turno, puntaje_total)
 
                     elif jugada == JUGADA_TIRAR:
-                        dados_a_separar = separar(dados, dados_a_tirar)
-                        assert len(dados_a_separar) + len(dados_a_tirar) == len(dados)
-                        puntaje_tirada, dados_no_usados = puntaje_y_no_usados(dados_a_separar)
-                        assert puntaje_tirada > 0 and len(dados_no_usados) == 0
+                        # Si separa todos los dados que suman, ya se sabe que suman
+                        # puntaje_tirada sin que sobre ninguno (ver utils_testing).
+                        if dados_a_tirar is not no_usados and dados_a_tirar != no_usados:
+                            dados_a_separar = separar(dados, dados_a_tirar)
+                            assert len(dados_a_separar) + len(dados_a_tirar) == len(dados)
+                            puntaje_tirada, dados_no_usados = puntaje_y_no_usados(dados_a_separar)
+                            assert puntaje_tirada > 0 and len(dados_no_usados) == 0
                         puntaje_turno += puntaje_tirada
                         # Cuando usó todos los dados, vuelve a tirar todo.
                         if len(dados_a_tirar) == 0:
                             dados_a_tirar = [1, 2, 3, 4, 5, 6]
-                        msg += 'T(' + ''.join(map(str, dados_a_tirar)) + ') '
+                        if emitir:
+                            emitir(EVENTO_TIRAR, turno, dados_a_tirar, puntaje_turno, puntaje_total)
 
             puntaje_total += puntaje_turno
-            msg += ' --> ' + str(puntaje_turno) + ' puntos. TOTAL: ' + str(puntaje_total)
-            if verbose:
-                print(msg)
+            if emitir:
+                emitir(EVENTO_FIN_TURNO, turno, [], puntaje_turno, puntaje_total)
+        if emitir:
+            emitir(EVENTO_FIN_PARTIDA, turno, [], 0, puntaje_total)
         return (turno, puntaje_total)
@@ -1,21 +1,47 @@
+import os
+import math
 import argparse
-from qlearning import AmbienteDiezMil, AgenteQLearning
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from tqdm import tqdm
+from diezmil import JuegoDiezMil
+from fuente_dados import FuenteDados
+from qlearning import AmbienteDiezMil, AmbienteDiezMilVectorizado, AgenteQLearning, JugadorEntrenado, TablaQ
+from simulador import SimuladorDiezMil, PoliticaTabla
+from evaluacion import evaluar_turnos, evaluar_exacto, comparar_turnos
+from instrumentacion import InstrumentacionEntrenamiento
+from convergencia import CriterioConvergencia, CriterioTurnos
+from cronogramas import CronogramaEpsilon, TIPOS_DECAIMIENTO
+from trayectorias import entrenar_offline
 
 GRID_SEARCH = False
 RUN_AVG_TURN_TEST = False
 
-def get_promedio_turnos(jugador, num_partidas, verbose=False) -> float:
+def get_promedio_turnos(jugador, num_partidas, verbose=False, ancho_ic=None, procesos=1, semilla=None) -> float:
     '''
     Juega num_partidas partidas con el jugador dado y devuelve el promedio de turnos necesarios.
+    Si se pasa ancho_ic, procesos o semilla, las partidas se juegan con
+    evaluar_turnos: en lotes con semillas reproducibles, repartidos entre
+    procesos, y cortando antes si el intervalo de confianza ya es más angosto que ancho_ic.
 
     Args:
         jugador: Jugador a utilizar.
-        num_partidas: Cantidad de partidas a jugar.
+        num_partidas: Cantidad de partidas a jugar (máxima, si se pasa ancho_ic).
         verbose: Si se desea imprimir información adicional.
+        ancho_ic: Ancho buscado del intervalo de confianza del 95%, en turnos.
+        procesos: Cantidad de procesos a usar.
+        semilla: Semilla de las partidas.
 
     Returns:
         float: Promedio de turnos necesarios para terminar una partida.
     '''
+    if ancho_ic is not None or procesos > 1 or semilla is not None:
+        acumulador = evaluar_turnos(jugador, num_partidas, ancho_ic, procesos=procesos, semilla=semilla)
+        if verbose:
+            inferior, superior = acumulador.intervalo_confianza()
+            print(f'{acumulador.n} partidas: {acumulador.media:.4f} turnos, IC 95% [{inferior:.4f}, {superior:.4f}]')
+        return acumulador.media
+
     avg = 0
     if verbose:
         for _ in tqdm(range(num_partidas)):
@@ -29,74 +55,293 @@ def get_promedio_turnos(jugador, num_partidas, verbose=False) -> float:
             avg += cantidad_turnos
     return avg / num_partidas
 
-def grid_search_hiperparametros(lr_range, gamma_range, eps_range, episodios, cant_partidas_promedio, verbose=True):
+def get_promedio_turnos_simulado(politica: PoliticaTabla, num_partidas, semilla=None) -> float:
+    '''
+    Igual que get_promedio_turnos, pero juega las num_partidas partidas en lote
+    con SimuladorDiezMil. Sirve para políticas dadas por tabla.
+
+    Args:
+        politica: Política a utilizar.
+        num_partidas: Cantidad de partidas a jugar.
+        semilla: Semilla del simulador.
+
+    Returns:
+        float: Promedio de turnos necesarios para terminar una partida.
+    '''
+    turnos, _ = SimuladorDiezMil(politica, semilla).jugar(num_partidas)
+    return float(turnos.mean())
+
+def comparar_promedio_turnos(jugadores, num_partidas, verbose=False, procesos=1, semilla=None) -> dict:
+    '''
+    Modo comparación de get_promedio_turnos: juega num_partidas partidas con
+    cada jugador, todos sobre los mismos dados (evaluacion.comparar_turnos), y
+    compara cada uno contra el mejor partida a partida.
+
+    Args:
+        jugadores: Diccionario nombre -> jugador (que se pueda escribir como tabla).
+        num_partidas: Cantidad de partidas de cada jugador.
+        verbose: Si se desea imprimir la comparación.
+        procesos: Cantidad de procesos a usar.
+        semilla: Semilla de las partidas.
+
+    Returns:
+        dict: El resultado de comparar_turnos.
+    '''
+    resultado = comparar_turnos(jugadores, num_partidas, semilla, procesos=procesos)
+    if verbose:
+        for linea in _lineas_comparacion(resultado):
+            print(linea)
+    return resultado
+
+def _lineas_comparacion(resultado) -> list[str]:
+    '''
+    Una línea por jugador, de mejor a peor: su promedio y la diferencia con el
+    mejor, con sus errores estándar.
+    '''
+    nombres, medias = resultado['nombres'], resultado['medias']
+    mejor = int(np.argmin(medias))
+    lineas = []
+    for i in np.argsort(medias):
+        diferencia = resultado['diferencias'][i, mejor]
+        error = resultado['errores_diferencias'][i, mejor]
+        lineas.append(f"{nombres[i]}: {medias[i]:.4f} ± {resultado['errores'][i]:.4f} turnos | "
+                      f"diferencia con el mejor: {diferencia:+.4f} ± {error:.4f}")
+    return lineas
+
+def _entrenar_y_evaluar(lr, gamma, eps, episodios, cant_partidas_promedio, semilla, ancho_ic=None, exacto=False,
+                        ventana_convergencia=None, evaluar=True):
+    '''
+    Entrena un agente con los hiperparámetros dados y evalúa su política.
+    Corre en un proceso aparte, con su propia semilla.
+
+    Returns:
+        tuple: Los hiperparámetros, el promedio de turnos (nan si evaluar es False),
+            los Q-values aprendidos y el episodio en el que convergió (None si no cortó antes).
+    '''
+    dados = FuenteDados(semilla)
+    agente = AgenteQLearning(AmbienteDiezMil(dados=dados), lr, gamma, eps, dados=dados)
+    convergencia = CriterioConvergencia(ventana_convergencia) if ventana_convergencia else None
+    agente.entrenar(episodios, convergencia=convergencia)
+    politica = PoliticaTabla.desde_tabla_q(agente.qlearning_tabla)
+    if not evaluar:
+        turnos_promedio = math.nan
+    elif exacto:
+        turnos_promedio, _ = evaluar_exacto(politica)
+    else:
+        turnos_promedio = evaluar_turnos(politica, cant_partidas_promedio, ancho_ic, semilla=semilla).media
+    tabla = agente.qlearning_tabla
+    return lr, gamma, eps, turnos_promedio, tabla.valores[:tabla.filas_usadas], agente.episodio_convergencia
+
+def grid_search_hiperparametros(lr_range, gamma_range, eps_range, episodios, cant_partidas_promedio, verbose=True,
+                                procesos=None, semilla=None, archivo_resultados=None, ancho_ic=None, exacto=False,
+                                ventana_convergencia=None, comparar=False):
     '''
     Realiza una búsqueda de hiperparámetros para el agente Q-Learning.
+    Cada configuración se entrena y evalúa en un proceso aparte, con su propia
+    semilla, y las políticas vuelven en memoria. Los resultados se informan a
+    medida que terminan las configuraciones, no en el orden de la grilla.
 
     Args: 
         lr_range: Lista con los valores de learning rate a probar.
         gamma_range: Lista con los valores de gamma a probar.
         eps_range: Lista con los valores de epsilon a probar.
         episodios: Cantidad de episodios de entrenamiento.
-        cant_partidas_promedio: Cantidad de partidas a jugar para obtener el promedio de turnos.
+        cant_partidas_promedio: Cantidad de partidas a jugar para obtener el promedio de turnos
+            (máxima, si se pasa ancho_ic).
         verbose: Si se desea imprimir información adicional.
+        procesos: Cantidad de procesos a usar (por defecto, uno por núcleo).
+        semilla: Semilla de la que se derivan las semillas de cada configuración.
+        archivo_resultados: Archivo donde se van escribiendo los resultados (por ejemplo, resultados.txt).
+        ancho_ic: Si se pasa, cada evaluación corta cuando el intervalo de confianza del 95% es más angosto que esto.
+        exacto: Si es True, el promedio de turnos se calcula sin simular, con evaluar_exacto.
+        ventana_convergencia: Si se pasa, cada entrenamiento corta cuando, en 5 ventanas seguidas
+            de esta cantidad de episodios, los Q-values cambian a lo sumo un 1% en promedio
+            (ver CriterioConvergencia).
+        comparar: Si es True, las políticas se evalúan recién al final, todas sobre las
+            mismas cant_partidas_promedio partidas (comparar_turnos), y se informa la
+            diferencia de cada una con la mejor y su error estándar.
 
     Returns:
         float: Mejor learning rate.
         float: Mejor gamma.
         float: Mejor epsilon.
+        (Los tres son None si ninguna configuración dio un promedio válido.)
     '''
-    ambiente = AmbienteDiezMil()
+    configuraciones = [(lr, gamma, eps) for lr in lr_range for gamma in gamma_range for eps in eps_range]
+    assert configuraciones, 'la grilla de hiperparámetros está vacía'
+    semillas = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(semilla).spawn(len(configuraciones))]
     mejor_promedio = math.inf
+    # Si todos los promedios son nan (o la evaluación no corre) no hay mejor configuración.
+    best_lr = best_gamma = best_eps = None
+    salida = open(archivo_resultados, 'a') if archivo_resultados is not None else None
+
+    def informar(msg):
+        if verbose:
+            print(msg)
+        if salida is not None:
+            salida.write(msg + '\n')
+            salida.flush()
 
-    for lr in lr_range:
-        for gamma in gamma_range:
-            for eps in eps_range:
-                if verbose:
-                    print(f'Probando con: LR = {lr:.2f} | Gamma: {gamma:.2f} | Epsilon: {eps:.2f}')
-                agente = AgenteQLearning(ambiente, lr, gamma, eps)
-                agente.entrenar(episodios)
-                agente.guardar_politica('test_policy.json')
-                jugador = JugadorEntrenado('TestAgent', 'test_policy.json')
-                turnos_promedio = get_promedio_turnos(jugador, cant_partidas_promedio)
-                if turnos_promedio < mejor_promedio:
+    try:
+        with ProcessPoolExecutor(max_workers=procesos) as executor:
+            futuros = [
+                executor.submit(_entrenar_y_evaluar, lr, gamma, eps, episodios, cant_partidas_promedio, s, ancho_ic, exacto,
+                                ventana_convergencia, not comparar)
+                for (lr, gamma, eps), s in zip(configuraciones, semillas)
+            ]
+            entrenadas = {}
+            for futuro in as_completed(futuros):
+                lr, gamma, eps, turnos_promedio, valores, episodio_convergencia = futuro.result()
+                if episodio_convergencia is not None:
+                    informar(f'Convergió en el episodio {episodio_convergencia} [LR: {lr:.2f} | Gamma: {gamma:.2f} | Epsilon: {eps:.2f}]')
+                if comparar:
+                    entrenadas[(lr, gamma, eps)] = valores
+                elif turnos_promedio < mejor_promedio:
                     mejor_promedio = turnos_promedio
+                    agente = AgenteQLearning(None, lr, gamma, eps)
+                    agente.qlearning_tabla = TablaQ(valores=valores)
                     agente.guardar_politica('test_mejor.json')
                     best_lr, best_gamma, best_eps = lr, gamma, eps
-                    if verbose:
-                        print(f'Nuevo mejor promedio obtenido: {turnos_promedio}. LR: {lr:.2f} | Gamma: {gamma:.2f} | Epsilon: {eps:.2f}')
+                    informar(f'Nuevo mejor promedio obtenido: {turnos_promedio}. LR: {lr:.2f} | Gamma: {gamma:.2f} | Epsilon: {eps:.2f}')
                 else:
-                    if verbose:
-                        print(f'Promedio obtenido: {turnos_promedio} [LR: {lr:.2f} | Gamma: {gamma:.2f} | Epsilon: {eps:.2f}]')
+                    informar(f'Promedio obtenido: {turnos_promedio} [LR: {lr:.2f} | Gamma: {gamma:.2f} | Epsilon: {eps:.2f}]')
 
-    # Si el archivo se corre por fuera de la carpeta y el archivo se genera afuera, no borrarlo pero no tirar error.
-    try:
-        os.remove('test_policy.json')
-    except Exception:
-        pass
+        if comparar:
+            politicas = {f'LR: {lr:.2f} | Gamma: {gamma:.2f} | Epsilon: {eps:.2f}': PoliticaTabla.desde_tabla_q(TablaQ(valores=valores))
+                         for (lr, gamma, eps), valores in entrenadas.items()}
+            resultado = comparar_turnos(politicas, cant_partidas_promedio, semilla, procesos=procesos or os.cpu_count())
+            for linea in _lineas_comparacion(resultado):
+                informar(linea)
+            mejor = int(np.argmin(resultado['medias']))
+            (best_lr, best_gamma, best_eps), valores = list(entrenadas.items())[mejor]
+            mejor_promedio = resultado['medias'][mejor]
+            agente = AgenteQLearning(None, best_lr, best_gamma, best_eps)
+            agente.qlearning_tabla = TablaQ(valores=valores)
+            agente.guardar_politica('test_mejor.json')
 
-    if verbose:
-        print(f'Mejores hiperparametros obtenidos: LR: {best_lr} | Gamma: {best_gamma} | Epsilon: {best_eps}')
+        informar(f'Mejores hiperparametros obtenidos: LR: {best_lr} | Gamma: {best_gamma} | Epsilon: {best_eps}')
+        informar(f'Mejor promedio obtenido: {mejor_promedio}')
+    finally:
+        if salida is not None:
+            salida.close()
 
     return best_lr, best_gamma, best_eps
 
-def main(episodios, verbose):
+def grid_search_offline(lr_range, gamma_range, trayectorias, pasadas=1, verbose=True, archivo_resultados=None):
+    '''
+    Igual que grid_search_hiperparametros, pero sin simular: todas las
+    configuraciones aprenden de las mismas trayectorias grabadas (ver
+    trayectorias.py) en una sola pasada por los archivos, y cada política se
+    evalúa con evaluar_exacto. Epsilon no se busca, porque la política con la
+    que se jugó quedó fija al grabar.
+
+    Args:
+        lr_range: Lista con los valores de learning rate a probar.
+        gamma_range: Lista con los valores de gamma a probar.
+        trayectorias: Archivo (o lista de archivos) de grabar_trayectorias.
+        pasadas: Veces que se recorren las trayectorias.
+        verbose: Si se desea imprimir información adicional.
+        archivo_resultados: Archivo donde se escriben los resultados (por ejemplo, resultados.txt).
+
+    Returns:
+        float: Mejor learning rate.
+        float: Mejor gamma.
+        (Los dos son None si ninguna configuración dio un promedio válido.)
+    '''
+    configuraciones = [(lr, gamma) for lr in lr_range for gamma in gamma_range]
+    assert configuraciones, 'la grilla de hiperparámetros está vacía'
+    tablas = entrenar_offline(trayectorias, configuraciones, pasadas, verbose=verbose)
+    mejor_promedio = math.inf
+    # Si todos los promedios son nan no hay mejor configuración.
+    best_lr = best_gamma = None
+    lineas = []
+    for (lr, gamma), tabla in zip(configuraciones, tablas):
+        turnos_promedio, _ = evaluar_exacto(PoliticaTabla.desde_tabla_q(tabla))
+        lineas.append(f'Promedio obtenido: {turnos_promedio} [LR: {lr:.2f} | Gamma: {gamma:.2f}]')
+        if turnos_promedio < mejor_promedio:
+            mejor_promedio = turnos_promedio
+            agente = AgenteQLearning(None, lr, gamma, 0)
+            agente.qlearning_tabla = tabla
+            agente.guardar_politica('test_mejor.json')
+            best_lr, best_gamma = lr, gamma
+    lineas.append(f'Mejores hiperparametros obtenidos: LR: {best_lr} | Gamma: {best_gamma}')
+    lineas.append(f'Mejor promedio obtenido: {mejor_promedio}')
+
+    if verbose:
+        print('\n'.join(lineas))
+    if archivo_resultados is not None:
+        with open(archivo_resultados, 'a') as salida:
+            salida.write('\n'.join(lineas) + '\n')
+
+    return best_lr, best_gamma
+
+def main(episodios, verbose, ambientes=0, semilla=None, metricas_filename=None, cada_metricas=10000, perfilar=None,
+         checkpoint_filename=None, cada_checkpoint=100000, reanudar=False, ventana_convergencia=None, ventanas_estables=5,
+         procesos=1, con_total=False, paso_total=500, trayectorias=None, decaimiento_epsilon=None, epsilon_inicial=0.5,
+         epsilon_final=0.01, episodios_decaimiento=None, omega_visitas=None, q_inicial=0.0, objetivo_turnos=None,
+         ventana_objetivo=10000):
 
     if GRID_SEARCH:
         lr_list = [0.05, 0.1, 0.2]
         gamma_list = [0.65, 0.7, 0.75, 0.8, 0.85]
         eps_list = [0.05, 0.1, 0.2]
-        best_lr, best_gamma, best_eps = grid_search_hiperparametros(lr_list, gamma_list, eps_list, 1_000_000, 10000)
+        best_lr, best_gamma, best_eps = grid_search_hiperparametros(lr_list, gamma_list, eps_list, 1_000_000, 10000,
+                                                                        comparar=True)
 
     if RUN_AVG_TURN_TEST:
         n_partidas = 100000
         jugador = JugadorEntrenado('QLearningAgent', 'best_training_policy.json')
-        avg = get_promedio_turnos(jugador, n_partidas, verbose=True)
+        avg = get_promedio_turnos_simulado(PoliticaTabla.desde_jugador_entrenado(jugador), n_partidas)
         print(f'Resultado obtenido con el agente que jugo {n_partidas} partidas: {avg}')
 
-    ambiente = AmbienteDiezMil()
-    agente = AgenteQLearning(ambiente, 0.05, 0.75, 0.2)
-    agente.entrenar(episodios, verbose)
+    if trayectorias is not None:
+        # Busca LR y gamma sobre las trayectorias grabadas, sin entrenar en línea.
+        grid_search_offline([0.05, 0.1, 0.2], [0.65, 0.7, 0.75, 0.8, 0.85], trayectorias, verbose=True)
+        return
+
+    assert (checkpoint_filename is None and not reanudar) or (procesos == 1 and ambientes == 0), \
+        'los checkpoints (--checkpoint, --reanudar) no funcionan con --ambientes ni con --procesos'
+
+    if reanudar and checkpoint_filename is not None and os.path.exists(checkpoint_filename):
+        # episodios es el total: se entrenan los que faltan (o más, para extender un entrenamiento terminado).
+        agente = AgenteQLearning.cargar_checkpoint(checkpoint_filename)
+        print(f'Reanudando desde el episodio {agente.episodios_entrenados}')
+    else:
+        dados = FuenteDados(semilla)
+        ambiente = AmbienteDiezMil(dados=dados)
+        cronograma_epsilon = None
+        if decaimiento_epsilon is not None:
+            cronograma_epsilon = CronogramaEpsilon(decaimiento_epsilon, epsilon_inicial, epsilon_final,
+                                                   episodios_decaimiento or episodios)
+        agente = AgenteQLearning(ambiente, 0.05, 0.75, 0.2, dados=dados, con_total=con_total, paso_total=paso_total,
+                                 cronograma_epsilon=cronograma_epsilon, omega_visitas=omega_visitas, q_inicial=q_inicial)
+
+    if procesos > 1:
+        agente.entrenar_paralelo(episodios, procesos, semilla, verbose)
+    elif ambientes > 0:
+        agente.entrenar_vectorizado(episodios, AmbienteDiezMilVectorizado(ambientes, semilla), verbose)
+    else:
+        instrumentacion = None
+        if metricas_filename is not None or perfilar is not None:
+            instrumentacion = InstrumentacionEntrenamiento(metricas_filename, cada_metricas, perfilar,
+                                                           perfil_filename=f'perfil_{episodios}.prof')
+        if objetivo_turnos is not None:
+            convergencia = CriterioTurnos(objetivo_turnos, ventana_objetivo)
+        elif ventana_convergencia:
+            convergencia = CriterioConvergencia(ventana_convergencia, ventanas_estables)
+        else:
+            convergencia = None
+        agente.entrenar(max(episodios - agente.episodios_entrenados, 0), verbose, instrumentacion,
+                        checkpoint_filename, cada_checkpoint, continuar=agente.episodios_entrenados > 0,
+                        convergencia=convergencia)
+        if objetivo_turnos is not None:
+            if agente.episodio_convergencia is not None:
+                print(f'Llegó a {objetivo_turnos} turnos esperados en el episodio {agente.episodio_convergencia}')
+            else:
+                turnos = convergencia.historial[-1][1] if convergencia.historial else math.nan
+                print(f'No llegó a {objetivo_turnos} turnos esperados en {agente.episodios_entrenados} episodios (último: {turnos:.3f})')
+        elif agente.episodio_convergencia is not None:
+            print(f'La política convergió en el episodio {agente.episodio_convergencia}')
     agente.guardar_politica(f'policy_{episodios}.json')
 
 
@@ -107,9 +352,36 @@ if __name__ == '__main__':
     # Agregar argumentos
     parser.add_argument('-e', '--episodios', type=int, default=10000, help='Número de episodios para entrenar al agente (default: 10000)')
     parser.add_argument('-v', '--verbose', action='store_true', help='Activar modo verbose para ver más detalles durante el entrenamiento')
+    parser.add_argument('-s', '--semilla', type=int, default=None, help='Semilla para que el entrenamiento sea reproducible')
+    parser.add_argument('-k', '--ambientes', type=int, default=0, help='Cantidad de ambientes a simular en paralelo con AmbienteDiezMilVectorizado (default: 0, un solo ambiente)')
+    parser.add_argument('-p', '--procesos', type=int, default=1, help='Cantidad de procesos que entrenan a la vez sobre una tabla compartida de tamaño fijo, hasta 50000 puntos del turno; los turnos con más puntos usan la última fila (default: 1)')
+    parser.add_argument('-t', '--con_total', action='store_true', help='Incluir el puntaje total en el estado del agente')
+    parser.add_argument('--paso_total', type=int, default=500, help='Puntos totales que se agrupan en un mismo estado con --con_total, múltiplo de 50 (default: 500)')
+    parser.add_argument('-m', '--metricas', type=str, default=None, help='Archivo JSON-lines donde registrar tiempos y velocidad del entrenamiento')
+    parser.add_argument('--cada_metricas', type=int, default=10000, help='Episodios entre dos registros de métricas (default: 10000)')
+    parser.add_argument('-c', '--checkpoint', type=str, default=None, help='Archivo donde guardar checkpoints del entrenamiento (no funciona con --ambientes ni --procesos)')
+    parser.add_argument('--cada_checkpoint', type=int, default=100000, help='Episodios entre dos checkpoints (default: 100000)')
+    parser.add_argument('-r', '--reanudar', action='store_true', help='Seguir desde el checkpoint hasta completar los episodios pedidos')
+    parser.add_argument('--ventana_convergencia', type=int, default=None, help='Cortar el entrenamiento cuando, en ventanas de esta cantidad de episodios, los Q-values cambian a lo sumo un 1%% en promedio (con alpha constante no pasa: usar con --omega_visitas)')
+    parser.add_argument('--ventanas_estables', type=int, default=5, help='Ventanas estables (a lo sumo 1%% de cambio) seguidas para cortar (default: 5)')
+    parser.add_argument('--decaimiento_epsilon', type=str, choices=TIPOS_DECAIMIENTO, default=None, help='Bajar epsilon a lo largo del entrenamiento en lugar de dejarlo fijo')
+    parser.add_argument('--epsilon_inicial', type=float, default=0.5, help='Epsilon del primer episodio con --decaimiento_epsilon, a lo sumo 0.5 (default: 0.5)')
+    parser.add_argument('--epsilon_final', type=float, default=0.01, help='Epsilon al terminar el decaimiento (default: 0.01)')
+    parser.add_argument('--episodios_decaimiento', type=int, default=None, help='Episodios que dura el decaimiento (default: todos)')
+    parser.add_argument('--omega_visitas', type=float, default=None, help='Usar max(alpha, 1 / n ** omega) como tasa de aprendizaje según las visitas n de cada estado y acción')
+    parser.add_argument('--q_inicial', type=float, default=0.0, help='Q-value inicial de los estados sin visitar, para una inicialización optimista (default: 0.0)')
+    parser.add_argument('--objetivo_turnos', type=float, default=None, help='Cortar el entrenamiento e informar el episodio en el que la política llega a estos turnos esperados')
+    parser.add_argument('--ventana_objetivo', type=int, default=10000, help='Episodios entre dos evaluaciones de --objetivo_turnos (default: 10000)')
+    parser.add_argument('-o', '--offline', type=str, nargs='+', default=None, help='Buscar LR y gamma entrenando sin simular sobre estos archivos de trayectorias.py')
+    parser.add_argument('--perfilar', type=int, nargs=2, metavar=('INICIO', 'FIN'), default=None, help='Perfilar con cProfile los episodios [INICIO, FIN), contados desde el principio también al reanudar, y guardar perfil_<episodios>.prof')
 
     # Parsear los argumentos
     args = parser.parse_args()
 
     # Llamar a la función principal con los argumentos proporcionados
-    main(args.episodios, args.verbose)
+    main(args.episodios, args.verbose, args.ambientes, args.semilla, args.metricas, args.cada_metricas,
+         tuple(args.perfilar) if args.perfilar else None, args.checkpoint, args.cada_checkpoint, args.reanudar,
+         args.ventana_convergencia, args.ventanas_estables, args.procesos,
+         args.con_total, args.paso_total, args.offline, args.decaimiento_epsilon, args.epsilon_inicial,
+         args.epsilon_final, args.episodios_decaimiento, args.omega_visitas, args.q_inicial, args.objetivo_turnos,
+         args.ventana_objetivo)
@@ -0,0 +1,307 @@
+import math
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from diezmil import JuegoDiezMil
+from fuente_dados import FuenteDados
+from jugador import con_dados_propios
+from simulador import SimuladorDiezMil, PoliticaTabla, PASO_PUNTOS, PUNTAJE_OBJETIVO
+from optimo import PASOS, RESTANTES, PROBS, PROB_PERDER
+
+
+class AcumuladorTurnos:
+    def __init__(self):
+        '''
+        Acumula en línea la cantidad de turnos de muchas partidas: cantidad,
+        media, suma de cuadrados de los desvíos (Welford) e histograma.
+        Dos acumuladores se combinan sin volver a mirar las partidas.
+        '''
+
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.histograma = np.zeros(0, dtype=np.int64)
+
+    def agregar(self, turnos) -> None:
+        '''
+        Agrega un lote de partidas (cantidad de turnos de cada una).
+        '''
+        turnos = np.asarray(turnos, dtype=np.int64)
+        if len(turnos) == 0:
+            return
+        lote = AcumuladorTurnos()
+        lote.n = len(turnos)
+        lote.media = float(turnos.mean())
+        lote.m2 = float(((turnos - lote.media) ** 2).sum())
+        lote.histograma = np.bincount(turnos)
+        self.combinar(lote)
+
+    def combinar(self, otro: 'AcumuladorTurnos') -> None:
+        '''
+        Suma a este acumulador las partidas de otro (fórmula de Chan et al.).
+        '''
+        if otro.n == 0:
+            return
+        n = self.n + otro.n
+        delta = otro.media - self.media
+        self.media += delta * otro.n / n
+        self.m2 += otro.m2 + delta ** 2 * self.n * otro.n / n
+        self.n = n
+
+        largo = max(len(self.histograma), len(otro.histograma))
+        histograma = np.zeros(largo, dtype=np.int64)
+        histograma[:len(self.histograma)] += self.histograma
+        histograma[:len(otro.histograma)] += otro.histograma
+        self.histograma = histograma
+
+    def varianza(self) -> float:
+        return self.m2 / (self.n - 1) if self.n > 1 else math.inf
+
+    def intervalo_confianza(self, z: float = 1.96) -> tuple[float, float]:
+        '''
+        Intervalo de confianza normal para la media (z = 1.96 para el 95%).
+        '''
+        radio = z * math.sqrt(self.varianza() / self.n) if self.n > 1 else math.inf
+        return (self.media - radio, self.media + radio)
+
+
+def _jugar_lote(jugador, cant_partidas: int, semilla: int) -> AcumuladorTurnos:
+    '''
+    Juega un lote de partidas con su propia semilla. Las políticas dadas por
+    tabla se juegan en lote con SimuladorDiezMil, el resto con JuegoDiezMil.
+    '''
+    acumulador = AcumuladorTurnos()
+    if isinstance(jugador, PoliticaTabla):
+        turnos, _ = SimuladorDiezMil(jugador, semilla).jugar(cant_partidas)
+    else:
+        juego = JuegoDiezMil(con_dados_propios(jugador, semilla), FuenteDados(semilla))
+        turnos = [juego.jugar(verbose=False)[0] for _ in range(cant_partidas)]
+    acumulador.agregar(turnos)
+    return acumulador
+
+
+def evaluar_turnos(jugador, max_partidas: int, ancho_ic: float | None = None, partidas_por_lote: int = 1000,
+                   procesos: int = 1, semilla: int | None = None, z: float = 1.96) -> AcumuladorTurnos:
+    '''
+    Juega partidas con el jugador en lotes de partidas_por_lote, cada uno con
+    una semilla propia derivada de semilla, repartidos entre procesos procesos.
+    Los lotes se suman en orden, así que el resultado no depende de la cantidad
+    de procesos. Corta cuando se juegan max_partidas partidas o, si se pasa
+    ancho_ic, cuando el intervalo de confianza de la media es más angosto que eso.
+
+    Args:
+        jugador: Jugador (o PoliticaTabla) a evaluar. Debe poder mandarse a otro proceso.
+        max_partidas: Cantidad máxima de partidas a jugar.
+        ancho_ic: Ancho buscado del intervalo de confianza, en turnos.
+        partidas_por_lote: Partidas de cada lote.
+        procesos: Cantidad de procesos a usar.
+        semilla: Semilla de la que se derivan las de cada lote.
+        z: Cuantil normal del intervalo (1.96 para el 95%).
+
+    Returns:
+        AcumuladorTurnos: Estadísticas de las partidas jugadas.
+    '''
+    raiz = np.random.SeedSequence(semilla)
+    acumulador = AcumuladorTurnos()
+    executor = ProcessPoolExecutor(max_workers=procesos) if procesos > 1 else None
+
+    def alcanzo_precision() -> bool:
+        if ancho_ic is None:
+            return False
+        inferior, superior = acumulador.intervalo_confianza(z)
+        return superior - inferior <= ancho_ic
+
+    try:
+        while acumulador.n < max_partidas and not alcanzo_precision():
+            lotes = []
+            pendientes = max_partidas - acumulador.n
+            for hijo in raiz.spawn(min(procesos, math.ceil(pendientes / partidas_por_lote))):
+                lotes.append((min(partidas_por_lote, pendientes), int(hijo.generate_state(1)[0])))
+                pendientes -= lotes[-1][0]
+
+            cantidades = [cant for cant, _ in lotes]
+            semillas = [s for _, s in lotes]
+            if executor is None:
+                resultados = map(_jugar_lote, [jugador] * len(lotes), cantidades, semillas)
+            else:
+                resultados = executor.map(_jugar_lote, [jugador] * len(lotes), cantidades, semillas)
+
+            for resultado in resultados:
+                acumulador.combinar(resultado)
+                if alcanzo_precision():
+                    break
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    return acumulador
+
+
+def _jugar_lote_comun(politica: PoliticaTabla, cant_partidas: int, semilla: int, primera_partida: int) -> np.ndarray:
+    return SimuladorDiezMil(politica, semilla, numeros_comunes=True).jugar(cant_partidas, primera_partida=primera_partida)[0]
+
+
+def comparar_turnos(jugadores: dict, partidas: int, semilla: int | None = None, partidas_por_lote: int = 10000,
+                    procesos: int = 1) -> dict:
+    '''
+    Compara jugadores con números aleatorios comunes: todos juegan las mismas
+    partidas, y en cada una ven los mismos dados en la misma tirada del mismo
+    turno (ver SimuladorDiezMil con numeros_comunes). Como la suerte de cada
+    partida se repite para todos, la diferencia de turnos partida a partida
+    varía mucho menos que la de dos muestras independientes, y con menos
+    partidas alcanza para ordenar jugadores que difieren en décimas de turno.
+
+    Args:
+        jugadores (dict): Nombre -> jugador que se pueda escribir como tabla
+            (ver PoliticaTabla.desde_jugador).
+        partidas (int): Cantidad de partidas de cada jugador.
+        semilla (int, optional): Semilla de las partidas. Si es None, se sortea una para todos.
+        partidas_por_lote (int, optional): Partidas de cada lote. Defaults to 10000.
+        procesos (int, optional): Cantidad de procesos a usar. Defaults to 1.
+
+    Returns:
+        dict: 'nombres'; 'turnos', nombre -> turnos de cada partida; 'medias' y
+            'errores' (error estándar de cada media); 'diferencias' y
+            'errores_diferencias', matrices con la media de turnos de la fila
+            menos la de la columna, partida a partida, y su error estándar.
+    '''
+    if semilla is None:
+        semilla = int(np.random.SeedSequence().generate_state(1, np.uint64)[0])
+    nombres = list(jugadores)
+    politicas = [PoliticaTabla.desde_jugador(jugadores[nombre]) for nombre in nombres]
+    primeras = list(range(0, partidas, partidas_por_lote))
+    cantidades = [min(partidas_por_lote, partidas - primera) for primera in primeras]
+
+    tareas = ([politica for politica in politicas for _ in primeras], cantidades * len(politicas),
+              [semilla] * len(primeras) * len(politicas), primeras * len(politicas))
+    if procesos > 1:
+        with ProcessPoolExecutor(max_workers=procesos) as executor:
+            lotes = list(executor.map(_jugar_lote_comun, *tareas))
+    else:
+        lotes = list(map(_jugar_lote_comun, *tareas))
+    turnos = np.array([np.concatenate(lotes[i * len(primeras):(i + 1) * len(primeras)]) for i in range(len(nombres))])
+
+    medias = turnos.mean(axis=1)
+    # La media de las diferencias es la diferencia de las medias; el desvío se
+    # calcula de a un par, sin armar todas las diferencias a la vez.
+    errores_diferencias = np.zeros((len(nombres), len(nombres)))
+    for i in range(len(nombres)):
+        for j in range(i + 1, len(nombres)):
+            error = (turnos[i] - turnos[j]).std(ddof=1) / math.sqrt(partidas)
+            errores_diferencias[i, j] = errores_diferencias[j, i] = error
+    return {
+        'nombres': nombres,
+        'turnos': dict(zip(nombres, turnos)),
+        'medias': medias,
+        'errores': turnos.std(axis=1, ddof=1) / math.sqrt(partidas),
+        'diferencias': medias[:, None] - medias[None, :],
+        'errores_diferencias': errores_diferencias,
+    }
+
+
+def _armar_transiciones() -> np.ndarray:
+    '''
+    Arma TRANSICIONES[d, k, r]: probabilidad de que, eligiendo tirar con d
+    dados disponibles, la tirada sume k * 50 puntos y queden r dados.
+    '''
+    transiciones = np.zeros((7, PASOS.max() + 1, 7))
+    for d in range(7):
+        np.add.at(transiciones[d], (PASOS[d], RESTANTES[d]), PROBS[d])
+    return transiciones
+
+
+TRANSICIONES: np.ndarray = _armar_transiciones()
+
+
+def distribucion_puntos_turno(politica: PoliticaTabla, objetivo: int = PUNTAJE_OBJETIVO) -> np.ndarray:
+    '''
+    Calcula la distribución exacta de los puntos que suma un turno jugado con
+    la política, propagando la probabilidad por (puntos_turno, cant_dados) de
+    menor a mayor puntaje. Los puntos a partir de la última fila C (la mayor
+    entre la última fila de la política y objetivo // 50) se agrupan: ahí la
+    política ya no cambia y cualquier total llega al objetivo, así que las
+    tiradas que siguen forman un sistema lineal chico que se resuelve exacto.
+
+    Args:
+        politica (PoliticaTabla): Política a evaluar.
+        objetivo (int, optional): Puntaje para ganar. Defaults to 10000.
+
+    Returns:
+        np.ndarray: Con forma (totales, C + 1): la fila t es la distribución
+            de los puntos del turno (en pasos de 50; la columna 0 incluye perder
+            el turno y la C, sumar C * 50 o más) empezando con t * 50 puntos
+            totales. Si la política no depende del total hay una sola fila.
+    '''
+    prob = politica.prob_tirar if politica.con_total else politica.prob_tirar[None]
+    totales, filas_politica = prob.shape[:2]
+    cota = max(filas_politica - 1, objetivo // PASO_PUNTOS)
+    maximo_paso = TRANSICIONES.shape[1] - 1
+
+    distribucion = np.zeros((totales, cota + 1))
+    # masa[:, fila, d]: probabilidad de terminar una tirada con fila * 50 puntos y d dados libres.
+    masa = np.zeros((totales, cota + maximo_paso + 1, 7))
+
+    # El turno empieza tirando los 6 dados.
+    tirar = np.zeros((totales, 7))
+    tirar[:, 6] = 1
+    for fila in range(cota):
+        if fila > 0:
+            p = prob[:, min(fila, filas_politica - 1)]
+            distribucion[:, fila] = (masa[:, fila] * (1 - p)).sum(axis=1)
+            tirar = masa[:, fila] * p
+        distribucion[:, 0] += tirar @ PROB_PERDER
+        masa[:, fila:fila + maximo_paso + 1] += np.einsum('td,dkr->tkr', tirar, TRANSICIONES)
+
+    # Desde la cota, cada tirada que suma vuelve a la cota: x = entrada + x M.
+    entrada = masa[:, cota:].sum(axis=1)
+    p = prob[:, filas_politica - 1]
+    m = p[:, :, None] * TRANSICIONES[:, 1:].sum(axis=1)[None]
+    x = np.linalg.solve(np.transpose(np.eye(7) - m, (0, 2, 1)), entrada[:, :, None])[:, :, 0]
+    distribucion[:, cota] = (x * (1 - p)).sum(axis=1)
+    distribucion[:, 0] += (x * p) @ PROB_PERDER
+    return distribucion
+
+
+def evaluar_exacto(politica: PoliticaTabla, tope_turnos: int = 1000,
+                   objetivo: int = PUNTAJE_OBJETIVO) -> tuple[float, np.ndarray]:
+    '''
+    Calcula sin simular la cantidad esperada de turnos para llegar al objetivo
+    y su distribución. Con la distribución de puntos de cada turno
+    (distribucion_puntos_turno), el puntaje total es una cadena de Markov
+    absorbente sobre múltiplos de 50: la esperanza sale de resolverla hacia
+    atrás y la distribución, de propagarla turno a turno.
+
+    Args:
+        politica (PoliticaTabla): Política a evaluar (ver PoliticaTabla.desde_jugador).
+        tope_turnos (int, optional): Turnos máximos de una partida, como en JuegoDiezMil.jugar. Defaults to 1000.
+        objetivo (int, optional): Puntaje para ganar. Defaults to 10000.
+
+    Returns:
+        tuple[float, np.ndarray]: Turnos esperados (sin tope) y, en la posición n,
+            la probabilidad de terminar en n turnos (en tope_turnos se suma la
+            probabilidad de no haber llegado antes).
+    '''
+    distribucion = distribucion_puntos_turno(politica, objetivo)
+    totales = objetivo // PASO_PUNTOS
+    # Los totales que se pasan de la política usan su última fila.
+    distribucion = distribucion[np.minimum(np.arange(totales), len(distribucion) - 1)]
+    columnas = distribucion.shape[1]
+
+    # transicion[t, t']: pasar de t * 50 a t' * 50 puntos totales en un turno.
+    transicion = np.zeros((totales, totales))
+    for t in range(totales):
+        quedan = min(columnas, totales - t)
+        transicion[t, t:t + quedan] = distribucion[t, :quedan]
+    llegar = 1 - transicion.sum(axis=1)
+
+    esperanza = np.zeros(totales + 1)
+    for t in range(totales - 1, -1, -1):
+        esperanza[t] = (1 + transicion[t, t + 1:] @ esperanza[t + 1:totales]) / (1 - transicion[t, t])
+
+    turnos = np.zeros(tope_turnos + 1)
+    v = np.zeros(totales)
+    v[0] = 1
+    for n in range(1, tope_turnos):
+        turnos[n] = v @ llegar
+        v = v @ transicion
+    turnos[tope_turnos] = v.sum()
+    return float(esperanza[0]), turnos
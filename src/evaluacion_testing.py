@@ -0,0 +1,180 @@
+import random
+import unittest
+import numpy as np
+from evaluacion import AcumuladorTurnos, distribucion_puntos_turno, evaluar_exacto, evaluar_turnos, comparar_turnos
+from optimo import resolver_partida, resolver_turno
+from simulador import PoliticaTabla, SimuladorDiezMil
+from utils import PUNTAJE_ESCALERA, JUGADA_PLANTARSE
+from umbrales import compilar_tramos, compilar_umbrales, JugadorUmbral
+from jugador import Jugador, JugadorAleatorio, JugadorSiempreSePlanta
+from torneo import jugar_torneo
+
+class TestAcumuladorTurnos(unittest.TestCase):
+    def test_combinar_lotes(self):
+        turnos = np.random.default_rng(0).integers(10, 40, 1000)
+        acumulador = AcumuladorTurnos()
+        acumulador.agregar(turnos[:300])
+        acumulador.agregar(turnos[300:])
+        self.assertEqual(acumulador.n, 1000)
+        self.assertAlmostEqual(acumulador.media, turnos.mean())
+        self.assertAlmostEqual(acumulador.varianza(), turnos.var(ddof=1))
+        self.assertTrue(np.array_equal(acumulador.histograma, np.bincount(turnos)))
+
+class TestEvaluarTurnos(unittest.TestCase):
+    def test_corta_al_alcanzar_el_ancho(self):
+        politica = PoliticaTabla.desde_jugador(JugadorUmbral('umbral', [300, 250, 200, 300, 250, 150, 50]))
+        acumuladores = [evaluar_turnos(politica, 10 ** 6, ancho_ic=1.0, partidas_por_lote=100, procesos=procesos, semilla=0)
+                        for procesos in [1, 2]]
+        inferior, superior = acumuladores[0].intervalo_confianza()
+        self.assertLessEqual(superior - inferior, 1.0)
+        # Corta en el primer lote que alcanza el ancho, sin importar los procesos.
+        self.assertLess(acumuladores[0].n, 10 ** 6)
+        self.assertEqual(acumuladores[0].n % 100, 0)
+        self.assertEqual(acumuladores[1].n, acumuladores[0].n)
+        self.assertEqual(acumuladores[1].media, acumuladores[0].media)
+
+    def test_igual_con_distintos_procesos(self):
+        estado = random.getstate()
+        resultados = [evaluar_turnos(JugadorAleatorio('aleatorio'), 60, partidas_por_lote=20, procesos=procesos, semilla=3)
+                      for procesos in [1, 2, 3]]
+        # Cada lote tiene sus propias fuentes: no se toca el módulo random.
+        self.assertEqual(random.getstate(), estado)
+        for resultado in resultados[1:]:
+            self.assertEqual(resultado.n, 60)
+            self.assertEqual(resultado.media, resultados[0].media)
+            np.testing.assert_array_equal(resultado.histograma, resultados[0].histograma)
+
+
+class TestEvaluarExacto(unittest.TestCase):
+    def test_distribucion_suma_uno(self):
+        for politica in [PoliticaTabla.siempre_plantarse(), PoliticaTabla.aleatoria()]:
+            self.assertAlmostEqual(distribucion_puntos_turno(politica).sum(), 1)
+
+    def test_siempre_plantarse_primer_turno(self):
+        # Plantándose siempre, el turno suma exactamente lo de la primera tirada.
+        distribucion = distribucion_puntos_turno(PoliticaTabla.siempre_plantarse())[0]
+        # Pierde si no sale ni 1 ni 5 ni tres iguales ni tres pares: 1080 de las 6**6 tiradas.
+        self.assertAlmostEqual(distribucion[0], 1080 / 6 ** 6)
+        self.assertAlmostEqual(distribucion[PUNTAJE_ESCALERA // 50], 720 / 6 ** 6)
+
+    def test_coincide_con_el_optimo(self):
+        q, turnos = resolver_partida()
+        esperanza, _ = evaluar_exacto(PoliticaTabla((q[..., 1] > q[..., 0]).astype(np.float64)))
+        self.assertAlmostEqual(esperanza, turnos[0], places=9)
+
+    def test_coincide_con_la_simulacion(self):
+        politica = PoliticaTabla.siempre_plantarse()
+        esperanza, distribucion = evaluar_exacto(politica)
+        self.assertAlmostEqual(distribucion.sum(), 1)
+        self.assertAlmostEqual((np.arange(len(distribucion)) * distribucion).sum(), esperanza, places=6)
+        turnos, _ = SimuladorDiezMil(politica, semilla=0).jugar(20000)
+        self.assertLess(abs(turnos.mean() - esperanza), 4 * turnos.std() / np.sqrt(len(turnos)))
+
+    def test_numeros_comunes(self):
+        politica = PoliticaTabla.aleatoria()
+        esperanza, _ = evaluar_exacto(politica)
+        turnos, _ = SimuladorDiezMil(politica, semilla=0, numeros_comunes=True).jugar(20000)
+        self.assertLess(abs(turnos.mean() - esperanza), 4 * turnos.std() / np.sqrt(len(turnos)))
+        # Las mismas partidas se juegan igual aunque se repartan en lotes distintos.
+        lote, _ = SimuladorDiezMil(politica, semilla=0, numeros_comunes=True).jugar(500, primera_partida=1000)
+        np.testing.assert_array_equal(lote, turnos[1000:1500])
+
+class TestCompararTurnos(unittest.TestCase):
+    def test_misma_politica_dos_veces(self):
+        umbrales = [300, 250, 200, 300, 250, 150, 50]
+        resultado = comparar_turnos({'a': JugadorUmbral('a', umbrales), 'b': JugadorUmbral('b', umbrales)}, 5000,
+                                    semilla=0, partidas_por_lote=2000)
+        np.testing.assert_array_equal(resultado['turnos']['a'], resultado['turnos']['b'])
+        np.testing.assert_array_equal(resultado['diferencias'], np.zeros((2, 2)))
+        np.testing.assert_array_equal(resultado['errores_diferencias'], np.zeros((2, 2)))
+
+    def test_pareado_reduce_el_error(self):
+        jugadores = {
+            'a': JugadorUmbral('a', [300, 250, 200, 300, 250, 150, 50]),
+            'b': JugadorUmbral('b', [300, 250, 200, 350, 250, 150, 50]),
+            'c': JugadorUmbral('c', [300, 250, 250, 300, 250, 150, 50]),
+        }
+        resultado = comparar_turnos(jugadores, 20000, semilla=0)
+        medias, errores = resultado['medias'], resultado['errores']
+        np.testing.assert_allclose(resultado['diferencias'], medias[:, None] - medias[None, :])
+        for i in range(3):
+            for j in range(3):
+                if i != j:
+                    independiente = np.hypot(errores[i], errores[j])
+                    self.assertLess(resultado['errores_diferencias'][i, j], independiente / 3)
+                    self.assertEqual(resultado['errores_diferencias'][i, j], resultado['errores_diferencias'][j, i])
+
+
+class TestUmbrales(unittest.TestCase):
+    def test_optimo_del_turno_es_monotono(self):
+        q = resolver_turno(5000)
+        umbrales, no_monotonos = compilar_umbrales(q)
+        self.assertEqual(no_monotonos, [])
+        prob_tirar = PoliticaTabla.desde_umbrales(umbrales).prob_tirar
+        np.testing.assert_array_equal(prob_tirar[:len(q)], q[:, :, 1] > q[:, :, 0])
+
+    def test_solo_mira_los_visitados(self):
+        # Con q_inicial 5 los estados sin visitar empatan (se plantan) y no tienen que contar.
+        valores = np.full((40, 7, 2), 5.0)
+        valores[10:14, 2] = [1.0, 2.0]
+        valores[14:16, 2] = [2.0, 1.0]
+        visitados = np.zeros((40, 7), dtype=bool)
+        visitados[10:16, 2] = True
+        self.assertEqual(compilar_umbrales(valores)[0][2], 0)
+        for umbrales, no_monotonos in [compilar_umbrales(valores, valor_inicial=5.0), compilar_umbrales(valores, visitados)]:
+            self.assertEqual(umbrales[2], 14 * 50)
+            self.assertEqual(no_monotonos, [])
+
+    def test_tramos_son_exactos(self):
+        rng = np.random.default_rng(0)
+        valores = rng.normal(size=(40, 7, 2))
+        valores[5:9, 3] = 0.0  # Empates: se planta.
+        tramos = compilar_tramos(valores)
+        for dados, tramos_dados in enumerate(tramos):
+            self.assertEqual(tramos_dados[0][0], 0)
+            # Cada tramo cambia la jugada del anterior.
+            self.assertTrue(all(a[1] != b[1] for a, b in zip(tramos_dados, tramos_dados[1:])))
+            for fila in range(len(valores)):
+                jugada = [j for puntos, j in tramos_dados if puntos <= fila * 50][-1]
+                self.assertEqual(jugada, int(valores[fila, dados, 1] > valores[fila, dados, 0]))
+
+
+class JugadorPlantonSinTabla(Jugador):
+    # Sin política por tabla: el torneo lo juega con JuegoDiezMil.
+    def jugar(self, puntaje_total, puntaje_turno, dados, verbose=False):
+        return (JUGADA_PLANTARSE, [])
+
+
+class TestTorneo(unittest.TestCase):
+    def test_cortadas_por_el_tope_son_empate(self):
+        # Con 3 turnos nadie llega a 10000: no gana el que arranca.
+        jugadores = {'a': JugadorSiempreSePlanta('a'), 'b': JugadorPlantonSinTabla(), 'c': JugadorSiempreSePlanta('c')}
+        resultado = jugar_torneo(jugadores, 100, semilla=0, tope_turnos=3)
+        self.assertFalse(any(llego.any() for llego in resultado['llego'].values()))
+        np.testing.assert_array_equal(resultado['victorias'], np.full((3, 3), 0.5))
+
+    def test_no_toca_el_modulo_random(self):
+        estado = random.getstate()
+        jugadores = {'a': JugadorSiempreSePlanta('a'), 'b': JugadorPlantonSinTabla()}
+        resultados = [jugar_torneo(jugadores, 200, procesos=procesos, semilla=0, partidas_por_lote=50)
+                      for procesos in [1, 2]]
+        self.assertEqual(random.getstate(), estado)
+        np.testing.assert_array_equal(resultados[0]['turnos']['b'], resultados[1]['turnos']['b'])
+        np.testing.assert_array_equal(resultados[0]['victorias'], resultados[1]['victorias'])
+
+    def test_cortada_pierde_contra_la_que_llega(self):
+        jugadores = {'plantón': JugadorSiempreSePlanta('plantón'), 'umbral': JugadorUmbral('umbral', [300, 250, 200, 300, 250, 150, 50])}
+        resultado = jugar_torneo(jugadores, 1000, semilla=0, tope_turnos=25)
+        turnos, llego = resultado['turnos'], resultado['llego']
+        # Solo cuentan como victorias del plantón las partidas en las que llegó.
+        pares = np.arange(1000) % 2 == 0
+        gana = llego['plantón'] & (~llego['umbral'] | (turnos['plantón'] < turnos['umbral'])
+                                   | ((turnos['plantón'] == turnos['umbral']) & pares))
+        empate = ~llego['plantón'] & ~llego['umbral']
+        self.assertTrue(empate.any() and (llego['plantón'] != llego['umbral']).any())
+        self.assertAlmostEqual(resultado['victorias'][0, 1], (gana + 0.5 * empate).mean())
+        self.assertAlmostEqual(resultado['victorias'][0, 1] + resultado['victorias'][1, 0], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
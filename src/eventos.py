@@ -0,0 +1,106 @@
+import os
+import numpy as np
+
+# Eventos que emite JuegoDiezMil.jugar a sus suscriptores. Cada suscriptor es
+# un callable suscriptor(evento, turno, dados, puntaje_turno, puntaje_total):
+#   EVENTO_TIRADA: dados es la tirada.
+#   EVENTO_PLANTARSE: el jugador se planta con la tirada anterior.
+#   EVENTO_TIRAR: dados son los dados que vuelve a tirar.
+#   EVENTO_PERDIO: la tirada no sumó y pierde los puntos del turno.
+#   EVENTO_FIN_TURNO: puntaje_turno es lo que sumó en el turno y puntaje_total el total.
+#   EVENTO_FIN_PARTIDA: turno es la cantidad de turnos y puntaje_total el puntaje final.
+EVENTO_TIRADA: int = 0
+EVENTO_PLANTARSE: int = 1
+EVENTO_TIRAR: int = 2
+EVENTO_PERDIO: int = 3
+EVENTO_FIN_TURNO: int = 4
+EVENTO_FIN_PARTIDA: int = 5
+
+# Registro de largo fijo (18 bytes) de GrabadorTraza.
+DTYPE_TRAZA = np.dtype([
+    ('evento', 'u1'),
+    ('cant_dados', 'u1'),
+    ('dados', 'u1', 6),
+    ('turno', '<u2'),
+    ('puntaje_turno', '<i4'),
+    ('puntaje_total', '<i4'),
+])
+
+
+class ImpresorEventos:
+    def __init__(self):
+        '''
+        Suscriptor que imprime una línea por turno, igual que el modo verbose
+        de JuegoDiezMil.jugar.
+        '''
+
+        self.msg: str = ''
+
+    def __call__(self, evento: int, turno: int, dados: list[int], puntaje_turno: int, puntaje_total: int):
+        if evento == EVENTO_TIRADA:
+            self.msg += ' ' + ''.join(map(str, dados)) + ' '
+        elif evento == EVENTO_PLANTARSE:
+            self.msg += 'P'
+        elif evento == EVENTO_TIRAR:
+            self.msg += 'T(' + ''.join(map(str, dados)) + ') '
+        elif evento == EVENTO_FIN_TURNO:
+            print('turno ' + str(turno) + ':' + self.msg + ' --> ' + str(puntaje_turno) + ' puntos. TOTAL: ' + str(puntaje_total))
+            self.msg = ''
+
+
+class GrabadorTraza:
+    def __init__(self, filename: str, tam_bloque: int = 1 << 16):
+        '''
+        Suscriptor que guarda los eventos en un archivo binario con registros
+        de largo fijo (DTYPE_TRAZA), escribiendo de a bloques. Sirve para
+        guardar millones de partidas y analizarlas después con leer_traza o
+        reproducirlas con reproducir_traza.
+
+        Args:
+            filename (str): Nombre/Path del archivo a generar.
+            tam_bloque (int, optional): Eventos que se juntan antes de escribir.
+        '''
+
+        self.archivo = open(filename, 'wb')
+        self.tam_bloque = tam_bloque
+        self.pendientes: list[tuple] = []
+
+    def __call__(self, evento: int, turno: int, dados: list[int], puntaje_turno: int, puntaje_total: int):
+        self.pendientes.append((evento, len(dados), (dados + [0] * 6)[:6], turno, puntaje_turno, puntaje_total))
+        if len(self.pendientes) >= self.tam_bloque:
+            self.vaciar()
+
+    def vaciar(self):
+        if self.pendientes:
+            np.array(self.pendientes, dtype=DTYPE_TRAZA).tofile(self.archivo)
+            self.pendientes = []
+
+    def cerrar(self):
+        self.vaciar()
+        self.archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
+
+
+def leer_traza(filename: str) -> np.ndarray:
+    '''
+    Mapea en memoria una traza de GrabadorTraza como arreglo estructurado.
+    Una traza vacía (por ejemplo, de 0 partidas) da un arreglo vacío.
+    '''
+    if os.path.getsize(filename) == 0:
+        return np.zeros(0, dtype=DTYPE_TRAZA)
+    return np.memmap(filename, dtype=DTYPE_TRAZA, mode='r')
+
+
+def reproducir_traza(filename: str, suscriptor) -> None:
+    '''
+    Vuelve a emitir, en orden, los eventos de una traza hacia un suscriptor
+    (por ejemplo, un ImpresorEventos).
+    '''
+    for registro in leer_traza(filename).tolist():
+        evento, cant_dados, dados, turno, puntaje_turno, puntaje_total = registro
+        suscriptor(evento, turno, list(dados[:cant_dados]), puntaje_turno, puntaje_total)
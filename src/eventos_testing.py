@@ -0,0 +1,73 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from diezmil import JuegoDiezMil
+from jugador import JugadorAleatorio
+from fuente_dados import FuenteDados
+from eventos import GrabadorTraza, leer_traza, reproducir_traza, ImpresorEventos, DTYPE_TRAZA, EVENTO_FIN_PARTIDA
+
+# Lo que imprimía JuegoDiezMil.jugar(verbose=True) antes de pasar a eventos,
+# con las mismas semillas que _juego.
+SALIDA_VERBOSE = '''turno 1: 644221 P --> 100 puntos. TOTAL: 100
+turno 2: 112546 T(246)  446  --> 0 puntos. TOTAL: 100
+turno 3: 544462 T(26)  55 T(123456)  136415 P --> 800 puntos. TOTAL: 900
+turno 4: 562161 P --> 250 puntos. TOTAL: 1150
+turno 5: 412333 T(24)  11 T(123456)  115442 P --> 850 puntos. TOTAL: 2000
+turno 6: 453365 P --> 100 puntos. TOTAL: 2100
+'''
+
+
+def _juego() -> JuegoDiezMil:
+    return JuegoDiezMil(JugadorAleatorio('a', FuenteDados(1)), FuenteDados(0))
+
+
+class TestEventos(unittest.TestCase):
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directorio.name, 'traza.bin')
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def test_verbose_igual_que_antes(self):
+        salida = io.StringIO()
+        with contextlib.redirect_stdout(salida):
+            resultado = _juego().jugar(verbose=True, tope_turnos=6)
+        self.assertEqual(resultado, (6, 2100))
+        self.assertEqual(salida.getvalue(), SALIDA_VERBOSE)
+
+    def test_traza_ida_y_vuelta(self):
+        eventos = []
+        juego = _juego()
+        juego.suscribir(lambda *evento: eventos.append(evento))
+        with GrabadorTraza(self.filename, tam_bloque=7) as grabador:
+            juego.suscribir(grabador)
+            juego.jugar(tope_turnos=6)
+
+        traza = leer_traza(self.filename)
+        self.assertEqual(len(traza), len(eventos))
+        self.assertEqual(traza['evento'][-1], EVENTO_FIN_PARTIDA)
+        for registro, (evento, turno, dados, puntaje_turno, puntaje_total) in zip(traza, eventos):
+            self.assertEqual(registro['evento'], evento)
+            self.assertEqual(registro['turno'], turno)
+            self.assertEqual(registro['dados'][:registro['cant_dados']].tolist(), list(dados))
+            self.assertEqual((registro['puntaje_turno'], registro['puntaje_total']), (puntaje_turno, puntaje_total))
+
+        # Reproducida, la traza imprime lo mismo que la partida en verbose.
+        salida = io.StringIO()
+        with contextlib.redirect_stdout(salida):
+            reproducir_traza(self.filename, ImpresorEventos())
+        self.assertEqual(salida.getvalue(), SALIDA_VERBOSE)
+
+    def test_traza_vacia(self):
+        with GrabadorTraza(self.filename):
+            pass
+        traza = leer_traza(self.filename)
+        self.assertEqual(len(traza), 0)
+        self.assertEqual(traza.dtype, DTYPE_TRAZA)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import json
+import numpy as np
+
+TAM_BLOQUE: int = 1 << 16
+
+
+class FuenteDados:
+    def __init__(self, semilla: int | np.random.SeedSequence | None = None, tam_bloque: int = TAM_BLOQUE):
+        '''
+        Fuente de caras de dados, monedas y uniformes que se generan de a
+        bloques grandes con NumPy y se recargan solos cuando se terminan. Se
+        puede pasar al juego, al ambiente y a los jugadores en lugar del
+        módulo random: con la misma semilla, la secuencia es la misma.
+
+        Args:
+            semilla (int | SeedSequence, optional): Semilla. Si es None, se toma entropía del sistema.
+            tam_bloque (int, optional): Cantidad de valores que se generan por bloque.
+        '''
+
+        if not isinstance(semilla, np.random.SeedSequence):
+            semilla = np.random.SeedSequence(semilla)
+        self.semilla = semilla
+        self.tam_bloque = tam_bloque
+        self.rng = np.random.default_rng(semilla)
+        self._caras: list[int] = []
+        self._i_caras = 0
+        self._monedas: list[int] = []
+        self._i_monedas = 0
+        self._uniformes: list[float] = []
+        self._i_uniformes = 0
+
+    def hijos(self, cantidad: int) -> list['FuenteDados']:
+        '''
+        Devuelve cantidad fuentes independientes derivadas de esta semilla,
+        por ejemplo una por proceso. Siempre son las mismas para la misma semilla.
+        '''
+        return [FuenteDados(s, self.tam_bloque) for s in self.semilla.spawn(cantidad)]
+
+    def caras(self, n: int) -> list[int]:
+        '''
+        Devuelve una tirada de n dados.
+        '''
+        i = self._i_caras
+        if i + n > len(self._caras):
+            self._caras = self.rng.integers(1, 7, self.tam_bloque).tolist()
+            i = 0
+        self._i_caras = i + n
+        return self._caras[i:i + n]
+
+    def moneda(self) -> int:
+        '''
+        Devuelve 0 o 1 con la misma probabilidad.
+        '''
+        if self._i_monedas == len(self._monedas):
+            self._monedas = self.rng.integers(0, 2, self.tam_bloque).tolist()
+            self._i_monedas = 0
+        self._i_monedas += 1
+        return self._monedas[self._i_monedas - 1]
+
+    def uniforme(self) -> float:
+        '''
+        Devuelve un número uniforme en [0, 1).
+        '''
+        if self._i_uniformes == len(self._uniformes):
+            self._uniformes = self.rng.random(self.tam_bloque).tolist()
+            self._i_uniformes = 0
+        self._i_uniformes += 1
+        return self._uniformes[self._i_uniformes - 1]
+
+    def estado(self) -> dict[str, np.ndarray]:
+        '''
+        Devuelve el estado completo de la fuente (generador, semilla y lo que
+        queda de cada bloque) como arreglos, por ejemplo para guardarlo con np.savez.
+        '''
+        semilla = {
+            'entropy': self.semilla.entropy,
+            'spawn_key': list(self.semilla.spawn_key),
+            'pool_size': self.semilla.pool_size,
+            'n_children_spawned': self.semilla.n_children_spawned,
+        }
+        return {
+            'rng': np.array(json.dumps(self.rng.bit_generator.state)),
+            'semilla': np.array(json.dumps(semilla)),
+            'tam_bloque': np.array(self.tam_bloque),
+            'caras': np.array(self._caras[self._i_caras:], dtype=np.int8),
+            'monedas': np.array(self._monedas[self._i_monedas:], dtype=np.int8),
+            'uniformes': np.array(self._uniformes[self._i_uniformes:], dtype=np.float64),
+        }
+
+    @staticmethod
+    def desde_estado(estado: dict[str, np.ndarray]) -> 'FuenteDados':
+        '''
+        Rearma una fuente a partir de estado(): sigue con la misma secuencia.
+        '''
+        fuente = FuenteDados(np.random.SeedSequence(**json.loads(str(estado['semilla']))), int(estado['tam_bloque']))
+        fuente.rng.bit_generator.state = json.loads(str(estado['rng']))
+        fuente._caras = estado['caras'].tolist()
+        fuente._monedas = estado['monedas'].tolist()
+        fuente._uniformes = estado['uniformes'].tolist()
+        return fuente
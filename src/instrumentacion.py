@@ -0,0 +1,152 @@
+import sys
+import json
+import time
+import cProfile
+import numpy as np
+
+
+class InstrumentacionEntrenamiento:
+    def __init__(self, salida=None, cada: int = 10000, ventana_perfil: tuple[int, int] | None = None,
+                 perfilador=None, perfil_filename: str | None = None):
+        '''
+        Mide un entrenamiento de AgenteQLearning.entrenar: tiempo en elegir la
+        acción, en el paso del ambiente y en actualizar la tabla, pasos y
+        episodios por segundo, largo medio de los episodios y tamaño de la
+        tabla. Cada cada episodios escribe un registro JSON por línea.
+        Si no se pasa al agente, el entrenamiento no mide nada. Los episodios
+        se cuentan desde el principio del entrenamiento (episodios_entrenados),
+        también al reanudar un checkpoint.
+
+        Args:
+            salida (str | file, optional): Archivo (o nombre) donde escribir los registros. Defaults to sys.stdout.
+            cada (int, optional): Episodios entre dos registros. Defaults to 10000.
+            ventana_perfil (tuple[int, int], optional): Episodios [inicio, fin) durante los que se perfila
+                (contados desde el principio, también al reanudar).
+            perfilador (optional): Objeto con enable() y disable(), por ejemplo un perfilador por muestreo.
+                Defaults to cProfile.Profile().
+            perfil_filename (str, optional): Dónde guardar las estadísticas del perfilador, si las soporta (dump_stats).
+        '''
+
+        if salida is None:
+            salida = sys.stdout
+        self._cerrar_salida = isinstance(salida, str)
+        self.salida = open(salida, 'w') if self._cerrar_salida else salida
+        self.cada = cada
+        self.ventana_perfil = ventana_perfil
+        if ventana_perfil is not None and perfilador is None:
+            perfilador = cProfile.Profile()
+        self.perfilador = perfilador
+        self.perfil_filename = perfil_filename
+        self.perfilando = False
+        self.agente = None
+        self.registros: list[dict] = []
+        self._originales: list[tuple] = []
+        self._reiniciar_ventana()
+
+    def _reiniciar_ventana(self):
+        self.episodios = 0
+        self.pasos = 0
+        self.t_elegir = 0.0
+        self.t_step = 0.0
+        self.t_actualizar = 0.0
+        self.inicio = time.perf_counter()
+
+    def empezar(self, agente) -> None:
+        '''
+        Reemplaza elegir_accion, ambiente.step y actualizar_tabla del agente por
+        versiones que miden cuánto tardan (y cuentan los pasos), hasta cerrar.
+        '''
+        self.agente = agente
+        medidas = [(agente, 'elegir_accion', 't_elegir'), (agente.ambiente, 'step', 't_step'),
+                   (agente, 'actualizar_tabla', 't_actualizar')]
+        for objeto, nombre, total in medidas:
+            self._originales.append((objeto, nombre, vars(objeto).get(nombre)))
+            setattr(objeto, nombre, self._medir(getattr(objeto, nombre), total))
+
+    def _medir(self, funcion, total: str):
+        reloj = time.perf_counter
+
+        def medida(*args):
+            inicio = reloj()
+            resultado = funcion(*args)
+            setattr(self, total, getattr(self, total) + reloj() - inicio)
+            if total == 't_step':
+                self.pasos += 1
+            return resultado
+        return medida
+
+    def _restaurar(self) -> None:
+        for objeto, nombre, original in self._originales:
+            if original is None:
+                delattr(objeto, nombre)
+            else:
+                setattr(objeto, nombre, original)
+        self._originales = []
+
+    def antes_de_episodio(self, episodio: int) -> None:
+        if self.ventana_perfil is None:
+            return
+        inicio, fin = self.ventana_perfil
+        if not self.perfilando and inicio <= episodio < fin:
+            self.perfilador.enable()
+            self.perfilando = True
+        elif self.perfilando and episodio >= fin:
+            self._terminar_perfil()
+
+    def _terminar_perfil(self):
+        self.perfilador.disable()
+        self.perfilando = False
+        if self.perfil_filename is not None and hasattr(self.perfilador, 'dump_stats'):
+            self.perfilador.dump_stats(self.perfil_filename)
+        self.ventana_perfil = None
+
+    def despues_de_episodio(self, episodio: int, tabla) -> None:
+        self.episodios += 1
+        if self.episodios == self.cada:
+            self.emitir(episodio + 1, tabla)
+
+    def emitir(self, episodio: int, tabla) -> None:
+        '''
+        Escribe el registro de los episodios desde el anterior y empieza otra ventana.
+        '''
+        if self.episodios == 0:
+            return
+        transcurrido = time.perf_counter() - self.inicio
+        # Si el agente no cuenta las visitas, se toman como visitados los
+        # estados con algún Q-value distinto del inicial.
+        visitados = self.agente.visitados() if self.agente is not None else None
+        if visitados is None:
+            visitados = (tabla.valores[:tabla.filas_usadas] != tabla.valor_inicial).any(axis=2)
+        registro = {
+            'episodio': episodio,
+            'segundos': transcurrido,
+            'episodios_por_s': self.episodios / transcurrido,
+            'pasos_por_s': self.pasos / transcurrido,
+            'largo_medio_episodio': self.pasos / self.episodios,
+            's_elegir_accion': self.t_elegir,
+            's_step': self.t_step,
+            's_actualizar_tabla': self.t_actualizar,
+            'filas_tabla': tabla.filas_usadas,
+            'estados_visitados': int(np.count_nonzero(visitados)),
+            'bytes_tabla': tabla.valores.nbytes,
+        }
+        self.registros.append(registro)
+        self.salida.write(json.dumps(registro) + '\n')
+        self.salida.flush()
+        self._reiniciar_ventana()
+
+    def cerrar(self, episodio: int, tabla) -> None:
+        '''
+        Emite los episodios que quedaron sin registrar, devuelve al agente sus
+        métodos originales y cierra el perfilador y la salida.
+
+        Args:
+            episodio (int): Episodios entrenados en total al terminar.
+            tabla (TablaQ): Tabla del agente.
+        '''
+        self._restaurar()
+        self.emitir(episodio, tabla)
+        if self.perfilando:
+            self._terminar_perfil()
+        if self._cerrar_salida:
+            self.salida.close()
@@ -1,6 +1,9 @@
+import copy
 from random import randint
+from functools import partial
 from abc import ABC, abstractmethod
 from utils import puntaje_y_no_usados, JUGADA_PLANTARSE, JUGADA_TIRAR
+from fuente_dados import FuenteDados
 
 class Jugador(ABC):
     @abstractmethod
@@ -8,14 +11,41 @@ class Jugador(ABC):
               verbose: bool = False) -> tuple[int, list[int]]:
         pass
 
+    def jugar_con_puntaje(self, puntaje_total: int, puntaje_turno: int, dados: list[int],
+                          puntaje_tirada: int, no_usados: list[int]) -> tuple[int, list[int]]:
+        '''
+        Igual que jugar, pero con el puntaje de la tirada y los dados no usados
+        que JuegoDiezMil ya calculó, para no volver a puntuar los dados. Si el
+        jugador vuelve a tirar devolviendo la misma lista no_usados, el juego
+        no tiene que separar ni volver a puntuar nada. Por defecto llama a
+        jugar, así que los jugadores que no la redefinen siguen funcionando.
+        '''
+        return self.jugar(puntaje_total, puntaje_turno, dados)
+
+    def usar_dados(self, dados: FuenteDados) -> None:
+        '''
+        Hace que el jugador saque de dados los números aleatorios que use, para
+        que una evaluación con semilla sea reproducible sin tocar el estado
+        global del módulo random. Los jugadores deterministas no la redefinen.
+        '''
+
 class JugadorAleatorio(Jugador):
-    def __init__(self, nombre: str):
+    def __init__(self, nombre: str, dados: FuenteDados | None = None):
         self.nombre = nombre
+        # Sin fuente de dados se usa el módulo random.
+        self._moneda = dados.moneda if dados is not None else partial(randint, 0, 1)
+
+    def usar_dados(self, dados: FuenteDados) -> None:
+        self._moneda = dados.moneda
 
     def jugar(self, puntaje_total: int, puntaje_turno: int, dados: list[int],
               verbose: bool = False) -> tuple[int, list[int]]:
         (puntaje, no_usados) = puntaje_y_no_usados(dados)
-        if randint(0, 1) == 0:
+        return self.jugar_con_puntaje(puntaje_total, puntaje_turno, dados, puntaje, no_usados)
+
+    def jugar_con_puntaje(self, puntaje_total: int, puntaje_turno: int, dados: list[int],
+                          puntaje_tirada: int, no_usados: list[int]) -> tuple[int, list[int]]:
+        if self._moneda() == 0:
             return (JUGADA_PLANTARSE, [])
         else:
             return (JUGADA_TIRAR, no_usados)
@@ -27,3 +57,16 @@ class JugadorSiempreSePlanta(Jugador):
     def jugar(self, puntaje_total: int, puntaje_turno: int, dados: list[int],
               verbose: bool = False) -> tuple[int, list[int]]:
         return (JUGADA_PLANTARSE, [])
+
+    def jugar_con_puntaje(self, puntaje_total: int, puntaje_turno: int, dados: list[int],
+                          puntaje_tirada: int, no_usados: list[int]) -> tuple[int, list[int]]:
+        return (JUGADA_PLANTARSE, [])
+
+def con_dados_propios(jugador: Jugador, semilla: int) -> Jugador:
+    '''
+    Devuelve una copia del jugador que saca sus números aleatorios de una
+    FuenteDados derivada de semilla, independiente de la de los dados del juego.
+    '''
+    jugador = copy.copy(jugador)
+    jugador.usar_dados(FuenteDados(semilla).hijos(1)[0])
+    return jugador
@@ -0,0 +1,151 @@
+import json
+import argparse
+import numpy as np
+from utils import distribucion_tirada
+from simulador import PASO_PUNTOS, PUNTAJE_OBJETIVO
+from politica import guardar_politica_binaria, EJES_PARTIDA
+from qlearning import TablaQ
+
+
+# Con 0 dados disponibles se vuelven a tirar los 6, igual que en JuegoDiezMil.
+DADOS_A_TIRAR: list[int] = [6, 1, 2, 3, 4, 5, 6]
+
+
+def _armar_resultados() -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    '''
+    Arma, para cada cantidad de dados disponibles, los resultados de tirar que
+    suman puntos: pasos de 50 puntos que suma, dados que quedan y probabilidad.
+    Las filas se rellenan con probabilidad 0. También devuelve la probabilidad
+    de perder el turno.
+    '''
+    distribuciones = [[r for r in distribucion_tirada(n) if r[0] > 0] for n in DADOS_A_TIRAR]
+    largo = max(len(d) for d in distribuciones)
+    pasos = np.zeros((7, largo), dtype=np.int64)
+    restantes = np.zeros((7, largo), dtype=np.int64)
+    probs = np.zeros((7, largo))
+    for dados, distribucion in enumerate(distribuciones):
+        for i, (puntaje, quedan, prob) in enumerate(distribucion):
+            pasos[dados, i] = puntaje // PASO_PUNTOS
+            restantes[dados, i] = quedan
+            probs[dados, i] = prob
+    prob_perder = 1 - probs.sum(axis=1)
+    return pasos, restantes, probs, prob_perder
+
+
+PASOS, RESTANTES, PROBS, PROB_PERDER = _armar_resultados()
+
+
+def resolver_turno(puntos_max: int = 20000) -> np.ndarray:
+    '''
+    Calcula la política que maximiza el puntaje esperado de un turno, con
+    inducción hacia atrás sobre (puntos_turno, cant_dados): como cada tirada
+    que suma agrega al menos 50 puntos, alcanza con recorrer los puntos de
+    mayor a menor. A partir de puntos_max se asume que el jugador se planta.
+
+    Args:
+        puntos_max (int, optional): Puntos del turno hasta los que se resuelve. Defaults to 20000.
+
+    Returns:
+        np.ndarray: Q-values (puntaje esperado del turno) con forma (filas, 7, 2),
+            en el formato de TablaQ.
+    '''
+    filas = puntos_max // PASO_PUNTOS + 1
+    valor = np.zeros((filas + PASOS.max(), 7))
+    valor[filas:] = (np.arange(filas, len(valor)) * PASO_PUNTOS)[:, None]
+    q = np.zeros((filas, 7, 2))
+
+    for fila in range(filas - 1, -1, -1):
+        tirar = (PROBS * valor[fila + PASOS, RESTANTES]).sum(axis=1)
+        plantarse = fila * PASO_PUNTOS
+        q[fila, :, 0] = plantarse
+        q[fila, :, 1] = tirar
+        valor[fila] = np.maximum(plantarse, tirar)
+    return q
+
+
+def resolver_partida(objetivo: int = PUNTAJE_OBJETIVO, tolerancia: float = 1e-12, max_iteraciones: int = 100) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Calcula la política que minimiza la cantidad esperada de turnos para
+    llegar a objetivo, con el puntaje total como parte del estado.
+
+    Para cada puntaje total t (de mayor a menor) se resuelve el turno con
+    iteración de políticas: perder el turno vuelve a t, así que cada valor del
+    turno es afín en W(t) (turnos esperados desde t) y, fijada la política,
+    W(t) = a / (1 - b) sale exacto. Se mejora la política con ese W(t) hasta
+    que deja de cambiar.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Q-values (menos los turnos esperados, para
+            que el mayor sea el mejor) con forma (totales, filas, 7, 2), y los
+            turnos esperados desde cada puntaje total.
+    '''
+    totales = objetivo // PASO_PUNTOS
+    filas = totales + 1
+    # turnos[k]: turnos esperados desde un puntaje total de k * 50 (0 si ya llegó).
+    turnos = np.zeros(totales + filas + PASOS.max())
+    q = np.zeros((totales, filas, 7, 2))
+
+    for t in range(totales - 1, -1, -1):
+        # Con límite o más filas de puntos del turno ya llega: plantarse vale 1 turno.
+        limite = totales - t
+        plantarse = 1 + turnos[t:t + filas]
+        a = np.ones((filas + PASOS.max(), 7))
+        b = np.zeros((filas + PASOS.max(), 7))
+        a_tirar = np.zeros((limite, 7))
+        b_tirar = np.zeros((limite, 7))
+        w = turnos[t + 1] if t + 1 < totales else 1.0
+
+        for _ in range(max_iteraciones):
+            for fila in range(limite - 1, -1, -1):
+                siguientes = fila + PASOS
+                a_tirar[fila] = PROB_PERDER + (PROBS * a[siguientes, RESTANTES]).sum(axis=1)
+                b_tirar[fila] = PROB_PERDER + (PROBS * b[siguientes, RESTANTES]).sum(axis=1)
+                # Ante un empate se planta, igual que JugadorEntrenado.
+                tirar = a_tirar[fila] + b_tirar[fila] * w < plantarse[fila]
+                a[fila] = np.where(tirar, a_tirar[fila], plantarse[fila])
+                b[fila] = np.where(tirar, b_tirar[fila], 0)
+
+            # El turno empieza tirando los 6 dados sin puntos acumulados.
+            w_nuevo = a_tirar[0, 6] / (1 - b_tirar[0, 6])
+            convergio = abs(w_nuevo - w) <= tolerancia
+            w = w_nuevo
+            if convergio:
+                break
+
+        turnos[t] = w
+        q[t, :, :, 0] = -plantarse[:, None]
+        q[t, :limite, :, 1] = -(a_tirar + b_tirar * w)
+        q[t, limite:, :, 1] = -(1 + PROB_PERDER * w)
+
+    return q, turnos[:totales]
+
+
+def main(salida_filename, con_total, puntos_max):
+    if con_total:
+        q, turnos = resolver_partida()
+        print(f'Turnos esperados con la política óptima: {turnos[0]}')
+        guardar_politica_binaria(q, salida_filename, EJES_PARTIDA)
+        return
+
+    q = resolver_turno(puntos_max)
+    print(f'Puntaje esperado por turno con la política óptima: {q[0, 6, 1]}')
+    if salida_filename.endswith('.json'):
+        with open(salida_filename, 'w') as jsonfile:
+            json.dump(TablaQ(valores=q).a_dict(), jsonfile, indent=4)
+    else:
+        guardar_politica_binaria(q, salida_filename)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Calcular la política óptima de 'Diez Mil' con programación dinámica sobre las probabilidades exactas de los dados.")
+
+    # Agregar argumentos
+    parser.add_argument('salida_filename', type=str, help='Archivo de la política a generar (.json o binario)')
+    parser.add_argument('-t', '--con_total', action='store_true', help='Incluir el puntaje total en el estado y minimizar los turnos esperados (solo formato binario)')
+    parser.add_argument('-p', '--puntos_max', type=int, default=20000, help='Puntos del turno hasta los que se resuelve la política sin puntaje total (default: 20000)')
+
+    # Parsear los argumentos
+    args = parser.parse_args()
+
+    # Llamar a la función principal con los argumentos proporcionados
+    main(args.salida_filename, args.con_total, args.puntos_max)
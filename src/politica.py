@@ -0,0 +1,103 @@
+import os
+import json
+import numpy as np
+
+# Formato binario de políticas:
+#   - MAGIA (8 bytes)
+#   - largo del encabezado (uint32, little endian)
+#   - encabezado en JSON (utf-8), con los ejes del arreglo y su forma
+#   - relleno hasta un múltiplo de ALINEACION
+#   - los Q-values como arreglo contiguo (orden C)
+# Los datos quedan alineados, así que se pueden mapear en memoria sin copiarlos
+# y varios procesos que leen el mismo archivo comparten las páginas.
+MAGIA: bytes = b'DIEZMIL\x01'
+ALINEACION: int = 64
+EJES_TURNO: list[str] = ['puntos_turno', 'cant_dados', 'accion']
+EJES_PARTIDA: list[str] = ['puntaje_total'] + EJES_TURNO
+
+
+def guardar_politica_binaria(valores: np.ndarray, filename: str, ejes: list[str] = EJES_TURNO, paso_puntos: int = 50,
+                             paso_total: int | None = None):
+    '''
+    Guarda un arreglo de Q-values en el formato binario de políticas.
+
+    Args:
+        valores (np.ndarray): Q-values, con un eje por cada elemento de ejes.
+        filename (str): Nombre/Path del archivo a generar.
+        ejes (list[str], optional): Nombre de cada eje de valores. Defaults to EJES_TURNO.
+        paso_puntos (int, optional): Puntos que separan dos filas consecutivas. Defaults to 50.
+        paso_total (int, optional): Puntos totales que separan dos posiciones del eje
+            puntaje_total, si no son paso_puntos.
+    '''
+    assert len(ejes) == valores.ndim
+    valores = np.ascontiguousarray(valores, dtype='<f8')
+    encabezado = {
+        'version': 1,
+        'ejes': ejes,
+        'forma': list(valores.shape),
+        'dtype': valores.dtype.str,
+        'paso_puntos': paso_puntos,
+    }
+    if paso_total is not None:
+        encabezado['paso_total'] = paso_total
+    encabezado = json.dumps(encabezado).encode('utf-8')
+    inicio = len(MAGIA) + 4 + len(encabezado)
+    relleno = -inicio % ALINEACION
+
+    # Se escribe aparte y se reemplaza de una vez, para no pisar las páginas
+    # de otro proceso que tenga mapeada la versión anterior.
+    temporal = filename + '.tmp'
+    with open(temporal, 'wb') as archivo:
+        archivo.write(MAGIA)
+        archivo.write(len(encabezado).to_bytes(4, 'little'))
+        archivo.write(encabezado)
+        archivo.write(b'\x00' * relleno)
+        archivo.write(valores.tobytes())
+    os.replace(temporal, filename)
+
+
+def es_politica_binaria(filename: str) -> bool:
+    '''
+    Indica si el archivo está en el formato binario de políticas.
+    '''
+    with open(filename, 'rb') as archivo:
+        return archivo.read(len(MAGIA)) == MAGIA
+
+
+def leer_politica_binaria(filename: str, ejes: list[list[str]] = (EJES_TURNO, EJES_PARTIDA),
+                          paso_puntos: int = 50) -> tuple[np.ndarray, dict]:
+    '''
+    Mapea en memoria (solo lectura) una política en formato binario.
+
+    Args:
+        filename (str): Nombre/Path del archivo que contiene a la política.
+        ejes (list[list[str]], optional): Listas de ejes que se aceptan. Defaults to
+            (EJES_TURNO, EJES_PARTIDA).
+        paso_puntos (int, optional): Puntos entre dos filas que espera quien lee. Defaults to 50.
+
+    Raises:
+        ValueError: Si el archivo no está en el formato, sus ejes o su paso_puntos no son los
+            esperados, o su paso_total no es múltiplo de paso_puntos.
+
+    Returns:
+        tuple[np.ndarray, dict]: Los Q-values mapeados y el encabezado.
+    '''
+    with open(filename, 'rb') as archivo:
+        if archivo.read(len(MAGIA)) != MAGIA:
+            raise ValueError(f'{filename} no es una política en formato binario')
+        largo = int.from_bytes(archivo.read(4), 'little')
+        encabezado = json.loads(archivo.read(largo).decode('utf-8'))
+    if list(encabezado['ejes']) not in [list(aceptados) for aceptados in ejes]:
+        raise ValueError(f"{filename} tiene ejes {encabezado['ejes']}, se esperaba uno de {list(ejes)}")
+    if encabezado.get('paso_puntos') != paso_puntos:
+        raise ValueError(f"{filename} tiene paso_puntos {encabezado.get('paso_puntos')}, se esperaba {paso_puntos}")
+    if len(encabezado['forma']) != len(encabezado['ejes']):
+        raise ValueError(f'{filename} tiene una forma que no coincide con sus ejes')
+    if encabezado.get('paso_total', paso_puntos) % paso_puntos:
+        raise ValueError(f"{filename} tiene paso_total {encabezado['paso_total']}, que no es múltiplo de {paso_puntos}")
+
+    inicio = len(MAGIA) + 4 + largo
+    inicio += -inicio % ALINEACION
+    valores = np.memmap(filename, dtype=np.dtype(encabezado['dtype']), mode='r',
+                        offset=inicio, shape=tuple(encabezado['forma']))
+    return valores, encabezado
@@ -0,0 +1,84 @@
+import time
+import argparse
+import threading
+import numpy as np
+from fuente_dados import FuenteDados
+from servidor_politica import JugadorRemoto, crear_servidor
+
+
+def _estados_al_azar(fuente: FuenteDados, cantidad: int) -> list[tuple[int, int, list[int]]]:
+    return [(50 * int(fuente.uniforme() * 200), 50 * int(fuente.uniforme() * 20), fuente.caras(1 + int(fuente.uniforme() * 6)))
+            for _ in range(cantidad)]
+
+
+def _cliente(direccion: str, pedidos: int, tam_lote: int, semilla: int, latencias: list[float]):
+    jugador = JugadorRemoto('carga', direccion)
+    lotes = [_estados_al_azar(FuenteDados(semilla), tam_lote) for _ in range(min(pedidos, 100))]
+    try:
+        jugador.decidir_lote(lotes[0])  # Calentamiento.
+        for i in range(pedidos):
+            inicio = time.perf_counter()
+            jugador.decidir_lote(lotes[i % len(lotes)])
+            latencias.append(time.perf_counter() - inicio)
+    finally:
+        jugador.cerrar()
+
+
+def prueba_carga(direccion: str, pedidos: int = 10000, tam_lote: int = 1, conexiones: int = 1) -> dict:
+    '''
+    Manda pedidos pedidos de tam_lote estados por cada una de conexiones
+    conexiones en paralelo y mide la latencia de cada pedido.
+
+    Returns:
+        dict: Latencias p50 y p99 (en microsegundos), pedidos y decisiones por segundo.
+    '''
+    latencias: list[float] = []
+    hilos = [threading.Thread(target=_cliente, args=(direccion, pedidos, tam_lote, i, latencias))
+             for i in range(conexiones)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    segundos = time.perf_counter() - inicio
+
+    p50, p99 = np.percentile(np.array(latencias) * 1e6, [50, 99])
+    return {
+        'p50_us': float(p50),
+        'p99_us': float(p99),
+        'pedidos_por_s': len(latencias) / segundos,
+        'decisiones_por_s': len(latencias) * tam_lote / segundos,
+    }
+
+
+def main(direccion, politica_filename, pedidos, tam_lote, conexiones):
+    servidor = None
+    if politica_filename is not None:
+        # Levanta el servidor en este mismo proceso, en un hilo aparte.
+        servidor = crear_servidor({'politica': politica_filename}, direccion)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    try:
+        resultado = prueba_carga(direccion, pedidos, tam_lote, conexiones)
+    finally:
+        if servidor is not None:
+            servidor.shutdown()
+            servidor.server_close()
+    print(f"Latencia p50: {resultado['p50_us']:.1f} us | p99: {resultado['p99_us']:.1f} us")
+    print(f"Pedidos por segundo: {resultado['pedidos_por_s']:.0f} | Decisiones por segundo: {resultado['decisiones_por_s']:.0f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Medir latencia y capacidad de servidor_politica.")
+
+    # Agregar argumentos
+    parser.add_argument('-d', '--direccion', type=str, default='127.0.0.1:8642', help="'host:puerto' o ruta de un socket Unix (default: 127.0.0.1:8642)")
+    parser.add_argument('-f', '--politica_filename', type=str, default=None, help='Si se pasa, levanta el servidor con esta política en el mismo proceso')
+    parser.add_argument('-n', '--pedidos', type=int, default=10000, help='Pedidos por conexión (default: 10000)')
+    parser.add_argument('-b', '--tam_lote', type=int, default=1, help='Estados por pedido (default: 1)')
+    parser.add_argument('-c', '--conexiones', type=int, default=1, help='Conexiones en paralelo (default: 1)')
+
+    # Parsear los argumentos
+    args = parser.parse_args()
+
+    # Llamar a la función principal con los argumentos proporcionados
+    main(args.direccion, args.politica_filename, args.pedidos, args.tam_lote, args.conexiones)
@@ -1,16 +1,35 @@
+import os
 import json
 import random
+from functools import partial
 import numpy as np
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
 from jugador import Jugador
-from utils import puntaje_y_no_usados, JUGADA_PLANTARSE, JUGADA_TIRAR
+from fuente_dados import FuenteDados
+from utils import puntaje_y_no_usados, distribucion_tirada, MuestreadorAlias, JUGADA_PLANTARSE, JUGADA_TIRAR
+from simulador import tirar_dados, PASO_PUNTOS, PUNTAJE_OBJETIVO
+from cronogramas import CronogramaEpsilon
+from politica import guardar_politica_binaria, leer_politica_binaria, es_politica_binaria, EJES_TURNO, EJES_PARTIDA
+
+# Para cada cantidad de dados, muestreador de (puntos, dados restantes) con la
+# distribución exacta de las 6**n tiradas posibles.
+MUESTREADORES_TIRADA: list[MuestreadorAlias] = [MuestreadorAlias(distribucion_tirada(n)) for n in range(7)]
 
 class AmbienteDiezMil:
-    def __init__(self):
+    def __init__(self, verbose: bool = False, dados: FuenteDados | None = None):
         '''
         Definir las variables internas de un ambiente de Diez Mil.
+
+        Args:
+            verbose (bool, optional): Si es True, tira los dados uno por uno e imprime cada tirada.
+                Si no, sortea directamente el resultado de la tirada. Defaults to False.
+            dados (FuenteDados, optional): Fuente de los números aleatorios. Si es None, se usa el módulo random.
         '''
 
+        self.verbose = verbose
+        self.dados = dados
         self.turno_actual = 1
         self.estado_actual = EstadoDiezMil(6, 0)
         self.puntos_totales = 0
@@ -28,9 +47,27 @@ class AmbienteDiezMil:
             list[int]: Resultados de la tirada.
         '''
 
+        if self.dados is not None:
+            return self.dados.caras(cant_dados)
         min_cara, max_cara = self.min_max_cara_dado
         return [random.randint(min_cara, max_cara) for _ in range(cant_dados)]
 
+    def tirada_resumida(self, cant_dados) -> tuple[int, int]:
+        '''
+        Devuelve el puntaje de una tirada y cuántos dados quedan sin usar, sin
+        tirar los dados uno por uno: se sortea con un muestreador de alias
+        armado con la distribución exacta de las tiradas.
+
+        Args:
+            cant_dados (int): Cantidad de dados a tirar.
+
+        Returns:
+            tuple[int, int]: Puntaje de la tirada y cantidad de dados no usados.
+        '''
+
+        u = self.dados.uniforme() if self.dados is not None else random.random()
+        return MUESTREADORES_TIRADA[cant_dados].muestrear(u)
+
     def reset(self):
         '''
         Reinicia el ambiente para volver a realizar un episodio.
@@ -68,8 +105,13 @@ class AmbienteDiezMil:
                 self.estado_actual.fin_turno()
                 self.turno_actual += 1
         else:
-            tirada = self.tirada(self.estado_actual.dados)
-            puntos_tirada, dados_restantes = puntaje_y_no_usados(tirada)
+            if self.verbose:
+                tirada = self.tirada(self.estado_actual.dados)
+                puntos_tirada, no_usados = puntaje_y_no_usados(tirada)
+                dados_restantes = len(no_usados)
+                print(f"{''.join(map(str, tirada))} --> {puntos_tirada} puntos")
+            else:
+                puntos_tirada, dados_restantes = self.tirada_resumida(self.estado_actual.dados)
 
             if puntos_tirada == 0:
                 if self.estado_actual.dados == 0:
@@ -79,12 +121,89 @@ class AmbienteDiezMil:
                 self.estado_actual.fin_turno()
                 self.turno_actual += 1
             else:
-                self.estado_actual.dados = len(dados_restantes)
+                self.estado_actual.dados = dados_restantes
                 self.estado_actual.puntos_turno += puntos_tirada
 
         return recompensa, partida_terminada
 
 
+def _actualizar_repetidos(q_plana: np.ndarray, indices: np.ndarray, objetivos: np.ndarray, alpha: float) -> None:
+    '''
+    Aplica en q_plana una actualización de Q-learning por cada par (indices[i],
+    objetivos[i]). Varios ambientes pueden pasar por el mismo par (estado,
+    acción) en un paso. Aplicar c actualizaciones seguidas hacia el mismo
+    objetivo equivale a acercarse una fracción 1 - (1 - alpha)^c, así que se
+    usa el objetivo promedio con esa fracción.
+    '''
+    cuentas = np.bincount(indices, minlength=q_plana.size)
+    sumas = np.bincount(indices, weights=objetivos, minlength=q_plana.size)
+    usados = np.flatnonzero(cuentas)
+    c = cuentas[usados]
+    q_plana[usados] += (1 - (1 - alpha) ** c) * (sumas[usados] / c - q_plana[usados])
+
+
+class AmbienteDiezMilVectorizado:
+    def __init__(self, cant_ambientes: int, semilla: int | None = None):
+        '''
+        Mantiene cant_ambientes ambientes de Diez Mil independientes en arreglos,
+        con las mismas reglas y recompensas que AmbienteDiezMil.
+
+        Args:
+            cant_ambientes (int): Cantidad de ambientes.
+            semilla (int, optional): Semilla del generador de números aleatorios.
+        '''
+
+        self.cant_ambientes = cant_ambientes
+        self.rng = np.random.default_rng(semilla)
+        self.acciones_posibles = [JUGADA_PLANTARSE, JUGADA_TIRAR]
+        self.reset()
+
+    def reset(self):
+        '''
+        Reinicia todos los ambientes.
+        '''
+
+        self.turno_actual = np.ones(self.cant_ambientes, dtype=np.int64)
+        self.dados = np.full(self.cant_ambientes, 6, dtype=np.int64)
+        self.puntos_turno = np.zeros(self.cant_ambientes, dtype=np.int64)
+        self.puntos_totales = np.zeros(self.cant_ambientes, dtype=np.int64)
+
+    def step(self, acciones: np.ndarray) -> tuple[np.ndarray, np.ndarray, tuple[np.ndarray, np.ndarray]]:
+        '''
+        Aplica una acción en cada ambiente. Los ambientes cuyo episodio termina
+        se reinician solos, como en AmbienteDiezMil.step.
+
+        Args:
+            acciones (np.ndarray): Acción elegida para cada ambiente.
+
+        Returns:
+            tuple: Recompensas, flags de fin de episodio y el nuevo estado
+                (cantidad de dados, puntos del turno) de cada ambiente.
+        '''
+        plantarse = acciones == JUGADA_PLANTARSE
+        recompensas = self.puntos_turno.astype(np.float64)
+
+        puntos_totales = self.puntos_totales + np.where(plantarse, self.puntos_turno, 0)
+        terminados = plantarse & (puntos_totales >= 10000)
+        recompensas[terminados] = 10000 / self.turno_actual[terminados]
+
+        # Con 0 dados la tirada es vacía y no suma, igual que en AmbienteDiezMil.
+        puntos_tirada, restantes = tirar_dados(self.rng, self.dados)
+        perdio = ~plantarse & (puntos_tirada == 0)
+        recompensas[perdio] = -self.puntos_turno[perdio] / np.where(self.dados[perdio] == 0, 6, self.dados[perdio])
+
+        sumo = ~plantarse & ~perdio
+        self.puntos_totales = puntos_totales
+        self.puntos_turno = np.where(sumo, self.puntos_turno + puntos_tirada, 0)
+        self.dados = np.where(sumo, restantes, 6)
+        self.turno_actual += ~sumo
+
+        self.turno_actual[terminados] = 1
+        self.puntos_totales[terminados] = 0
+
+        return recompensas, terminados, (self.dados.copy(), self.puntos_turno.copy())
+
+
 class EstadoDiezMil:
     def __init__(self, dados, puntos_turno):
         '''
@@ -117,6 +236,253 @@ class EstadoDiezMil:
 
         return f'cant_dados: {self.dados} | puntos_turno: {self.puntos_turno}'
 
+class TablaQ:
+    def __init__(self, puntos_max: int = 20000, valores: np.ndarray | None = None, fija: bool = False,
+                 valor_inicial: float = 0.0):
+        '''
+        Tabla de Q-values indexada por enteros. El estado (dados, puntos_turno)
+        ocupa la fila puntos_turno // 50 y la columna dados de un arreglo
+        contiguo de NumPy con forma (filas, 7, 2), así que la tabla crece
+        agregando filas al final cuando aparecen puntos más altos.
+
+        Args:
+            puntos_max (int, optional): Puntos del turno que se reservan de entrada. Defaults to 20000.
+            valores (np.ndarray, optional): Q-values ya armados (por ejemplo, mapeados
+                desde una política binaria). Si se pasan, se ignora puntos_max.
+            fija (bool, optional): Si es True, la tabla no crece (por ejemplo, porque está en
+                memoria compartida) y los puntos que no entran usan la última fila. Defaults to False.
+            valor_inicial (float, optional): Q-value de los estados sin visitar (mayor a 0 para
+                una inicialización optimista). Defaults to 0.0.
+        '''
+
+        if valores is None:
+            valores = np.full((puntos_max // PASO_PUNTOS + 1, 7, 2), float(valor_inicial))
+        self.filas_usadas = len(valores)
+        self.fija = fija
+        self.valor_inicial = valor_inicial
+        self._reservar(valores)
+
+    def _reservar(self, valores: np.ndarray):
+        self.valores = valores
+        # Indexar un memoryview devuelve floats de Python, más rápido que
+        # indexar el arreglo de NumPy de a un elemento.
+        self.plana = memoryview(valores.reshape(-1))
+
+    def __getstate__(self):
+        # El memoryview no se puede mandar a otro proceso; se rearma al llegar.
+        return {'filas_usadas': self.filas_usadas, 'fija': self.fija, 'valor_inicial': self.valor_inicial,
+                'valores': np.asarray(self.valores)}
+
+    def __setstate__(self, estado):
+        self.filas_usadas = estado['filas_usadas']
+        self.fija = estado.get('fija', False)
+        self.valor_inicial = estado.get('valor_inicial', 0.0)
+        self._reservar(estado['valores'])
+
+    def indice(self, dados: int, puntos_turno: int) -> int:
+        '''
+        Devuelve la posición en plana del Q-value de plantarse en el estado dado.
+        El de tirar está en la posición siguiente.
+        '''
+        fila = puntos_turno // PASO_PUNTOS
+        if fila >= self.filas_usadas:
+            if self.fija:
+                fila = self.filas_usadas - 1
+            else:
+                self.asegurar_fila(fila)
+        return (fila * 7 + dados) * 2
+
+    def asegurar_fila(self, fila: int):
+        '''
+        Agranda la tabla (al menos al doble) para que incluya la fila dada.
+        '''
+        if fila >= len(self.valores):
+            nuevas = max(fila + 1, 2 * len(self.valores)) - len(self.valores)
+            self._reservar(np.concatenate([self.valores, np.full((nuevas, 7, 2), float(self.valor_inicial))]))
+        self.filas_usadas = max(self.filas_usadas, fila + 1)
+
+    def a_dict(self) -> dict[str, list[float]]:
+        '''
+        Devuelve la tabla en el formato de texto de guardar_politica.
+        '''
+        return {
+            f'cant_dados: {N} | puntos_turno: {fila * PASO_PUNTOS}': self.valores[fila, N].tolist()
+            for N in range(7)
+            for fila in range(self.filas_usadas)
+        }
+
+    @staticmethod
+    def desde_dict(politica: dict[str, list[float]], fija: bool = False) -> 'TablaQ':
+        '''
+        Arma una tabla a partir del formato de texto de guardar_politica.
+        Con fija=True (para solo leerla) no crece ante puntos más altos que los guardados.
+        '''
+        estados = []
+        for key, valores in politica.items():
+            dados, puntos = key.split(' | ')
+            estados.append((int(dados.split(': ')[1]), int(puntos.split(': ')[1]), valores))
+        tabla = TablaQ(max(puntos for _, puntos, _ in estados), fija=fija)
+        for dados, puntos, valores in estados:
+            tabla.valores[puntos // PASO_PUNTOS, dados] = valores
+        return tabla
+
+
+class TablaQTotal:
+    def __init__(self, paso_total: int = 500, puntos_max: int = 20000, dtype=np.float32,
+                 objetivo: int = PUNTAJE_OBJETIVO, valor_inicial: float = 0.0):
+        '''
+        Tabla de Q-values para el estado (dados, puntos_turno, puntaje_total).
+        El puntaje total se agrupa en baldes de paso_total puntos y cada balde
+        tiene su bloque de (filas, 7, 2) Q-values, como una TablaQ de filas
+        fijas. Los bloques se reservan recién cuando se visita el balde, uno
+        detrás de otro en un mismo arreglo, así que indice devuelve posiciones
+        de plana igual que TablaQ y el agente la usa sin cambios.
+
+        Memoria: cada bloque ocupa filas * 7 * 2 * itemsize bytes. Con los
+        valores por defecto (401 filas, float32) son 22.456 bytes, y los 20
+        baldes de 500 puntos por debajo de 10000 suman a lo sumo 449.120 bytes,
+        contra 8.982.400 de una tabla densa de float64 con un balde cada 50
+        puntos. Buscar un estado es O(1): una división, un acceso a la lista
+        de bloques y la misma cuenta de TablaQ.
+
+        Args:
+            paso_total (int, optional): Puntos totales de cada balde, múltiplo de PASO_PUNTOS. Defaults to 500.
+            puntos_max (int, optional): Puntos del turno que entran en un bloque; los mayores usan
+                la última fila. Defaults to 20000.
+            dtype (optional): Tipo de los Q-values. Defaults to np.float32.
+            objetivo (int, optional): Puntaje para ganar; los totales mayores usan el último balde.
+            valor_inicial (float, optional): Q-value de los estados sin visitar de un bloque recién
+                reservado. Defaults to 0.0.
+        '''
+
+        if paso_total <= 0 or paso_total % PASO_PUNTOS:
+            raise ValueError(f'paso_total tiene que ser un múltiplo positivo de {PASO_PUNTOS}, no {paso_total}')
+        self.paso_total = paso_total
+        self.valor_inicial = valor_inicial
+        self.filas = puntos_max // PASO_PUNTOS + 1
+        self.tam_bloque = self.filas * 7 * 2
+        # bloques[b]: posición en plana del bloque del balde b, o -1 si no se visitó.
+        self.bloques: list[int] = [-1] * -(-objetivo // paso_total)
+        self.bloques_usados = 0
+        self._reservar(np.zeros(0, dtype=dtype))
+
+    def _reservar(self, datos: np.ndarray):
+        self.datos = datos
+        self.plana = memoryview(datos)
+
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        del estado['plana']
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._reservar(self.datos)
+
+    @property
+    def valores(self) -> np.ndarray:
+        '''
+        Los bloques reservados, apilados como filas de una TablaQ (en el orden
+        en que se reservaron).
+        '''
+        return self.datos.reshape(-1, 7, 2)
+
+    @property
+    def filas_usadas(self) -> int:
+        return self.bloques_usados * self.filas
+
+    def indice(self, dados: int, puntos_turno: int, puntaje_total: int = 0) -> int:
+        '''
+        Devuelve la posición en plana del Q-value de plantarse en el estado dado.
+        El de tirar está en la posición siguiente.
+        '''
+        balde = min(puntaje_total // self.paso_total, len(self.bloques) - 1)
+        inicio = self.bloques[balde]
+        if inicio < 0:
+            inicio = self._reservar_bloque(balde)
+        return inicio + (min(puntos_turno // PASO_PUNTOS, self.filas - 1) * 7 + dados) * 2
+
+    def _reservar_bloque(self, balde: int) -> int:
+        inicio = self.bloques_usados * self.tam_bloque
+        if inicio + self.tam_bloque > len(self.datos):
+            # Se agranda al doble para que reservar bloques cueste O(1) amortizado.
+            datos = np.zeros(max(inicio + self.tam_bloque, 2 * len(self.datos)), dtype=self.datos.dtype)
+            datos[:len(self.datos)] = self.datos
+            self._reservar(datos)
+        if self.valor_inicial:
+            self.datos[inicio:inicio + self.tam_bloque] = self.valor_inicial
+        self.bloques[balde] = inicio
+        self.bloques_usados += 1
+        return inicio
+
+    def a_arreglo(self) -> np.ndarray:
+        '''
+        Devuelve la tabla densa en float64, con forma (baldes, filas, 7, 2) y
+        valor_inicial en los baldes no visitados, igual que si se reservaran.
+        '''
+        arreglo = np.full((len(self.bloques), self.filas, 7, 2), float(self.valor_inicial))
+        for balde, inicio in enumerate(self.bloques):
+            if inicio >= 0:
+                arreglo[balde] = self.datos[inicio:inicio + self.tam_bloque].reshape(self.filas, 7, 2)
+        return arreglo
+
+    def tablas(self, fija: bool = False) -> list[TablaQ]:
+        '''
+        Devuelve una TablaQ por balde, como las que usa JugadorEntrenado.
+        '''
+        return [TablaQ(valores=valores, fija=fija) for valores in self.a_arreglo()]
+
+    def a_dict(self) -> dict:
+        '''
+        Devuelve los baldes visitados en el formato de texto de guardar_politica,
+        con el puntaje total (inicio del balde) adelante. La primera clave,
+        paso_total, guarda el ancho de los baldes.
+        '''
+        politica = {'paso_total': self.paso_total}
+        for balde, inicio in enumerate(self.bloques):
+            if inicio < 0:
+                continue
+            valores = self.datos[inicio:inicio + self.tam_bloque].reshape(self.filas, 7, 2)
+            for N in range(7):
+                for fila in range(self.filas):
+                    politica[f'puntaje_total: {balde * self.paso_total} | cant_dados: {N} | puntos_turno: {fila * PASO_PUNTOS}'] = valores[fila, N].tolist()
+        return politica
+
+    @staticmethod
+    def desde_dict(politica: dict) -> 'TablaQTotal':
+        '''
+        Arma una tabla a partir del formato de texto de TablaQTotal.a_dict.
+
+        Raises:
+            ValueError: Si falta paso_total o no es un múltiplo de PASO_PUNTOS.
+        '''
+        if 'paso_total' not in politica:
+            raise ValueError('la política no indica paso_total')
+        estados = []
+        for key, valores in politica.items():
+            if key == 'paso_total':
+                continue
+            total, dados, puntos = (int(parte.split(': ')[1]) for parte in key.split(' | '))
+            estados.append((total, dados, puntos, valores))
+        tabla = TablaQTotal(int(politica['paso_total']), max(puntos for _, _, puntos, _ in estados), np.float64)
+        for total, dados, puntos, valores in estados:
+            i = tabla.indice(dados, puntos, total)
+            tabla.datos[i:i + 2] = valores
+        return tabla
+
+    @staticmethod
+    def apilar(tablas: list[TablaQ], paso_total: int) -> np.ndarray:
+        '''
+        Apila las tablas de cada balde de paso_total puntos totales (como las de
+        tablas() o las de JugadorEntrenado) en un arreglo (totales, filas, 7, 2)
+        con un balde cada PASO_PUNTOS puntos totales, que es como lo indexan
+        PoliticaTabla y compilar_umbrales. Se recortan a las filas de la más chica.
+        '''
+        filas = min(tabla.filas_usadas for tabla in tablas)
+        valores = np.stack([tabla.valores[:filas] for tabla in tablas])
+        return np.repeat(valores, paso_total // PASO_PUNTOS, axis=0)
+
+
 class AgenteQLearning:
     def __init__(
         self,
@@ -125,6 +491,12 @@ class AgenteQLearning:
         gamma: float,
         epsilon: float,
         *args,
+        dados: FuenteDados | None = None,
+        con_total: bool = False,
+        paso_total: int = 500,
+        cronograma_epsilon=None,
+        omega_visitas: float | None = None,
+        q_inicial: float = 0.0,
         **kwargs
     ):
         '''
@@ -135,41 +507,134 @@ class AgenteQLearning:
             alpha (float): Tasa de aprendizaje.
             gamma (float): Factor de descuento.
             epsilon (float): Probabilidad de explorar.
+            dados (FuenteDados, optional): Fuente de los números aleatorios de la política ε-greedy.
+                Si es None, se usa el módulo random.
+            con_total (bool, optional): Incluir el puntaje total en el estado, con una
+                TablaQTotal de baldes de paso_total puntos. Defaults to False.
+            paso_total (int, optional): Puntos totales de cada balde. Defaults to 500.
+            cronograma_epsilon (CronogramaEpsilon, optional): Si se pasa, epsilon pasa a ser
+                cronograma_epsilon(episodios_entrenados) y se actualiza al terminar cada episodio.
+            omega_visitas (float, optional): Si se pasa, cada par (estado, acción) aprende con
+                tasa max(alpha, 1 / n ** omega_visitas), donde n es la cantidad de veces que se
+                actualizó: los pares nuevos aprenden rápido y alpha queda como piso.
+                Conviene un valor entre 0.5 y 1.
+            q_inicial (float, optional): Q-value de los estados sin visitar. Con un valor
+                mayor que las recompensas (inicialización optimista), el agente prueba
+                las dos acciones de cada estado antes de descartar una. Defaults to 0.0.
+
+        Con omega_visitas o q_inicial el agente cuenta las visitas de cada par
+        (estado, acción) en visitas (ver visitados): con q_inicial distinto de 0
+        todos los Q-values arrancan distintos de 0 y no alcanza con mirarlos.
         '''
 
-        self.qlearning_tabla: dict[str, list[float]] = {}
+        self.con_total = con_total
+        self.paso_total = paso_total
+        self.cronograma_epsilon = cronograma_epsilon
+        self.omega_visitas = omega_visitas
+        self.q_inicial = q_inicial
+        self.cuenta_visitas = omega_visitas is not None or q_inicial != 0
+        if con_total:
+            self._indice_actual = self._indice_actual_con_total
+        if self.cuenta_visitas:
+            self.actualizar_tabla = self._actualizar_tabla_visitas
+        self.qlearning_tabla = self._tabla_nueva()
+        self.episodios_entrenados = 0
+        self.episodio_convergencia = None
         self.ambiente = ambiente
         self.alpha = alpha
         self.gamma = gamma
         self.epsilon = epsilon
+        self.dados = dados
+        if dados is not None:
+            self._moneda, self._uniforme = dados.moneda, dados.uniforme
+        else:
+            self._moneda, self._uniforme = partial(random.randint, 0, 1), random.random
+
+    def _tabla_nueva(self) -> TablaQ | TablaQTotal:
+        # Las visitas van en un arreglo paralelo a plana, que crece junto con la tabla.
+        self._reservar_visitas(np.zeros(0, dtype=np.int64))
+        if self.con_total:
+            return TablaQTotal(self.paso_total, valor_inicial=self.q_inicial)
+        return TablaQ(valor_inicial=self.q_inicial)
+
+    def _reservar_visitas(self, visitas: np.ndarray):
+        self.visitas = visitas
+        self._visitas = memoryview(visitas)
+
+    def _asegurar_visitas(self, largo: int):
+        if len(self._visitas) < largo:
+            visitas = np.zeros(largo, dtype=np.int64)
+            visitas[:len(self.visitas)] = self.visitas
+            self._reservar_visitas(visitas)
+
+    def visitados(self) -> np.ndarray | None:
+        '''
+        Devuelve qué estados de qlearning_tabla.valores[:filas_usadas] se
+        actualizaron alguna vez (con forma (filas, 7)), o None si el agente no
+        cuenta las visitas (ver cuenta_visitas).
+        '''
+        if not self.cuenta_visitas:
+            return None
+        tabla = self.qlearning_tabla
+        self._asegurar_visitas(len(tabla.plana))
+        return self.visitas.reshape(-1, 7, 2)[:tabla.filas_usadas].any(axis=2)
+
+    def _indice_actual(self) -> int:
+        estado = self.ambiente.estado_actual
+        return self.qlearning_tabla.indice(estado.dados, estado.puntos_turno)
+
+    def _indice_actual_con_total(self) -> int:
+        estado = self.ambiente.estado_actual
+        return self.qlearning_tabla.indice(estado.dados, estado.puntos_turno, self.ambiente.puntos_totales)
 
     def elegir_accion(self, eps_greedy=True):
         '''
         Selecciona una acción de acuerdo a una política ε-greedy.
         '''
-        qlearn_key = str(self.ambiente.estado_actual)
+        i = self._indice_actual()
+        q_plantarse = self.qlearning_tabla.plana[i]
+        q_tirar = self.qlearning_tabla.plana[i + 1]
 
         # Empate entre q-values
-        if self.qlearning_tabla[qlearn_key][0] == self.qlearning_tabla[qlearn_key][1]:
-            return random.randint(0, 1)
+        if q_plantarse == q_tirar:
+            return self._moneda()
 
         # Veo cual es la decision a tomar en caso de que salga explorar (p = epsilon)
-        decision_explorar = np.argmin(self.qlearning_tabla[qlearn_key])
+        decision_explorar = JUGADA_TIRAR if q_tirar < q_plantarse else JUGADA_PLANTARSE
 
-        if eps_greedy and random.uniform(0, 1) < self.epsilon:
+        if eps_greedy and self._uniforme() < self.epsilon:
             # Si sale explorar, exploro, si no, tomo la otra decision (notar que son solo 2 decisiones posibles)
             return decision_explorar
 
         return 1 - decision_explorar
 
-    def actualizar_tabla(self, key, recompensa, accion_elegida):
-        q_actual = self.qlearning_tabla[key][accion_elegida]
-        qlearn_siguiente_key = str(self.ambiente.estado_actual)
-        max_a = self.elegir_accion(eps_greedy=False)
-        max_q = self.qlearning_tabla[qlearn_siguiente_key][max_a]
-        self.qlearning_tabla[key][accion_elegida] += self.alpha * (recompensa + self.gamma * max_q - q_actual)
+    def actualizar_tabla(self, indice, recompensa, accion_elegida):
+        i_siguiente = self._indice_actual()
+        # _indice_actual puede agrandar la tabla y cambiar plana.
+        plana = self.qlearning_tabla.plana
+        max_q = max(plana[i_siguiente], plana[i_siguiente + 1])
+        q_actual = plana[indice + accion_elegida]
+        plana[indice + accion_elegida] = q_actual + self.alpha * (recompensa + self.gamma * max_q - q_actual)
+
+    def _actualizar_tabla_visitas(self, indice, recompensa, accion_elegida):
+        '''
+        Igual que actualizar_tabla, pero cuenta la visita y, con omega_visitas,
+        aprende con su tasa de aprendizaje.
+        '''
+        i_siguiente = self._indice_actual()
+        plana = self.qlearning_tabla.plana
+        self._asegurar_visitas(len(plana))
+        i = indice + accion_elegida
+        n = self._visitas[i] + 1
+        self._visitas[i] = n
+        alpha = max(self.alpha, n ** -self.omega_visitas) if self.omega_visitas is not None else self.alpha
+        max_q = max(plana[i_siguiente], plana[i_siguiente + 1])
+        q_actual = plana[i]
+        plana[i] = q_actual + alpha * (recompensa + self.gamma * max_q - q_actual)
 
-    def entrenar(self, episodios: int, verbose: bool = False) -> None:
+    def entrenar(self, episodios: int, verbose: bool = False, instrumentacion=None,
+                 checkpoint_filename: str | None = None, cada_checkpoint: int = 100000, continuar: bool = False,
+                 convergencia=None) -> None:
         '''
         Dada una cantidad de episodios, se repite el ciclo del algoritmo de Q-learning.
         Recomendación: usar tqdm para observar el progreso en los episodios.
@@ -177,26 +642,253 @@ class AgenteQLearning:
         Args:
             episodios (int): Cantidad de episodios a iterar.
             verbose (bool, optional): Flag para hacer visible qué ocurre en cada paso. Defaults to False.
+            instrumentacion (InstrumentacionEntrenamiento, optional): Si se pasa, mide el
+                tiempo de cada parte del ciclo y lo va registrando.
+            checkpoint_filename (str, optional): Si se pasa, se guarda un checkpoint
+                (guardar_checkpoint) cada cada_checkpoint episodios y al terminar.
+            cada_checkpoint (int, optional): Episodios entre dos checkpoints. Defaults to 100000.
+            continuar (bool, optional): Seguir entrenando la tabla actual (por ejemplo, la
+                de un checkpoint) en lugar de empezar de cero. Defaults to False.
+            convergencia (CriterioConvergencia, optional): Si se pasa, corta antes cuando la
+                tabla casi no cambia (ver CriterioConvergencia). El
+                episodio en el que cortó queda en episodio_convergencia (None si no convergió).
         '''
-        for N in range(7):
-            for Y in range(0, 20001, 50):
-
-                key = f'cant_dados: {N} | puntos_turno: {Y}'
-
-                self.qlearning_tabla[key] = [0, 0]
+        if not continuar:
+            self.qlearning_tabla = self._tabla_nueva()
+            self.episodios_entrenados = 0
+        if self.cronograma_epsilon is not None:
+            self.epsilon = self.cronograma_epsilon(self.episodios_entrenados)
+        self.episodio_convergencia = None
+        if convergencia is not None:
+            convergencia.reiniciar()
 
         if verbose:
             rango_episodios = tqdm(range(episodios))
         else:
             rango_episodios = range(episodios)
 
-        for _ in rango_episodios:
-            termino_episodio = False
-            while not termino_episodio:
-                accion_elegida = self.elegir_accion()
-                qlearn_key = str(self.ambiente.estado_actual)
-                recompensa, termino_episodio = self.ambiente.step(accion_elegida)
-                self.actualizar_tabla(qlearn_key, recompensa, accion_elegida)
+        if instrumentacion is not None:
+            instrumentacion.empezar(self)
+        try:
+            for _ in rango_episodios:
+                if instrumentacion is not None:
+                    instrumentacion.antes_de_episodio(self.episodios_entrenados)
+                termino_episodio = False
+                while not termino_episodio:
+                    accion_elegida = self.elegir_accion()
+                    indice = self._indice_actual()
+                    recompensa, termino_episodio = self.ambiente.step(accion_elegida)
+                    self.actualizar_tabla(indice, recompensa, accion_elegida)
+                if instrumentacion is not None:
+                    instrumentacion.despues_de_episodio(self.episodios_entrenados, self.qlearning_tabla)
+                if self._terminar_episodio(checkpoint_filename, cada_checkpoint, convergencia):
+                    break
+        finally:
+            if instrumentacion is not None:
+                instrumentacion.cerrar(self.episodios_entrenados, self.qlearning_tabla)
+
+        if checkpoint_filename is not None:
+            self.guardar_checkpoint(checkpoint_filename)
+
+    def _terminar_episodio(self, checkpoint_filename, cada_checkpoint, convergencia) -> bool:
+        '''
+        Cuenta el episodio, guarda el checkpoint y revisa la convergencia si
+        corresponde. Devuelve True si hay que dejar de entrenar.
+        '''
+        self.episodios_entrenados += 1
+        n = self.episodios_entrenados
+        if self.cronograma_epsilon is not None:
+            self.epsilon = self.cronograma_epsilon(n)
+        if checkpoint_filename is not None and n % cada_checkpoint == 0:
+            self.guardar_checkpoint(checkpoint_filename)
+        if convergencia is not None and n % convergencia.ventana == 0 and convergencia.revisar(self.qlearning_tabla, n, self.visitados()):
+            self.episodio_convergencia = n
+            return True
+        return False
+
+    def entrenar_vectorizado(self, episodios: int, ambientes: AmbienteDiezMilVectorizado, verbose: bool = False) -> None:
+        '''
+        Igual que entrenar, pero avanza en simultáneo todos los ambientes de
+        ambientes y actualiza la tabla con las transiciones de todos a la vez.
+        Termina cuando se completan al menos episodios episodios entre todos.
+
+        Args:
+            episodios (int): Cantidad de episodios a iterar.
+            ambientes (AmbienteDiezMilVectorizado): Ambientes con los que interactúa el agente.
+            verbose (bool, optional): Flag para mostrar el progreso en los episodios. Defaults to False.
+        '''
+        assert not self.con_total, 'entrenar_vectorizado no soporta el puntaje total en el estado'
+        assert self.omega_visitas is None, 'entrenar_vectorizado no soporta alpha por visitas'
+        tabla = self.qlearning_tabla = self._tabla_nueva()
+        rng = ambientes.rng
+        cant = ambientes.cant_ambientes
+        ambientes.reset()
+        dados, puntos = ambientes.dados.copy(), ambientes.puntos_turno.copy()
+
+        barra = tqdm(total=episodios) if verbose else None
+        episodios_completos = 0
+        while episodios_completos < episodios:
+            filas = puntos // PASO_PUNTOS
+            q_actual = tabla.valores[filas, dados]
+
+            # Misma política ε-greedy que elegir_accion, con empates al azar.
+            mejor = (q_actual[:, 1] > q_actual[:, 0]).astype(np.int64)
+            acciones = np.where(rng.random(cant) < self.epsilon, 1 - mejor, mejor)
+            empate = q_actual[:, 0] == q_actual[:, 1]
+            acciones[empate] = rng.integers(0, 2, int(empate.sum()))
+
+            recompensas, terminados, (dados_sig, puntos_sig) = ambientes.step(acciones)
+
+            filas_sig = puntos_sig // PASO_PUNTOS
+            tabla.asegurar_fila(int(filas_sig.max()))
+            q = tabla.valores
+            objetivos = recompensas + self.gamma * q[filas_sig, dados_sig].max(axis=1)
+
+            indices = (filas * 7 + dados) * 2 + acciones
+            _actualizar_repetidos(q.reshape(-1), indices, objetivos, self.alpha)
+            if self.cuenta_visitas:
+                self._asegurar_visitas(len(tabla.plana))
+                np.add.at(self.visitas, indices, 1)
+
+            dados, puntos = dados_sig, puntos_sig
+            completados = int(terminados.sum())
+            episodios_completos += completados
+            if self.cronograma_epsilon is not None:
+                self.epsilon = self.cronograma_epsilon(episodios_completos)
+            if barra is not None:
+                barra.update(completados)
+        self.episodios_entrenados = episodios_completos
+        if barra is not None:
+            barra.close()
+
+    def entrenar_paralelo(self, episodios: int, procesos: int, semilla: int | None = None,
+                          verbose: bool = False, puntos_max: int = 50000) -> None:
+        '''
+        Entrena con procesos procesos a la vez, estilo Hogwild: cada uno tiene
+        su propio ambiente y su propia FuenteDados (derivada de semilla) y todos
+        actualizan sin locks la misma tabla, en memoria compartida. Como las
+        actualizaciones de un par (estado, acción) son chicas y cada paso toca
+        dos posiciones, que de vez en cuando se pisen dos escrituras no cambia a
+        dónde converge la tabla. Al terminar, la tabla queda en qlearning_tabla
+        (recortada a las filas visitadas), lista para guardar_politica.
+
+        Args:
+            episodios (int): Cantidad total de episodios, repartidos entre los procesos.
+            procesos (int): Cantidad de procesos.
+            semilla (int, optional): Semilla de la que se derivan las de cada proceso.
+            verbose (bool, optional): Mostrar el progreso del primer proceso. Defaults to False.
+            puntos_max (int, optional): Puntos del turno que entran en la tabla compartida,
+                que no puede crecer: los turnos con más puntos usan la última fila. Defaults to 50000.
+        '''
+        assert not self.con_total, 'entrenar_paralelo no soporta el puntaje total en el estado'
+        assert self.cronograma_epsilon is None and self.omega_visitas is None and self.q_inicial == 0, \
+            'entrenar_paralelo no soporta cronogramas ni inicialización optimista'
+        forma = (puntos_max // PASO_PUNTOS + 1, 7, 2)
+        memoria = shared_memory.SharedMemory(create=True, size=int(np.prod(forma)) * 8)
+        try:
+            valores = np.ndarray(forma, dtype=np.float64, buffer=memoria.buf)
+            valores[:] = 0
+            semillas = np.random.SeedSequence(semilla).spawn(procesos)
+            cantidades = [episodios // procesos + (i < episodios % procesos) for i in range(procesos)]
+            with ProcessPoolExecutor(max_workers=procesos) as executor:
+                futuros = [
+                    executor.submit(_entrenar_trabajador, memoria.name, forma, self.alpha, self.gamma, self.epsilon,
+                                    cantidad, semilla_trabajador, verbose and i == 0)
+                    for i, (cantidad, semilla_trabajador) in enumerate(zip(cantidades, semillas))
+                ]
+                for futuro in futuros:
+                    futuro.result()
+
+            visitadas = np.flatnonzero(valores.any(axis=(1, 2)))
+            filas = max(int(visitadas[-1]) + 1 if len(visitadas) else 1, 20000 // PASO_PUNTOS + 1)
+            self.qlearning_tabla = TablaQ(valores=valores[:filas].copy())
+            self.episodios_entrenados = episodios
+            del valores
+        finally:
+            memoria.close()
+            memoria.unlink()
+
+    def guardar_checkpoint(self, filename: str):
+        '''
+        Guarda todo lo necesario para seguir el entrenamiento exactamente donde
+        quedó: la tabla, los episodios entrenados, los hiperparámetros y el
+        estado de los números aleatorios (de la FuenteDados del agente y del
+        ambiente, o del módulo random). Se llama entre episodios, cuando el
+        ambiente está recién reiniciado. Se escribe un .npz sin comprimir en un
+        archivo aparte y se reemplaza de una vez, así que un corte a mitad de
+        la escritura deja el checkpoint anterior.
+
+        Args:
+            filename (str): Nombre/Path del archivo a generar.
+        '''
+        tabla = self.qlearning_tabla
+        datos = {
+            'valores': tabla.valores[:tabla.filas_usadas],
+            'episodios_entrenados': np.array(self.episodios_entrenados),
+            'hiperparametros': np.array([self.alpha, self.gamma, self.epsilon]),
+            'cronogramas': np.array(json.dumps({
+                'cronograma_epsilon': self.cronograma_epsilon.a_dict() if self.cronograma_epsilon else None,
+                'omega_visitas': self.omega_visitas,
+                'q_inicial': self.q_inicial,
+            })),
+        }
+        if self.cuenta_visitas:
+            datos['visitas'] = self.visitas
+        if self.con_total:
+            datos['bloques_total'] = np.array(tabla.bloques)
+            datos['forma_total'] = np.array([tabla.paso_total, tabla.filas])
+        if self.dados is not None:
+            datos.update({f'dados_{k}': v for k, v in self.dados.estado().items()})
+        if self.ambiente.dados is not None and self.ambiente.dados is not self.dados:
+            datos.update({f'dados_ambiente_{k}': v for k, v in self.ambiente.dados.estado().items()})
+        if self.dados is None or self.ambiente.dados is None:
+            datos['random'] = np.array(json.dumps(random.getstate()))
+
+        temporal = filename + '.tmp'
+        with open(temporal, 'wb') as archivo:
+            np.savez(archivo, **datos)
+        os.replace(temporal, filename)
+
+    @staticmethod
+    def cargar_checkpoint(filename: str) -> 'AgenteQLearning':
+        '''
+        Rearma un agente (y su ambiente) desde un checkpoint de guardar_checkpoint.
+        Para seguir entrenando, llamar a entrenar con continuar=True.
+        '''
+        with np.load(filename) as datos:
+            def fuente(prefijo: str) -> FuenteDados | None:
+                claves = {k[len(prefijo):]: datos[k] for k in datos.files if k.startswith(prefijo)}
+                return FuenteDados.desde_estado(claves) if claves else None
+
+            dados = fuente('dados_') if 'dados_rng' in datos.files else None
+            dados_ambiente = fuente('dados_ambiente_') if 'dados_ambiente_rng' in datos.files else dados
+            if 'random' in datos.files:
+                version, interno, gauss = json.loads(str(datos['random']))
+                random.setstate((version, tuple(interno), gauss))
+
+            alpha, gamma, epsilon = datos['hiperparametros'].tolist()
+            con_total = 'bloques_total' in datos.files
+            paso_total = int(datos['forma_total'][0]) if con_total else 500
+            cronogramas = json.loads(str(datos['cronogramas'])) if 'cronogramas' in datos.files else {}
+            cronograma_epsilon = cronogramas.get('cronograma_epsilon')
+            agente = AgenteQLearning(AmbienteDiezMil(dados=dados_ambiente), alpha, gamma, epsilon, dados=dados,
+                                     con_total=con_total, paso_total=paso_total,
+                                     cronograma_epsilon=CronogramaEpsilon.desde_dict(cronograma_epsilon) if cronograma_epsilon else None,
+                                     omega_visitas=cronogramas.get('omega_visitas'),
+                                     q_inicial=cronogramas.get('q_inicial', 0.0))
+            if 'visitas' in datos.files:
+                agente._reservar_visitas(np.array(datos['visitas']))
+            if con_total:
+                tabla = TablaQTotal(paso_total, (int(datos['forma_total'][1]) - 1) * PASO_PUNTOS, datos['valores'].dtype,
+                                    valor_inicial=agente.q_inicial)
+                tabla.bloques = datos['bloques_total'].tolist()
+                tabla.bloques_usados = sum(inicio >= 0 for inicio in tabla.bloques)
+                tabla._reservar(np.array(datos['valores']).reshape(-1))
+                agente.qlearning_tabla = tabla
+            else:
+                agente.qlearning_tabla = TablaQ(valores=np.array(datos['valores']), valor_inicial=agente.q_inicial)
+            agente.episodios_entrenados = int(datos['episodios_entrenados'])
+        return agente
 
     def guardar_politica(self, filename: str):
         '''
@@ -207,12 +899,50 @@ class AgenteQLearning:
         '''
 
         with open(filename, 'w') as jsonfile:
-            json.dump(self.qlearning_tabla, jsonfile, indent=4)
+            json.dump(self.qlearning_tabla.a_dict(), jsonfile, indent=4)
+
+    def guardar_politica_binaria(self, filename: str):
+        '''
+        Almacena la política del agente en el formato binario de politica.py,
+        que JugadorEntrenado carga mapeándolo en memoria.
+
+        Args:
+            filename (str): Nombre/Path del archivo a generar.
+        '''
+
+        tabla = self.qlearning_tabla
+        if self.con_total:
+            guardar_politica_binaria(tabla.a_arreglo(), filename, EJES_PARTIDA,
+                                     paso_total=tabla.paso_total)
+        else:
+            guardar_politica_binaria(tabla.valores[:tabla.filas_usadas], filename)
+
+def _entrenar_trabajador(nombre_memoria: str, forma: tuple, alpha: float, gamma: float, epsilon: float,
+                         episodios: int, semilla: np.random.SeedSequence, verbose: bool) -> None:
+    '''
+    Proceso de entrenar_paralelo: entrena sobre la tabla en memoria compartida.
+    '''
+    memoria = shared_memory.SharedMemory(name=nombre_memoria)
+    try:
+        dados = FuenteDados(semilla)
+        agente = AgenteQLearning(AmbienteDiezMil(dados=dados), alpha, gamma, epsilon, dados=dados)
+        agente.qlearning_tabla = TablaQ(valores=np.ndarray(forma, dtype=np.float64, buffer=memoria.buf), fija=True)
+        agente.entrenar(episodios, verbose, continuar=True)
+        # La memoria compartida no se puede cerrar mientras haya vistas sobre ella.
+        agente.qlearning_tabla.plana.release()
+        del agente
+    finally:
+        memoria.close()
+
 
 class JugadorEntrenado(Jugador):
     def __init__(self, nombre: str, filename_politica: str):
         self.nombre = nombre
+        # Las políticas que dependen del puntaje total (por ejemplo, las de
+        # optimo.py) tienen una TablaQ por cada balde de paso_total puntos totales.
+        self.paso_total = PASO_PUNTOS
         self.politica = self._leer_politica(filename_politica)
+        self.con_total = isinstance(self.politica, list)
 
     def _leer_politica(self, filename: str, SEP: str = ','):
         '''
@@ -221,17 +951,45 @@ class JugadorEntrenado(Jugador):
 
         Args:
             filename (str): Nombre/Path del archivo que contiene a una política almacenada. 
+                Puede estar en JSON (guardar_politica) o en el formato binario
+                (guardar_politica_binaria), que se mapea en memoria sin parsearlo.
+
+        Las tablas se cargan fijas: el jugador solo las lee (a veces desde varios
+        hilos, como en servidor_politica.py) y un puntaje del turno más alto que
+        los guardados usa la última fila en vez de agrandarlas.
         '''
 
+        if es_politica_binaria(filename):
+            valores, encabezado = leer_politica_binaria(filename, [EJES_TURNO, EJES_PARTIDA], PASO_PUNTOS)
+            if encabezado['ejes'] == EJES_PARTIDA:
+                self.paso_total = encabezado.get('paso_total', PASO_PUNTOS)
+                return [TablaQ(valores=valores_total, fija=True) for valores_total in valores]
+            return TablaQ(valores=valores, fija=True)
+
         with open(filename, 'r') as jsonfile:
             politica = json.load(jsonfile)
 
-        return politica
+        if 'paso_total' in politica:
+            tabla = TablaQTotal.desde_dict(politica)
+            self.paso_total = tabla.paso_total
+            return tabla.tablas(fija=True)
+        return TablaQ.desde_dict(politica, fija=True)
+
+    def a_arreglo(self) -> np.ndarray:
+        '''
+        Devuelve los Q-values de la política: (filas, 7, 2), o (totales, filas, 7, 2)
+        con un balde cada PASO_PUNTOS puntos totales si depende del puntaje total.
+        '''
+        if self.con_total:
+            return TablaQTotal.apilar(self.politica, self.paso_total)
+        return self.politica.valores[:self.politica.filas_usadas]
 
     def jugar(
         self,
+        puntaje_total: int,
         puntaje_turno: int,
         dados: list[int],
+        verbose: bool = False,
     ) -> tuple[int, list[int]]:
         '''
         Devuelve una jugada y los dados a tirar.
@@ -245,12 +1003,36 @@ class JugadorEntrenado(Jugador):
             tuple[int,list[int]]: Una jugada y la lista de dados a tirar.
         '''
         nuevos_puntos, no_usados = puntaje_y_no_usados(dados)
+        return self.jugar_con_puntaje(puntaje_total, puntaje_turno, dados, nuevos_puntos, no_usados)
 
-        estado = f'cant_dados: {len(no_usados)} | puntos_turno: {puntaje_turno + nuevos_puntos}'
-        jugada = self.politica[estado]
-        jugada = np.argmax(jugada)
-
-        if jugada == 0:
-            return (JUGADA_PLANTARSE, [])
-        elif jugada == 1:
+    def jugar_con_puntaje(self, puntaje_total: int, puntaje_turno: int, dados: list[int],
+                          nuevos_puntos: int, no_usados: list[int]) -> tuple[int, list[int]]:
+        if self.con_total:
+            tabla = self.politica[min(puntaje_total // self.paso_total, len(self.politica) - 1)]
+        else:
+            tabla = self.politica
+        i = tabla.indice(len(no_usados), puntaje_turno + nuevos_puntos)
+        # Igual que np.argmax, ante un empate se planta.
+        if tabla.plana[i + 1] > tabla.plana[i]:
             return (JUGADA_TIRAR, no_usados)
+        else:
+            return (JUGADA_PLANTARSE, [])
+
+
+def cargar_jugador(filename: str, nombre: str | None = None) -> Jugador:
+    '''
+    Carga un jugador desde un archivo: umbrales de umbrales.py o una política
+    de JugadorEntrenado (JSON o binaria).
+    '''
+    # umbrales.py importa este módulo, así que JugadorUmbral se importa recién acá.
+    from umbrales import JugadorUmbral
+
+    nombre = nombre or filename
+    try:
+        with open(filename, 'r') as jsonfile:
+            contenido = json.load(jsonfile)
+        if 'umbrales' in contenido:
+            return JugadorUmbral(nombre, np.array(contenido['umbrales']))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        pass
+    return JugadorEntrenado(nombre, filename)
@@ -0,0 +1,416 @@
+import io
+import os
+import json
+import pickle
+import tempfile
+import unittest
+import numpy as np
+from qlearning import (AmbienteDiezMil, AmbienteDiezMilVectorizado, AgenteQLearning, JugadorEntrenado, TablaQ,
+                       TablaQTotal, _actualizar_repetidos)
+from fuente_dados import FuenteDados
+from cronogramas import CronogramaEpsilon
+from simulador import PoliticaTabla
+from instrumentacion import InstrumentacionEntrenamiento
+from utils import JUGADA_PLANTARSE
+from politica import guardar_politica_binaria, leer_politica_binaria, EJES_TURNO, EJES_PARTIDA
+import convertir_politica
+
+
+class PerfiladorDePrueba:
+    def __init__(self, agente):
+        self.agente = agente
+        self.llamadas = []
+
+    def enable(self):
+        self.llamadas.append(('enable', self.agente.episodios_entrenados))
+
+    def disable(self):
+        self.llamadas.append(('disable', self.agente.episodios_entrenados))
+
+
+def _agente_de_prueba(**kwargs) -> AgenteQLearning:
+    dados = FuenteDados(0)
+    return AgenteQLearning(AmbienteDiezMil(dados=dados), 0.1, 0.9, 0.1, dados=dados, **kwargs)
+
+
+class TestEntrenarVectorizado(unittest.TestCase):
+    def test_pares_repetidos_en_un_paso(self):
+        alpha = 0.1
+        q = np.array([2.0, 0.0, 5.0])
+        _actualizar_repetidos(q, np.array([0, 0, 0, 2]), np.array([10.0, 10.0, 10.0, 7.0]), alpha)
+
+        # Tres actualizaciones seguidas hacia 10 desde 2, una hacia 7 desde 5.
+        esperado = 2.0
+        for _ in range(3):
+            esperado += alpha * (10.0 - esperado)
+        self.assertAlmostEqual(q[0], esperado)
+        self.assertAlmostEqual(q[0], 2.0 + (1 - (1 - alpha) ** 3) * 8.0)
+        self.assertEqual(q[1], 0.0)
+        self.assertAlmostEqual(q[2], 5.0 + alpha * 2.0)
+
+    def test_reinicio_al_terminar(self):
+        ambientes = AmbienteDiezMilVectorizado(2, semilla=0)
+        ambientes.turno_actual[:] = 7
+        ambientes.puntos_totales[:] = [9800, 100]
+        ambientes.puntos_turno[:] = 300
+        ambientes.dados[:] = 2
+        recompensas, terminados, (dados, puntos) = ambientes.step(np.full(2, JUGADA_PLANTARSE))
+
+        np.testing.assert_array_equal(terminados, [True, False])
+        self.assertAlmostEqual(recompensas[0], 10000 / 7)
+        self.assertEqual(recompensas[1], 300)
+        # El que terminó arranca una partida nueva; el otro pasa al turno siguiente.
+        np.testing.assert_array_equal(ambientes.turno_actual, [1, 8])
+        np.testing.assert_array_equal(ambientes.puntos_totales, [0, 400])
+        np.testing.assert_array_equal(dados, [6, 6])
+        np.testing.assert_array_equal(puntos, [0, 0])
+
+class TestTablaQ(unittest.TestCase):
+    def test_dict_ida_y_vuelta(self):
+        tabla = TablaQ(1000)
+        tabla.valores[:] = np.random.default_rng(0).normal(size=tabla.valores.shape)
+        leida = TablaQ.desde_dict(tabla.a_dict())
+        self.assertEqual(leida.filas_usadas, tabla.filas_usadas)
+        np.testing.assert_array_equal(leida.valores[:leida.filas_usadas], tabla.valores)
+
+    def test_indice_agranda_la_tabla(self):
+        tabla = TablaQ(100)
+        tabla.plana[tabla.indice(3, 100)] = 1.5
+        i = tabla.indice(2, 500)
+        self.assertEqual(i, (10 * 7 + 2) * 2)
+        self.assertEqual(tabla.filas_usadas, 11)
+        self.assertGreaterEqual(len(tabla.valores), 11)
+        # Lo que ya estaba se conserva y plana apunta al arreglo nuevo.
+        self.assertEqual(tabla.valores[2, 3, 0], 1.5)
+        tabla.plana[i + 1] = 4.0
+        self.assertEqual(tabla.valores[10, 2, 1], 4.0)
+
+class TestTablaQTotal(unittest.TestCase):
+    def test_indice_reserva_bloques(self):
+        tabla = TablaQTotal(paso_total=1000, puntos_max=500)
+        self.assertEqual(tabla.filas, 11)
+        i = tabla.indice(2, 100, 3500)
+        self.assertEqual(tabla.bloques[3], 0)
+        self.assertEqual(i, (2 * 7 + 2) * 2)
+        tabla.plana[i + 1] = 2.5
+
+        # Otro balde reserva el bloque siguiente y agranda los datos sin perder lo anterior.
+        j = tabla.indice(6, 50, 0)
+        self.assertEqual(tabla.bloques[0], tabla.tam_bloque)
+        self.assertEqual(j, tabla.tam_bloque + (1 * 7 + 6) * 2)
+        self.assertEqual(tabla.bloques_usados, 2)
+        self.assertEqual(tabla.valores[2, 2, 1], 2.5)
+
+        # Los puntos del turno de más usan la última fila y los totales de más, el último balde.
+        self.assertEqual(tabla.indice(1, 5000, 0), tabla.tam_bloque + (10 * 7 + 1) * 2)
+        self.assertEqual(tabla.indice(1, 0, 50000), tabla.indice(1, 0, 9999))
+        self.assertEqual(tabla.bloques_usados, 3)
+
+    def test_dict_ida_y_vuelta_con_baldes_salteados(self):
+        # Con los baldes 0 y 3000 nada más, el paso no se puede deducir de las claves.
+        tabla = TablaQTotal(paso_total=1000, puntos_max=300, dtype=np.float64)
+        rng = np.random.default_rng(0)
+        for total in (3000, 0):
+            for dados in range(7):
+                for puntos in range(0, 350, 50):
+                    i = tabla.indice(dados, puntos, total)
+                    tabla.plana[i:i + 2] = rng.normal(size=2)
+        leida = TablaQTotal.desde_dict(tabla.a_dict())
+        self.assertEqual(leida.paso_total, 1000)
+        self.assertEqual([b >= 0 for b in leida.bloques], [b >= 0 for b in tabla.bloques])
+        np.testing.assert_array_equal(leida.a_arreglo(), tabla.a_arreglo())
+
+    def test_paso_total_invalido(self):
+        with self.assertRaises(ValueError):
+            TablaQTotal(paso_total=120)
+        with self.assertRaises(ValueError):
+            TablaQTotal.desde_dict({'puntaje_total: 0 | cant_dados: 1 | puntos_turno: 0': [0.0, 1.0]})
+
+    def test_jugador_entrenado_respeta_el_paso(self):
+        tabla = TablaQTotal(paso_total=1000, puntos_max=300, dtype=np.float64)
+        # indice puede agrandar los datos: plana se lee después.
+        i, j = tabla.indice(2, 100, 0), tabla.indice(2, 100, 3000)
+        tabla.plana[i + 1] = 1.0
+        tabla.plana[j] = 1.0
+        with tempfile.TemporaryDirectory() as directorio:
+            filename = os.path.join(directorio, 'politica.json')
+            with open(filename, 'w') as jsonfile:
+                json.dump(tabla.a_dict(), jsonfile)
+            jugador = JugadorEntrenado('total', filename)
+        self.assertEqual(jugador.paso_total, 1000)
+        valores = jugador.a_arreglo()
+        # Un balde cada 50 puntos totales: 1000 // 50 filas por balde.
+        self.assertEqual(valores.shape, (10 * 20, 7, 7, 2))
+        self.assertEqual(valores[19, 2, 2, 1], 1.0)
+        self.assertEqual(valores[60, 2, 2, 0], 1.0)
+        # Solo se lee: un puntaje del turno enorme no agranda las tablas.
+        jugador.jugar(3000, 10 ** 9, [2, 3])
+        self.assertEqual(jugador.a_arreglo().shape, valores.shape)
+
+    def test_convertir_a_binaria(self):
+        tabla = TablaQTotal(paso_total=1000, puntos_max=300, dtype=np.float64)
+        i = tabla.indice(3, 200, 4000)
+        tabla.plana[i + 1] = 2.0
+        with tempfile.TemporaryDirectory() as directorio:
+            json_filename = os.path.join(directorio, 'politica.json')
+            bin_filename = os.path.join(directorio, 'politica.bin')
+            with open(json_filename, 'w') as jsonfile:
+                json.dump(tabla.a_dict(), jsonfile)
+            convertir_politica.main(json_filename, bin_filename)
+            binaria = JugadorEntrenado('binaria', bin_filename)
+            self.assertEqual(binaria.paso_total, 1000)
+            np.testing.assert_array_equal(binaria.a_arreglo(), JugadorEntrenado('json', json_filename).a_arreglo())
+            del binaria
+
+    def test_checkpoint_ida_y_vuelta(self):
+        agente = _agente_de_prueba(con_total=True, paso_total=1000)
+        agente.entrenar(30)
+        with tempfile.TemporaryDirectory() as directorio:
+            filename = os.path.join(directorio, 'checkpoint.npz')
+            agente.guardar_checkpoint(filename)
+            leido = AgenteQLearning.cargar_checkpoint(filename)
+        self.assertTrue(leido.con_total)
+        self.assertEqual(leido.qlearning_tabla.paso_total, 1000)
+        self.assertEqual(leido.qlearning_tabla.bloques, agente.qlearning_tabla.bloques)
+        np.testing.assert_array_equal(leido.qlearning_tabla.a_arreglo(), agente.qlearning_tabla.a_arreglo())
+
+
+class TestPoliticaBinaria(unittest.TestCase):
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directorio.name, 'politica.bin')
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def test_ida_y_vuelta_mapeada(self):
+        valores = np.random.default_rng(0).normal(size=(20, 7, 2))
+        guardar_politica_binaria(valores, self.filename)
+        leidos, encabezado = leer_politica_binaria(self.filename)
+        self.assertIsInstance(leidos, np.memmap)
+        self.assertFalse(leidos.flags.writeable)
+        np.testing.assert_array_equal(leidos, valores)
+        self.assertEqual(encabezado['ejes'], EJES_TURNO)
+        del leidos
+
+    def test_rechaza_ejes_o_paso_distintos(self):
+        guardar_politica_binaria(np.zeros((3, 20, 7, 2)), self.filename, EJES_PARTIDA, paso_puntos=100)
+        with self.assertRaises(ValueError):
+            leer_politica_binaria(self.filename, [EJES_TURNO], 100)
+        with self.assertRaises(ValueError):
+            leer_politica_binaria(self.filename, [EJES_PARTIDA], 50)
+        leidos, _ = leer_politica_binaria(self.filename, [EJES_PARTIDA], 100)
+        self.assertEqual(leidos.shape, (3, 20, 7, 2))
+        del leidos
+
+    def test_jugador_entrenado_no_agranda_la_tabla(self):
+        valores = np.random.default_rng(0).normal(size=(20, 7, 2))
+        guardar_politica_binaria(valores, self.filename)
+        json_filename = os.path.join(self.directorio.name, 'politica.json')
+        with open(json_filename, 'w') as jsonfile:
+            json.dump(TablaQ(valores=valores.copy()).a_dict(), jsonfile)
+        for filename in [self.filename, json_filename]:
+            jugador = JugadorEntrenado('fijo', filename)
+            # Los puntos que no entran usan la última fila.
+            self.assertEqual(jugador.jugar(0, 10 ** 9, [2, 3]), jugador.jugar(0, 19 * 50, [2, 3]))
+            self.assertEqual(len(jugador.politica.valores), 20)
+            del jugador
+
+    def test_rechaza_paso_total_no_multiplo(self):
+        guardar_politica_binaria(np.zeros((3, 20, 7, 2)), self.filename, EJES_PARTIDA, paso_total=120)
+        with self.assertRaises(ValueError):
+            leer_politica_binaria(self.filename)
+
+
+class TestInstrumentacion(unittest.TestCase):
+    def test_cero_episodios(self):
+        agente = _agente_de_prueba()
+        perfilador = PerfiladorDePrueba(agente)
+        instrumentacion = InstrumentacionEntrenamiento(io.StringIO(), 10, (0, 5), perfilador)
+        agente.entrenar(0, instrumentacion=instrumentacion)
+        self.assertEqual(instrumentacion.registros, [])
+        self.assertEqual(perfilador.llamadas, [])
+
+    def test_registros_y_metodos_restaurados(self):
+        agente = _agente_de_prueba(omega_visitas=0.7)
+        instrumentacion = InstrumentacionEntrenamiento(io.StringIO(), 10)
+        agente.entrenar(25, instrumentacion=instrumentacion)
+        self.assertEqual([r['episodio'] for r in instrumentacion.registros], [10, 20, 25])
+        self.assertTrue(all(r['largo_medio_episodio'] >= 1 for r in instrumentacion.registros))
+        self.assertNotIn('elegir_accion', vars(agente))
+        self.assertNotIn('step', vars(agente.ambiente))
+        self.assertEqual(agente.actualizar_tabla, agente._actualizar_tabla_visitas)
+
+    def test_ventana_perfil_al_reanudar(self):
+        # La ventana se cuenta desde el principio del entrenamiento, no desde que se reanudó.
+        agente = _agente_de_prueba()
+        agente.entrenar(20)
+        perfilador = PerfiladorDePrueba(agente)
+        instrumentacion = InstrumentacionEntrenamiento(io.StringIO(), 100, (25, 30), perfilador)
+        agente.entrenar(20, instrumentacion=instrumentacion, continuar=True)
+        self.assertEqual(perfilador.llamadas, [('enable', 25), ('disable', 30)])
+        self.assertEqual(instrumentacion.registros[-1]['episodio'], 40)
+
+        # Si se reanuda dentro de la ventana, se perfila desde ahí hasta el final.
+        perfilador = PerfiladorDePrueba(agente)
+        instrumentacion = InstrumentacionEntrenamiento(io.StringIO(), 100, (30, 100), perfilador)
+        agente.entrenar(5, instrumentacion=instrumentacion, continuar=True)
+        self.assertEqual(perfilador.llamadas, [('enable', 40), ('disable', 45)])
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directorio.name, 'checkpoint.npz')
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def assertReanudarIgualQueSeguido(self, **kwargs):
+        seguido = _agente_de_prueba(**kwargs)
+        seguido.entrenar(60)
+
+        cortado = _agente_de_prueba(**kwargs)
+        cortado.entrenar(25, checkpoint_filename=self.filename, cada_checkpoint=25)
+        reanudado = AgenteQLearning.cargar_checkpoint(self.filename)
+        self.assertEqual(reanudado.episodios_entrenados, 25)
+        reanudado.entrenar(35, continuar=True)
+
+        self.assertEqual(reanudado.episodios_entrenados, 60)
+        self.assertEqual(reanudado.epsilon, seguido.epsilon)
+        np.testing.assert_array_equal(reanudado.qlearning_tabla.valores[:reanudado.qlearning_tabla.filas_usadas],
+                                      seguido.qlearning_tabla.valores[:seguido.qlearning_tabla.filas_usadas])
+
+    def test_reanudar_igual_que_seguido(self):
+        self.assertReanudarIgualQueSeguido()
+
+    def test_reanudar_con_total(self):
+        self.assertReanudarIgualQueSeguido(con_total=True, paso_total=1000)
+
+    def test_reanudar_con_cronograma_y_visitas(self):
+        self.assertReanudarIgualQueSeguido(cronograma_epsilon=CronogramaEpsilon('exponencial', 0.5, 0.05, 40),
+                                           omega_visitas=0.7, q_inicial=1.0)
+
+
+class TestEntrenarParalelo(unittest.TestCase):
+    def test_entrena_la_tabla_compartida(self):
+        agente = _agente_de_prueba()
+        agente.entrenar_paralelo(200, 2, semilla=0, puntos_max=5000)
+        tabla = agente.qlearning_tabla
+        self.assertEqual(agente.episodios_entrenados, 200)
+        self.assertFalse(tabla.fija)
+        # Con puntos_max=5000 la tabla compartida tiene 101 filas y no crece.
+        self.assertEqual(tabla.filas_usadas, 5000 // 50 + 1)
+        # Los dos procesos escribieron en la tabla: se visitaron estados con y sin puntos del turno.
+        self.assertTrue(tabla.valores[0].any())
+        self.assertTrue(tabla.valores[1:].any())
+        self.assertTrue(np.isfinite(tabla.valores).all())
+
+
+class TestCronogramaEpsilon(unittest.TestCase):
+    def test_extremos(self):
+        lineal = CronogramaEpsilon('lineal', 0.5, 0.1, 100)
+        self.assertEqual(lineal(0), 0.5)
+        self.assertAlmostEqual(lineal(50), 0.3)
+        self.assertAlmostEqual(lineal(100), 0.1)
+        self.assertAlmostEqual(lineal(1000), 0.1)
+
+        exponencial = CronogramaEpsilon('exponencial', 0.4, 0.01, 100)
+        self.assertAlmostEqual(exponencial(0), 0.4)
+        self.assertAlmostEqual(exponencial(50), (0.4 * 0.01) ** 0.5)
+        self.assertAlmostEqual(exponencial(100), 0.01)
+        self.assertAlmostEqual(exponencial(1000), 0.01)
+
+    def test_dict_ida_y_vuelta(self):
+        cronograma = CronogramaEpsilon('exponencial', 0.3, 0.02, 70)
+        leido = CronogramaEpsilon.desde_dict(cronograma.a_dict())
+        self.assertEqual(leido.a_dict(), cronograma.a_dict())
+        self.assertEqual([leido(e) for e in range(0, 100, 7)], [cronograma(e) for e in range(0, 100, 7)])
+
+    def test_valores_invalidos(self):
+        with self.assertRaises(AssertionError):
+            CronogramaEpsilon('lineal', 1.0, 0.1, 10)
+        with self.assertRaises(AssertionError):
+            CronogramaEpsilon('exponencial', 0.5, 0.0, 10)
+        with self.assertRaises(AssertionError):
+            CronogramaEpsilon('exponencial', 0.0, 0.1, 10)
+
+
+class TestAlphaPorVisitas(unittest.TestCase):
+    def test_alpha_sigue_las_visitas(self):
+        agente = _agente_de_prueba(omega_visitas=0.7, q_inicial=0.0)
+        agente.alpha, agente.gamma = 0.3, 0.0
+        agente.ambiente.reset()
+        indice = agente._indice_actual()
+        esperado = 0.0
+        for n, recompensa in enumerate([2.0, 4.0, 6.0, 8.0, 10.0], start=1):
+            agente.actualizar_tabla(indice, recompensa, 1)
+            # Las primeras visitas aprenden con n ** -omega y después queda alpha como piso.
+            alpha = max(0.3, n ** -0.7)
+            esperado += alpha * (recompensa - esperado)
+            self.assertAlmostEqual(agente.qlearning_tabla.plana[indice + 1], esperado)
+        self.assertEqual(agente.visitas[indice + 1], 5)
+        self.assertEqual(agente.visitas[indice], 0)
+
+    def test_visitas_crecen_con_la_tabla(self):
+        agente = _agente_de_prueba(omega_visitas=0.7)
+        agente.ambiente.reset()
+        indice = agente._indice_actual()
+        agente.actualizar_tabla(indice, 1.0, 0)
+        largo = len(agente.visitas)
+        self.assertEqual(largo, len(agente.qlearning_tabla.plana))
+
+        agente.qlearning_tabla.asegurar_fila(len(agente.qlearning_tabla.valores))
+        lejos = agente.qlearning_tabla.indice(3, 50 * (len(agente.qlearning_tabla.valores) - 1))
+        self.assertGreaterEqual(lejos, largo)
+        agente.actualizar_tabla(lejos, 1.0, 1)
+        self.assertEqual(len(agente.visitas), len(agente.qlearning_tabla.plana))
+        self.assertEqual(agente.visitas[indice], 1)
+        self.assertEqual(agente.visitas[lejos + 1], 1)
+
+
+class TestValorInicial(unittest.TestCase):
+    def test_filas_nuevas(self):
+        tabla = TablaQ(100, valor_inicial=3.0)
+        np.testing.assert_array_equal(tabla.valores, 3.0)
+        tabla.plana[tabla.indice(2, 50)] = 1.0
+        tabla.asegurar_fila(40)
+        self.assertEqual(tabla.valores[1, 2, 0], 1.0)
+        self.assertTrue((tabla.valores[3:] == 3.0).all())
+        # Se conserva al mandarla a otro proceso.
+        self.assertEqual(pickle.loads(pickle.dumps(tabla)).valor_inicial, 3.0)
+
+    def test_baldes_sin_visitar(self):
+        tabla = TablaQTotal(paso_total=1000, puntos_max=300, valor_inicial=2.0)
+        i = tabla.indice(4, 100, 5000)
+        self.assertTrue((tabla.valores == 2.0).all())
+        tabla.plana[i + 1] = 3.0
+        arreglo = tabla.a_arreglo()
+        self.assertTrue((np.delete(arreglo, 5, axis=0) == 2.0).all())
+        self.assertEqual(arreglo[5, 2, 4, 1], 3.0)
+        # En los baldes sin visitar empatan, así que la política greedy se planta.
+        prob_tirar = PoliticaTabla.desde_tabla_q(tabla).prob_tirar
+        self.assertEqual(prob_tirar.sum(), 1000 // 50)
+        self.assertTrue(prob_tirar[100:120, 2, 4].all())
+
+    def test_visitados_cuentan_las_visitas(self):
+        # Con q_inicial todos los Q-values arrancan distintos de 0: los visitados salen de las visitas.
+        agente = _agente_de_prueba(q_inicial=5.0)
+        salida = io.StringIO()
+        agente.entrenar(20, instrumentacion=InstrumentacionEntrenamiento(salida, cada=20))
+        visitados = agente.visitados()
+        tabla = agente.qlearning_tabla
+        self.assertEqual(visitados.shape, (tabla.filas_usadas, 7))
+        self.assertTrue(0 < visitados.sum() < visitados.size)
+        np.testing.assert_array_equal(visitados, (tabla.valores[:tabla.filas_usadas] != 5.0).any(axis=2))
+        self.assertEqual(json.loads(salida.getvalue().splitlines()[0])['estados_visitados'], visitados.sum())
+        self.assertIsNone(_agente_de_prueba().visitados())
+
+    def test_vectorizado_cuenta_las_visitas(self):
+        agente = _agente_de_prueba(q_inicial=5.0)
+        agente.entrenar_vectorizado(50, AmbienteDiezMilVectorizado(16, semilla=0))
+        tabla = agente.qlearning_tabla
+        np.testing.assert_array_equal(agente.visitados(), (tabla.valores[:tabla.filas_usadas] != 5.0).any(axis=2))
+
+if __name__ == "__main__":
+    unittest.main()
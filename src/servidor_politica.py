@@ -0,0 +1,199 @@
+import os
+import json
+import time
+import socket
+import argparse
+import threading
+import socketserver
+from jugador import Jugador
+from qlearning import JugadorEntrenado
+
+# Protocolo: una línea JSON por pedido y otra por respuesta.
+#   pedido:    {"politica": nombre, "estados": [[puntaje_total, puntaje_turno, [dados...]], ...]}
+#   respuesta: {"jugadas": [[jugada, [dados a tirar...]], ...]}  o  {"error": mensaje}
+# Si el servidor tiene una sola política, "politica" se puede omitir.
+
+
+def _direccion(direccion: str) -> tuple[int, object]:
+    '''
+    'host:puerto' es TCP; cualquier otra cosa es la ruta de un socket Unix.
+    '''
+    host, _, puerto = direccion.rpartition(':')
+    if host and puerto.isdigit():
+        return socket.AF_INET, (host, int(puerto))
+    return socket.AF_UNIX, direccion
+
+
+class PoliticaRecargable:
+    def __init__(self, nombre: str, filename: str, intervalo_recarga: float = 1.0):
+        '''
+        Un JugadorEntrenado que se vuelve a cargar cuando cambia su archivo. La
+        fecha de modificación se revisa a lo sumo cada intervalo_recarga segundos,
+        así que los pedidos no pagan un stat cada uno. Si el archivo nuevo no se
+        puede leer (por ejemplo, porque se está escribiendo), se sigue con la
+        política anterior.
+        '''
+
+        self.nombre = nombre
+        self.filename = filename
+        self.intervalo_recarga = intervalo_recarga
+        self.jugador = JugadorEntrenado(nombre, filename)
+        self.mtime = os.stat(filename).st_mtime_ns
+        self.proxima_revision = time.monotonic() + intervalo_recarga
+        self.lock = threading.Lock()
+
+    def actual(self) -> JugadorEntrenado:
+        if time.monotonic() >= self.proxima_revision:
+            with self.lock:
+                self.proxima_revision = time.monotonic() + self.intervalo_recarga
+                try:
+                    mtime = os.stat(self.filename).st_mtime_ns
+                    if mtime != self.mtime:
+                        self.jugador = JugadorEntrenado(self.nombre, self.filename)
+                        self.mtime = mtime
+                except (OSError, ValueError):
+                    pass
+        return self.jugador
+
+
+def _validar_pedido(pedido) -> list[tuple[int, int, list[int]]]:
+    '''
+    Revisa la forma de un pedido y devuelve sus estados.
+
+    Raises:
+        ValueError: Si el pedido no tiene la forma del protocolo.
+    '''
+    if not isinstance(pedido, dict) or not isinstance(pedido.get('estados'), list):
+        raise ValueError('el pedido tiene que ser un objeto con una lista "estados"')
+    if 'politica' in pedido and not isinstance(pedido['politica'], str):
+        raise ValueError('"politica" tiene que ser un nombre')
+    for estado in pedido['estados']:
+        if not (isinstance(estado, list) and len(estado) == 3 and isinstance(estado[0], int)
+                and isinstance(estado[1], int) and isinstance(estado[2], list) and 1 <= len(estado[2]) <= 6
+                and all(isinstance(dado, int) and 1 <= dado <= 6 for dado in estado[2])):
+            raise ValueError(f'estado inválido: {estado!r}, se esperaba [puntaje_total, puntaje_turno, [dados...]]')
+        if estado[0] < 0 or estado[1] < 0:
+            raise ValueError(f'estado inválido: {estado!r}, los puntajes no pueden ser negativos')
+    return pedido['estados']
+
+
+class _Manejador(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        if self.server.address_family == socket.AF_INET:
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self):
+        politicas = self.server.politicas
+        unica = next(iter(politicas.values())) if len(politicas) == 1 else None
+        for linea in self.rfile:
+            try:
+                pedido = json.loads(linea)
+                estados = _validar_pedido(pedido)
+                # Sin "politica", con más de una en el servidor, es un KeyError.
+                politica = politicas[pedido['politica']] if 'politica' in pedido or unica is None else unica
+                jugar = politica.actual().jugar
+                respuesta = {'jugadas': [jugar(total, turno, dados) for total, turno, dados in estados]}
+            except (ValueError, KeyError, json.JSONDecodeError) as error:
+                respuesta = {'error': repr(error)}
+            self.wfile.write(json.dumps(respuesta).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class _ServidorTCP(socketserver.ThreadingTCPServer):
+    # Para poder volver a levantar el servidor enseguida en el mismo puerto.
+    allow_reuse_address = True
+
+
+def crear_servidor(politicas: dict[str, str], direccion: str, intervalo_recarga: float = 1.0) -> socketserver.BaseServer:
+    '''
+    Arma el servidor de decisiones (un hilo por conexión) sin arrancarlo.
+
+    Args:
+        politicas (dict[str, str]): Nombre -> archivo de la política.
+        direccion (str): 'host:puerto' para TCP (con puerto 0 elige uno libre, ver
+            server_address), o la ruta de un socket Unix.
+        intervalo_recarga (float, optional): Segundos entre revisiones de los archivos. Defaults to 1.0.
+    '''
+    familia, direccion = _direccion(direccion)
+    if familia == socket.AF_UNIX:
+        if os.path.exists(direccion):
+            os.remove(direccion)
+        servidor = socketserver.ThreadingUnixStreamServer(direccion, _Manejador)
+    else:
+        servidor = _ServidorTCP(direccion, _Manejador)
+    servidor.daemon_threads = True
+    servidor.politicas = {nombre: PoliticaRecargable(nombre, filename, intervalo_recarga)
+                          for nombre, filename in politicas.items()}
+    return servidor
+
+
+class JugadorRemoto(Jugador):
+    def __init__(self, nombre: str, direccion: str, politica: str | None = None):
+        '''
+        Jugador que le pide las decisiones a un servidor_politica, por una
+        conexión que queda abierta.
+
+        Args:
+            nombre (str): Nombre del jugador.
+            direccion (str): 'host:puerto' o la ruta del socket Unix del servidor.
+            politica (str, optional): Nombre de la política en el servidor.
+        '''
+
+        self.nombre = nombre
+        self.politica = politica
+        familia, direccion = _direccion(direccion)
+        self.conexion = socket.socket(familia, socket.SOCK_STREAM)
+        self.conexion.connect(direccion)
+        if familia == socket.AF_INET:
+            self.conexion.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.archivo = self.conexion.makefile('rwb')
+
+    def decidir_lote(self, estados: list[tuple[int, int, list[int]]]) -> list[tuple[int, list[int]]]:
+        '''
+        Pide las decisiones de varios estados (puntaje_total, puntaje_turno, dados) en un solo mensaje.
+        '''
+        pedido = {'estados': estados}
+        if self.politica is not None:
+            pedido['politica'] = self.politica
+        self.archivo.write(json.dumps(pedido).encode('utf-8') + b'\n')
+        self.archivo.flush()
+        respuesta = json.loads(self.archivo.readline())
+        if 'error' in respuesta:
+            raise RuntimeError(respuesta['error'])
+        return [(jugada, dados) for jugada, dados in respuesta['jugadas']]
+
+    def jugar(self, puntaje_total: int, puntaje_turno: int, dados: list[int],
+              verbose: bool = False) -> tuple[int, list[int]]:
+        return self.decidir_lote([(puntaje_total, puntaje_turno, dados)])[0]
+
+    def cerrar(self):
+        self.archivo.close()
+        self.conexion.close()
+
+
+def main(politicas, direccion, intervalo_recarga):
+    politicas = dict(p.split('=', 1) if '=' in p else (os.path.basename(p), p) for p in politicas)
+    servidor = crear_servidor(politicas, direccion, intervalo_recarga)
+    print(f"Sirviendo {', '.join(politicas)} en {direccion}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Servir las decisiones de políticas entrenadas de 'Diez Mil' por un socket local.")
+
+    # Agregar argumentos
+    parser.add_argument('politicas', type=str, nargs='+', help='Archivos de políticas, opcionalmente como nombre=archivo')
+    parser.add_argument('-d', '--direccion', type=str, default='127.0.0.1:8642', help="'host:puerto' o ruta de un socket Unix (default: 127.0.0.1:8642)")
+    parser.add_argument('-i', '--intervalo_recarga', type=float, default=1.0, help='Segundos entre revisiones de los archivos para recargarlos (default: 1.0)')
+
+    # Parsear los argumentos
+    args = parser.parse_args()
+
+    # Llamar a la función principal con los argumentos proporcionados
+    main(args.politicas, args.direccion, args.intervalo_recarga)
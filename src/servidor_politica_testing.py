@@ -0,0 +1,67 @@
+import json
+import os
+import socket
+import threading
+import unittest
+from qlearning import JugadorEntrenado
+from servidor_politica import crear_servidor, JugadorRemoto
+
+POLITICA: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'best_training_policy.json')
+
+
+class TestServidorPolitica(unittest.TestCase):
+    def setUp(self):
+        self.servidor = crear_servidor({'a': POLITICA, 'b': POLITICA}, '127.0.0.1:0')
+        self.hilo = threading.Thread(target=self.servidor.serve_forever, daemon=True)
+        self.hilo.start()
+        host, puerto = self.servidor.server_address
+        self.direccion = f'{host}:{puerto}'
+
+    def tearDown(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+        self.hilo.join()
+
+    def test_lote_igual_que_local(self):
+        local = JugadorEntrenado('local', POLITICA)
+        estados = [(0, 0, [1, 2, 3, 4, 6, 6]), (500, 300, [5, 2, 2]), (9000, 1200, [1]), (0, 50, [5, 3, 3, 4])]
+        remoto = JugadorRemoto('remoto', self.direccion, 'a')
+        try:
+            jugadas = remoto.decidir_lote(estados)
+            self.assertEqual(jugadas, [tuple(local.jugar(*estado)) for estado in estados])
+            self.assertEqual(remoto.jugar(*estados[1]), jugadas[1])
+        finally:
+            remoto.cerrar()
+
+    def test_errores_no_cortan_la_conexion(self):
+        # Con dos políticas en el servidor hay que decir cuál.
+        remoto = JugadorRemoto('remoto', self.direccion)
+        try:
+            with self.assertRaises(RuntimeError):
+                remoto.decidir_lote([(0, 0, [1, 5])])
+            remoto.politica = 'c'
+            with self.assertRaises(RuntimeError):
+                remoto.decidir_lote([(0, 0, [1, 5])])
+            remoto.politica = 'b'
+            self.assertEqual(len(remoto.decidir_lote([(0, 0, [1, 5])])), 1)
+        finally:
+            remoto.cerrar()
+
+    def test_pedidos_mal_formados(self):
+        # Cada línea mal formada recibe su error y la conexión sigue sirviendo pedidos.
+        host, puerto = self.servidor.server_address
+        with socket.create_connection((host, puerto)) as conexion, conexion.makefile('rwb') as archivo:
+            lineas = [b'no es json', b'[1, 2]', b'{"estados": 5, "politica": "a"}',
+                      b'{"estados": [[0, 0, 5]], "politica": "a"}', b'{"estados": [[0, 0, [7]]], "politica": "a"}',
+                      b'{"estados": [[0, 0, [1, 5]]], "politica": ["a"]}']
+            for linea in lineas:
+                archivo.write(linea + b'\n')
+                archivo.flush()
+                self.assertIn('error', json.loads(archivo.readline()), linea)
+            archivo.write(b'{"estados": [[0, 0, [1, 5]]], "politica": "a"}\n')
+            archivo.flush()
+            self.assertEqual(len(json.loads(archivo.readline())['jugadas']), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
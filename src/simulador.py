@@ -0,0 +1,239 @@
+import numpy as np
+from utils import TABLA_PUNTAJES, claves_por_indice
+from jugador import JugadorAleatorio, JugadorSiempreSePlanta
+
+PASO_PUNTOS: int = 50
+PUNTAJE_OBJETIVO: int = 10000
+
+
+def _armar_tablas_tiradas() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    '''
+    Arma las tablas planas con el puntaje y la cantidad de dados no usados de
+    cada tirada posible de 0 a 6 dados. La tirada de índice i con n dados está
+    en la posición OFFSET_TIRADAS[n] + i.
+    '''
+    offsets: list[int] = []
+    puntos: list[int] = []
+    restantes: list[int] = []
+    for n in range(7):
+        offsets.append(len(puntos))
+        for clave in claves_por_indice(n):
+            puntaje, no_usados = TABLA_PUNTAJES[clave]
+            puntos.append(puntaje)
+            restantes.append(len(no_usados))
+    return (np.array(offsets, dtype=np.int64),
+            np.array(puntos, dtype=np.int64),
+            np.array(restantes, dtype=np.int64))
+
+
+OFFSET_TIRADAS, PUNTOS_TIRADAS, RESTANTES_TIRADAS = _armar_tablas_tiradas()
+CANT_TIRADAS: np.ndarray = 6 ** np.arange(7, dtype=np.int64)
+
+
+def tirar_dados(rng: np.random.Generator, dados: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Tira en simultáneo dados[i] dados para cada i. Sortear un índice uniforme
+    entre las 6**n tiradas equivale a tirar los n dados uno por uno.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Puntaje de cada tirada y cantidad de dados no usados.
+    '''
+    indices = OFFSET_TIRADAS[dados] + rng.integers(0, CANT_TIRADAS[dados])
+    return PUNTOS_TIRADAS[indices], RESTANTES_TIRADAS[indices]
+
+
+def tirar_dados_uniformes(uniformes: np.ndarray, dados: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Igual que tirar_dados, pero la tirada de cada i sale de uniformes[i], en [0, 1).
+    '''
+    indices = OFFSET_TIRADAS[dados] + (uniformes * CANT_TIRADAS[dados]).astype(np.int64)
+    return PUNTOS_TIRADAS[indices], RESTANTES_TIRADAS[indices]
+
+
+def _mezclar(x: np.ndarray) -> np.ndarray:
+    # Paso final de splitmix64: cada bit de la salida depende de todos los de la entrada.
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def uniformes_comunes(semilla: int, *claves: np.ndarray) -> np.ndarray:
+    '''
+    Números en [0, 1) que dependen solo de la semilla y de las claves (por
+    ejemplo, partida, turno y número de tirada), no del orden en que se piden.
+    Así dos políticas que juegan la misma partida ven los mismos dados en la
+    misma tirada del mismo turno aunque decidan distinto.
+    '''
+    x = np.full(len(claves[0]), semilla & (2 ** 64 - 1), dtype=np.uint64)
+    for clave in claves:
+        x = _mezclar(x ^ (np.asarray(clave).astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)))
+    return (x >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+
+
+class PoliticaTabla:
+    def __init__(self, prob_tirar: np.ndarray):
+        '''
+        Política dada por una tabla con la probabilidad de volver a tirar.
+
+        Args:
+            prob_tirar (np.ndarray): Matriz de (puntos_turno // 50, cant_dados) con la
+                probabilidad de tirar en cada estado. Los puntos que se pasan de la
+                tabla usan la última fila. Si tiene un eje más al principio, es
+                el de puntaje_total // 50 y la política depende del puntaje total.
+        '''
+
+        self.prob_tirar = np.asarray(prob_tirar, dtype=np.float64)
+        self.con_total = self.prob_tirar.ndim == 3
+        self.determinista = bool(np.all((self.prob_tirar == 0) | (self.prob_tirar == 1)))
+
+    @staticmethod
+    def desde_tabla_q(tabla) -> 'PoliticaTabla':
+        '''
+        Arma la política greedy de una TablaQ (o de una TablaQTotal, con cada
+        balde de puntaje total repetido en filas de 50). Igual que
+        JugadorEntrenado, ante un empate se planta.
+        '''
+        if hasattr(tabla, 'tablas'):
+            valores = tabla.apilar(tabla.tablas(), tabla.paso_total)
+            return PoliticaTabla((valores[..., 1] > valores[..., 0]).astype(np.float64))
+        valores = tabla.valores[:tabla.filas_usadas]
+        return PoliticaTabla((valores[:, :, 1] > valores[:, :, 0]).astype(np.float64))
+
+    @staticmethod
+    def desde_jugador_entrenado(jugador) -> 'PoliticaTabla':
+        '''
+        Arma la política greedy de un JugadorEntrenado (ver JugadorEntrenado.a_arreglo).
+        '''
+        valores = jugador.a_arreglo()
+        return PoliticaTabla((valores[..., 1] > valores[..., 0]).astype(np.float64))
+
+    @staticmethod
+    def desde_umbrales(umbrales) -> 'PoliticaTabla':
+        '''
+        Arma la política que tira mientras los puntos del turno estén por
+        debajo del umbral de la cantidad de dados (ver umbrales.py).
+        '''
+        umbrales = np.asarray(umbrales)
+        filas = np.arange(int(umbrales.max()) // PASO_PUNTOS + 1) * PASO_PUNTOS
+        return PoliticaTabla((filas[:, None] < umbrales[..., None, :]).astype(np.float64))
+
+    @staticmethod
+    def desde_jugador(jugador) -> 'PoliticaTabla':
+        '''
+        Arma la política de un jugador que se puede escribir como tabla: un
+        JugadorEntrenado, un JugadorUmbral, un JugadorSiempreSePlanta o un
+        JugadorAleatorio.
+        '''
+        if isinstance(jugador, PoliticaTabla):
+            return jugador
+        if hasattr(jugador, 'umbrales'):
+            return PoliticaTabla.desde_umbrales(jugador.umbrales)
+        if isinstance(jugador, JugadorSiempreSePlanta):
+            return PoliticaTabla.siempre_plantarse()
+        if isinstance(jugador, JugadorAleatorio):
+            return PoliticaTabla.aleatoria()
+        return PoliticaTabla.desde_jugador_entrenado(jugador)
+
+    @staticmethod
+    def siempre_plantarse() -> 'PoliticaTabla':
+        return PoliticaTabla(np.zeros((1, 7)))
+
+    @staticmethod
+    def aleatoria() -> 'PoliticaTabla':
+        return PoliticaTabla(np.full((1, 7), 0.5))
+
+    def decidir(self, rng: np.random.Generator, dados: np.ndarray, puntos_turno: np.ndarray,
+                puntaje_total: np.ndarray | None = None, uniformes: np.ndarray | None = None) -> np.ndarray:
+        '''
+        Devuelve, para cada estado, si vuelve a tirar. Si se pasan uniformes,
+        las políticas al azar los usan en lugar de sortear con rng.
+        '''
+        if self.con_total:
+            filas_total = np.minimum(puntaje_total // PASO_PUNTOS, self.prob_tirar.shape[0] - 1)
+            filas = np.minimum(puntos_turno // PASO_PUNTOS, self.prob_tirar.shape[1] - 1)
+            prob = self.prob_tirar[filas_total, filas, dados]
+        else:
+            filas = np.minimum(puntos_turno // PASO_PUNTOS, len(self.prob_tirar) - 1)
+            prob = self.prob_tirar[filas, dados]
+        if self.determinista:
+            return prob == 1
+        if uniformes is None:
+            uniformes = rng.random(len(prob))
+        return uniformes < prob
+
+
+class SimuladorDiezMil:
+    def __init__(self, politica: PoliticaTabla, semilla: int | None = None, numeros_comunes: bool = False):
+        '''
+        Simula en lote muchas partidas de Diez Mil con las mismas reglas que
+        JuegoDiezMil.jugar, avanzando todas las partidas a la vez con arreglos de NumPy.
+
+        Args:
+            politica (PoliticaTabla): Política que juegan todas las partidas.
+            semilla (int, optional): Semilla del generador de números aleatorios.
+            numeros_comunes (bool, optional): Si es True, cada tirada sale de
+                uniformes_comunes(semilla, partida, turno, tirada): dos simuladores con
+                la misma semilla juegan las mismas partidas con los mismos dados, para
+                comparar políticas de a pares (ver evaluacion.comparar_turnos). Defaults to False.
+        '''
+
+        self.politica = politica
+        self.rng = np.random.default_rng(semilla)
+        self.semilla_comun = None
+        if numeros_comunes:
+            self.semilla_comun = semilla if semilla is not None else int(self.rng.integers(2 ** 63))
+
+    def jugar(self, cant_partidas: int, tope_turnos: int = 1000, primera_partida: int = 0) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        Juega cant_partidas partidas, cada una hasta llegar a 10000 puntos o a
+        tope_turnos turnos. Con numeros_comunes, las partidas son las de
+        número primera_partida en adelante.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Cantidad de turnos y puntaje final de cada partida.
+        '''
+        turnos_finales = np.zeros(cant_partidas, dtype=np.int64)
+        puntajes_finales = np.zeros(cant_partidas, dtype=np.int64)
+
+        # Estado de las partidas que siguen en juego.
+        ids = np.arange(cant_partidas)
+        turno = np.ones(cant_partidas, dtype=np.int64)
+        puntaje_total = np.zeros(cant_partidas, dtype=np.int64)
+        puntaje_turno = np.zeros(cant_partidas, dtype=np.int64)
+        dados = np.full(cant_partidas, 6, dtype=np.int64)
+        tirada = np.zeros(cant_partidas, dtype=np.int64)
+
+        while len(ids) > 0:
+            uniformes = None
+            if self.semilla_comun is None:
+                puntos_tirada, restantes = tirar_dados(self.rng, dados)
+            else:
+                partidas = ids + primera_partida
+                puntos_tirada, restantes = tirar_dados_uniformes(
+                    uniformes_comunes(self.semilla_comun, partidas, turno, tirada), dados)
+                if not self.politica.determinista:
+                    uniformes = uniformes_comunes(self.semilla_comun, partidas, turno, tirada + (1 << 32))
+            puntos_nuevos = puntaje_turno + puntos_tirada
+
+            # Si la tirada no suma, pierde el turno; si suma, decide la política.
+            puntuo = puntos_tirada > 0
+            tirar = puntuo & self.politica.decidir(self.rng, restantes, puntos_nuevos, puntaje_total, uniformes)
+            fin_de_turno = ~tirar
+            tirada = np.where(tirar, tirada + 1, 0)
+            puntaje_total += np.where(puntuo & fin_de_turno, puntos_nuevos, 0)
+
+            puntaje_turno = np.where(tirar, puntos_nuevos, 0)
+            # Cuando usó todos los dados, vuelve a tirar todo.
+            dados = np.where(tirar & (restantes > 0), restantes, 6)
+
+            termino = fin_de_turno & ((puntaje_total >= PUNTAJE_OBJETIVO) | (turno >= tope_turnos))
+            turno += fin_de_turno & ~termino
+
+            if termino.any():
+                turnos_finales[ids[termino]] = turno[termino]
+                puntajes_finales[ids[termino]] = puntaje_total[termino]
+                sigue = ~termino
+                ids, turno, puntaje_total = ids[sigue], turno[sigue], puntaje_total[sigue]
+                puntaje_turno, dados, tirada = puntaje_turno[sigue], dados[sigue], tirada[sigue]
+
+        return turnos_finales, puntajes_finales
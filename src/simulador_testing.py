@@ -0,0 +1,21 @@
+import unittest
+import numpy as np
+from diezmil import JuegoDiezMil
+from fuente_dados import FuenteDados
+from simulador import SimuladorDiezMil, PoliticaTabla
+from umbrales import JugadorUmbral
+
+
+class TestSimulador(unittest.TestCase):
+    def test_coincide_con_juego_diez_mil(self):
+        # La misma política por umbrales, jugada de a una partida y en lote.
+        umbrales = [500, 250, 300, 350, 400, 500, 1000]
+        juego = JuegoDiezMil(JugadorUmbral('umbral', umbrales), FuenteDados(0))
+        turnos_juego = np.array([juego.jugar()[0] for _ in range(4000)])
+        turnos_lote, _ = SimuladorDiezMil(PoliticaTabla.desde_umbrales(umbrales), semilla=0).jugar(20000)
+        error = np.sqrt(turnos_juego.var() / len(turnos_juego) + turnos_lote.var() / len(turnos_lote))
+        self.assertLess(abs(turnos_juego.mean() - turnos_lote.mean()), 4 * error)
+
+
+if __name__ == '__main__':
+    unittest.main()
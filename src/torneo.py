@@ -0,0 +1,160 @@
+import time
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from diezmil import JuegoDiezMil
+from fuente_dados import FuenteDados
+from jugador import JugadorAleatorio, JugadorSiempreSePlanta, con_dados_propios
+from qlearning import JugadorEntrenado, cargar_jugador
+from simulador import SimuladorDiezMil, PoliticaTabla, PUNTAJE_OBJETIVO
+from umbrales import JugadorUmbral
+
+
+def _como_politica(jugador) -> PoliticaTabla | None:
+    '''
+    Devuelve la política por tabla del jugador, si tiene, para jugarlo en lote.
+    '''
+    if isinstance(jugador, (PoliticaTabla, JugadorAleatorio, JugadorSiempreSePlanta, JugadorUmbral, JugadorEntrenado)):
+        return PoliticaTabla.desde_jugador(jugador)
+    return None
+
+
+def _jugar_lote(jugador, cant_partidas: int, semilla: int, tope_turnos: int) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Juega cant_partidas partidas del jugador y devuelve los turnos de cada una
+    y si llegó a PUNTAJE_OBJETIVO (las que cortó tope_turnos no llegaron).
+    '''
+    if isinstance(jugador, PoliticaTabla):
+        turnos, puntajes = SimuladorDiezMil(jugador, semilla).jugar(cant_partidas, tope_turnos)
+        return turnos, puntajes >= PUNTAJE_OBJETIVO
+    juego = JuegoDiezMil(con_dados_propios(jugador, semilla), FuenteDados(semilla))
+    turnos, puntajes = np.array([juego.jugar(tope_turnos=tope_turnos) for _ in range(cant_partidas)]).reshape(-1, 2).T
+    return turnos, puntajes >= PUNTAJE_OBJETIVO
+
+
+def jugar_torneo(jugadores: dict, partidas: int = 10000, procesos: int = 1, semilla: int | None = None,
+                 partidas_por_lote: int = 10000, tope_turnos: int = 1000) -> dict:
+    '''
+    Enfrenta a todos los jugadores contra todos. En Diez Mil cada jugador
+    suma solo con sus dados, así que en un partido gana el primero en llegar
+    a 10000: el que arranca gana si necesita a lo sumo los mismos turnos que el
+    otro. Si ninguno de los dos llega a 10000 antes de tope_turnos, el partido
+    es empate y cuenta medio para cada uno. Por eso alcanza con jugar partidas partidas de cada jugador (en lote
+    con SimuladorDiezMil si tiene política por tabla, repartidas entre
+    procesos) y emparejar la i-ésima de cada uno, alternando quién arranca.
+
+    Args:
+        jugadores (dict): Nombre -> Jugador (o PoliticaTabla, o archivo de política).
+        partidas (int, optional): Partidas de cada enfrentamiento. Defaults to 10000.
+        procesos (int, optional): Cantidad de procesos. Defaults to 1.
+        semilla (int, optional): Semilla de la que se derivan las de cada lote.
+        partidas_por_lote (int, optional): Partidas de cada tarea. Defaults to 10000.
+        tope_turnos (int, optional): Turnos máximos de una partida. Defaults to 1000.
+
+    Returns:
+        dict: 'nombres'; 'victorias', matriz con la proporción de partidos que
+            el jugador de la fila le gana al de la columna; 'turnos', los turnos
+            de cada partida de cada jugador; 'llego', si cada una de esas partidas
+            llegó a 10000 antes de tope_turnos; 'partidas_por_segundo'.
+    '''
+    nombres = list(jugadores)
+    tareas = []
+    raiz = np.random.SeedSequence(semilla)
+    for nombre, hijo in zip(nombres, raiz.spawn(len(nombres))):
+        jugador = jugadores[nombre]
+        if isinstance(jugador, str):
+            jugador = cargar_jugador(jugador, nombre)
+        jugador = _como_politica(jugador) or jugador
+        cantidades = [min(partidas_por_lote, partidas - i) for i in range(0, partidas, partidas_por_lote)]
+        for cant, hijo_lote in zip(cantidades, hijo.spawn(len(cantidades))):
+            tareas.append((nombre, jugador, cant, int(hijo_lote.generate_state(1)[0])))
+
+    inicio = time.perf_counter()
+    argumentos = ([jugador for _, jugador, _, _ in tareas], [cant for _, _, cant, _ in tareas],
+                  [s for _, _, _, s in tareas], [tope_turnos] * len(tareas))
+    if procesos > 1:
+        with ProcessPoolExecutor(max_workers=procesos) as executor:
+            lotes = list(executor.map(_jugar_lote, *argumentos))
+    else:
+        lotes = list(map(_jugar_lote, *argumentos))
+    segundos = time.perf_counter() - inicio
+
+    turnos = {nombre: np.concatenate([lote for (n, _, _, _), (lote, _) in zip(tareas, lotes) if n == nombre])
+              for nombre in nombres}
+    llego = {nombre: np.concatenate([lote for (n, _, _, _), (_, lote) in zip(tareas, lotes) if n == nombre])
+             for nombre in nombres}
+    # En las partidas pares arranca el que está antes en nombres, en las impares el otro.
+    pares = np.arange(partidas) % 2 == 0
+    victorias = np.full((len(nombres), len(nombres)), 0.5)
+    for i, a in enumerate(nombres):
+        for j, b in enumerate(nombres):
+            if i != j:
+                arranca = pares if i < j else ~pares
+                # Una partida cortada por tope_turnos pierde contra cualquiera que llegó.
+                gana = llego[a] & (~llego[b] | (turnos[a] < turnos[b]) | ((turnos[a] == turnos[b]) & arranca))
+                empate = ~llego[a] & ~llego[b]
+                victorias[i, j] = (gana + 0.5 * empate).mean()
+
+    return {
+        'nombres': nombres,
+        'victorias': victorias,
+        'turnos': turnos,
+        'llego': llego,
+        'partidas_por_segundo': partidas * len(nombres) / segundos,
+    }
+
+
+def enfrentar(jugador_a, jugador_b, partidas: int = 10000, **kwargs) -> float:
+    '''
+    Enfrenta a dos jugadores y devuelve la proporción de partidos que gana el
+    primero. Los argumentos restantes son los de jugar_torneo.
+    '''
+    return float(jugar_torneo({'a': jugador_a, 'b': jugador_b}, partidas, **kwargs)['victorias'][0, 1])
+
+
+def informar(resultado: dict) -> None:
+    '''
+    Imprime el ranking (por proporción media de victorias), los turnos de cada
+    jugador y la matriz de victorias.
+    '''
+    nombres = resultado['nombres']
+    victorias = resultado['victorias']
+    media = (victorias.sum(axis=1) - 0.5) / max(len(nombres) - 1, 1)
+    print(f"{'jugador':30} {'victorias':>9} {'turnos':>8} {'desvío':>7} {'p10':>5} {'p50':>5} {'p90':>5}")
+    for i in np.argsort(-media):
+        turnos = resultado['turnos'][nombres[i]]
+        p10, p50, p90 = np.percentile(turnos, [10, 50, 90])
+        print(f'{nombres[i]:30} {media[i]:9.3f} {turnos.mean():8.3f} {turnos.std():7.3f} {p10:5.0f} {p50:5.0f} {p90:5.0f}')
+
+    print()
+    print(' ' * 30 + ''.join(f'{j:>8}' for j in range(len(nombres))))
+    for i, nombre in enumerate(nombres):
+        print(f'{i} {nombre[:27]:27} ' + ''.join(f'{v:8.3f}' for v in victorias[i]))
+    print(f"\nPartidas por segundo: {resultado['partidas_por_segundo']:.0f}")
+
+
+def main(politicas, planton, aleatorio, partidas, procesos, semilla):
+    jugadores = {filename: filename for filename in politicas}
+    if planton:
+        jugadores['plantón'] = JugadorSiempreSePlanta('plantón')
+    if aleatorio:
+        jugadores['aleatorio'] = JugadorAleatorio('aleatorio')
+    informar(jugar_torneo(jugadores, partidas, procesos, semilla))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Jugar un torneo de 'Diez Mil' todos contra todos entre políticas.")
+
+    # Agregar argumentos
+    parser.add_argument('politicas', type=str, nargs='*', help='Archivos de políticas (JSON, binarias o de umbrales)')
+    parser.add_argument('--planton', action='store_true', help='Sumar al jugador que siempre se planta')
+    parser.add_argument('--aleatorio', action='store_true', help='Sumar al jugador aleatorio')
+    parser.add_argument('-n', '--partidas', type=int, default=10000, help='Partidas de cada enfrentamiento (default: 10000)')
+    parser.add_argument('-p', '--procesos', type=int, default=1, help='Cantidad de procesos (default: 1)')
+    parser.add_argument('-s', '--semilla', type=int, default=None, help='Semilla para que el torneo sea reproducible')
+
+    # Parsear los argumentos
+    args = parser.parse_args()
+
+    # Llamar a la función principal con los argumentos proporcionados
+    main(args.politicas, args.planton, args.aleatorio, args.partidas, args.procesos, args.semilla)
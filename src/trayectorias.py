@@ -0,0 +1,209 @@
+import argparse
+import numpy as np
+from tqdm import tqdm
+from qlearning import AmbienteDiezMilVectorizado, TablaQ, cargar_jugador
+from simulador import PoliticaTabla, PASO_PUNTOS
+
+# Formato de los archivos de trayectorias:
+#   - MAGIA (8 bytes)
+#   - bloques, cada uno con la cantidad de transiciones (uint32, little endian)
+#     y después cada columna de COLUMNAS entera, una detrás de otra.
+# Por columnas, cada bloque se lee con un np.fromfile por columna y los
+# arreglos ya quedan listos para las cuentas vectorizadas. Los puntos se
+# guardan como fila de la tabla (puntos // 50). Son 12 bytes por transición.
+MAGIA: bytes = b'DMTRAY\x00\x01'
+COLUMNAS: list[tuple[str, str]] = [
+    ('dados', 'u1'),
+    ('fila', '<u2'),
+    ('accion', 'u1'),
+    ('recompensa', '<f4'),
+    ('dados_sig', 'u1'),
+    ('fila_sig', '<u2'),
+    ('terminado', 'u1'),
+]
+
+
+class GrabadorTrayectorias:
+    def __init__(self, filename: str, tam_bloque: int = 1 << 16):
+        '''
+        Guarda transiciones (estado, acción, recompensa, estado siguiente, fin
+        de episodio) en un archivo binario por columnas, de a bloques de
+        tam_bloque transiciones. Se leen con leer_trayectorias.
+
+        Args:
+            filename (str): Nombre/Path del archivo a generar.
+            tam_bloque (int, optional): Transiciones que se juntan antes de escribir un bloque.
+        '''
+
+        self.archivo = open(filename, 'wb')
+        self.archivo.write(MAGIA)
+        self.tam_bloque = tam_bloque
+        self.pendientes: list[tuple[np.ndarray, ...]] = []
+        self.cant_pendientes = 0
+        self.transiciones = 0
+
+    def agregar(self, dados, puntos_turno, acciones, recompensas, dados_sig, puntos_sig, terminados):
+        '''
+        Agrega un lote de transiciones, con un arreglo por columna (por ejemplo,
+        un paso de AmbienteDiezMilVectorizado).
+        '''
+        lote = (dados, np.asarray(puntos_turno) // PASO_PUNTOS, acciones, recompensas,
+                dados_sig, np.asarray(puntos_sig) // PASO_PUNTOS, terminados)
+        self.pendientes.append(tuple(np.asarray(columna, dtype=dtype) for columna, (_, dtype) in zip(lote, COLUMNAS)))
+        self.cant_pendientes += len(self.pendientes[-1][0])
+        if self.cant_pendientes >= self.tam_bloque:
+            self.vaciar()
+
+    def vaciar(self):
+        if self.cant_pendientes == 0:
+            return
+        self.archivo.write(self.cant_pendientes.to_bytes(4, 'little'))
+        for i in range(len(COLUMNAS)):
+            np.concatenate([lote[i] for lote in self.pendientes]).tofile(self.archivo)
+        self.transiciones += self.cant_pendientes
+        self.pendientes = []
+        self.cant_pendientes = 0
+
+    def cerrar(self):
+        self.vaciar()
+        self.archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
+
+
+def leer_trayectorias(filename: str):
+    '''
+    Recorre un archivo de GrabadorTrayectorias de a un bloque por vez, sin
+    cargarlo entero en memoria.
+
+    Yields:
+        dict[str, np.ndarray]: Las columnas del bloque (ver COLUMNAS).
+    '''
+    with open(filename, 'rb') as archivo:
+        if archivo.read(len(MAGIA)) != MAGIA:
+            raise ValueError(f'{filename} no es un archivo de trayectorias')
+        while (cantidad := archivo.read(4)):
+            cantidad = int.from_bytes(cantidad, 'little')
+            yield {nombre: np.fromfile(archivo, dtype=dtype, count=cantidad) for nombre, dtype in COLUMNAS}
+
+
+def grabar_trayectorias(filename: str, pasos: int, ambientes: int = 1024, politica: PoliticaTabla | None = None,
+                        epsilon: float = 0.0, semilla: int | None = None, verbose: bool = False) -> int:
+    '''
+    Juega con AmbienteDiezMilVectorizado y guarda todas las transiciones. Los
+    ambientes se graban intercalados, así que cada tanda de ambientes
+    transiciones seguidas es un paso de todos ellos, como en
+    AgenteQLearning.entrenar_vectorizado.
+
+    Args:
+        filename (str): Nombre/Path del archivo a generar.
+        pasos (int): Transiciones a grabar (se redondea hacia arriba a un múltiplo de ambientes).
+        ambientes (int, optional): Ambientes simulados a la vez. Defaults to 1024.
+        politica (PoliticaTabla, optional): Política con la que se juega. Por defecto, al azar.
+        epsilon (float, optional): Probabilidad de jugar al azar en lugar de seguir la política. Defaults to 0.0.
+        semilla (int, optional): Semilla de los ambientes.
+        verbose (bool, optional): Flag para mostrar el progreso. Defaults to False.
+
+    Returns:
+        int: Cantidad de transiciones grabadas.
+    '''
+    politica = politica or PoliticaTabla.aleatoria()
+    vectorizado = AmbienteDiezMilVectorizado(ambientes, semilla)
+    rng = vectorizado.rng
+    dados, puntos = vectorizado.dados.copy(), vectorizado.puntos_turno.copy()
+    with GrabadorTrayectorias(filename) as grabador:
+        for _ in tqdm(range(-(-pasos // ambientes)), disable=not verbose):
+            acciones = politica.decidir(rng, dados, puntos).astype(np.int64)
+            al_azar = rng.random(ambientes) < epsilon
+            acciones[al_azar] = rng.integers(0, 2, int(al_azar.sum()))
+            recompensas, terminados, (dados_sig, puntos_sig) = vectorizado.step(acciones)
+            grabador.agregar(dados, puntos, acciones, recompensas, dados_sig, puntos_sig, terminados)
+            dados, puntos = dados_sig, puntos_sig
+    return grabador.transiciones
+
+
+def entrenar_offline(filenames: str | list[str], configuraciones: list[tuple[float, float]], pasadas: int = 1,
+                     tam_lote: int = 1024, verbose: bool = False) -> list[TablaQ]:
+    '''
+    Aprende con Q-learning a partir de trayectorias grabadas, sin simular.
+    Todas las configuraciones (alpha, gamma) se entrenan juntas sobre los
+    mismos datos: se lee cada bloque una sola vez y cada lote de tam_lote
+    transiciones actualiza las tablas de todas a la vez, con la misma cuenta
+    que AgenteQLearning.entrenar_vectorizado para los pares (estado, acción)
+    repetidos en un lote. Igual que en el entrenamiento online, al terminar
+    un episodio también se suma el valor del estado siguiente, que es el
+    estado inicial de la partida nueva (así lo graba grabar_trayectorias).
+
+    Args:
+        filenames (str | list[str]): Archivos de grabar_trayectorias.
+        configuraciones (list[tuple[float, float]]): Pares (alpha, gamma) a entrenar.
+        pasadas (int, optional): Veces que se recorren los datos. Defaults to 1.
+        tam_lote (int, optional): Transiciones de cada actualización. Defaults to 1024.
+        verbose (bool, optional): Flag para mostrar el progreso en los bloques. Defaults to False.
+
+    Returns:
+        list[TablaQ]: Una tabla por configuración, en el mismo orden.
+    '''
+    if isinstance(filenames, str):
+        filenames = [filenames]
+    cant = len(configuraciones)
+    alphas = np.array([alpha for alpha, _ in configuraciones])[:, None]
+    gammas = np.array([gamma for _, gamma in configuraciones])[:, None]
+    configuracion = np.arange(cant)[:, None]
+    valores = np.zeros((cant, 1, 7, 2))
+    filas_usadas = 1
+
+    bloques = (bloque for _ in range(pasadas) for filename in filenames for bloque in leer_trayectorias(filename))
+    for bloque in tqdm(bloques, disable=not verbose):
+        filas_usadas = max(filas_usadas, int(bloque['fila'].max()) + 1, int(bloque['fila_sig'].max()) + 1)
+        if filas_usadas > valores.shape[1]:
+            nuevas = max(filas_usadas, 2 * valores.shape[1]) - valores.shape[1]
+            valores = np.concatenate([valores, np.zeros((cant, nuevas, 7, 2))], axis=1)
+        q = valores.reshape(cant, -1)
+
+        indices = (bloque['fila'].astype(np.int64) * 7 + bloque['dados']) * 2 + bloque['accion']
+        indices_sig = (bloque['fila_sig'].astype(np.int64) * 7 + bloque['dados_sig']) * 2
+        recompensas = bloque['recompensa'].astype(np.float64)
+        for inicio in range(0, len(indices), tam_lote):
+            lote = slice(inicio, inicio + tam_lote)
+            q_sig = np.maximum(q[:, indices_sig[lote]], q[:, indices_sig[lote] + 1])
+            objetivos = recompensas[lote] + gammas * q_sig
+
+            # Los pares repetidos se juntan igual en todas las configuraciones:
+            # se acercan al objetivo promedio una fracción 1 - (1 - alpha)^c.
+            usados, inversa, cuentas = np.unique(indices[lote], return_inverse=True, return_counts=True)
+            sumas = np.bincount((configuracion * len(usados) + inversa).reshape(-1), weights=objetivos.reshape(-1),
+                                minlength=cant * len(usados)).reshape(cant, -1)
+            q[:, usados] += (1 - (1 - alphas) ** cuentas) * (sumas / cuentas - q[:, usados])
+
+    return [TablaQ(valores=valores[i, :filas_usadas].copy()) for i in range(cant)]
+
+
+def main(filename, pasos, ambientes, politica_filename, epsilon, semilla):
+    politica = None
+    if politica_filename is not None:
+        politica = PoliticaTabla.desde_jugador(cargar_jugador(politica_filename))
+    transiciones = grabar_trayectorias(filename, pasos, ambientes, politica, epsilon, semilla, verbose=True)
+    print(f'{transiciones} transiciones grabadas en {filename}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Grabar trayectorias de 'Diez Mil' para entrenar Q-learning sin simular.")
+
+    # Agregar argumentos
+    parser.add_argument('filename', type=str, help='Archivo de trayectorias a generar')
+    parser.add_argument('-n', '--pasos', type=int, default=10_000_000, help='Transiciones a grabar (default: 10000000)')
+    parser.add_argument('-k', '--ambientes', type=int, default=1024, help='Ambientes simulados a la vez (default: 1024)')
+    parser.add_argument('-f', '--politica_filename', type=str, default=None, help='Política con la que se juega (por defecto, al azar)')
+    parser.add_argument('-e', '--epsilon', type=float, default=0.0, help='Probabilidad de jugar al azar en lugar de seguir la política (default: 0.0)')
+    parser.add_argument('-s', '--semilla', type=int, default=None, help='Semilla para que la grabación sea reproducible')
+
+    # Parsear los argumentos
+    args = parser.parse_args()
+
+    # Llamar a la función principal con los argumentos proporcionados
+    main(args.filename, args.pasos, args.ambientes, args.politica_filename, args.epsilon, args.semilla)
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from trayectorias import GrabadorTrayectorias, leer_trayectorias, entrenar_offline, COLUMNAS
+
+
+class TestTrayectorias(unittest.TestCase):
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directorio.name, 'trayectorias.bin')
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def test_ida_y_vuelta_por_columnas(self):
+        rng = np.random.default_rng(0)
+        lotes = []
+        with GrabadorTrayectorias(self.filename, tam_bloque=10) as grabador:
+            for _ in range(7):
+                n = 4
+                lote = (rng.integers(1, 7, n), rng.integers(0, 40, n) * 50, rng.integers(0, 2, n),
+                        rng.normal(size=n).astype(np.float32), rng.integers(1, 7, n), rng.integers(0, 40, n) * 50,
+                        rng.integers(0, 2, n))
+                grabador.agregar(*lote)
+                lotes.append(lote)
+        self.assertEqual(grabador.transiciones, 28)
+
+        bloques = list(leer_trayectorias(self.filename))
+        # Se escribe un bloque cada vez que se juntan al menos 10 transiciones, y el resto al cerrar.
+        self.assertEqual([len(bloque['dados']) for bloque in bloques], [12, 12, 4])
+        for i, (nombre, dtype) in enumerate(COLUMNAS):
+            leida = np.concatenate([bloque[nombre] for bloque in bloques])
+            self.assertEqual(leida.dtype, np.dtype(dtype))
+            esperada = np.concatenate([lote[i] for lote in lotes])
+            if nombre in ('fila', 'fila_sig'):
+                esperada = esperada // 50
+            np.testing.assert_array_equal(leida, esperada)
+
+    def test_rechaza_otros_archivos(self):
+        with open(self.filename, 'wb') as archivo:
+            archivo.write(b'DIEZMIL\x01')
+        with self.assertRaises(ValueError):
+            list(leer_trayectorias(self.filename))
+
+    def test_una_pasada_offline(self):
+        alpha, gamma = 0.5, 0.9
+        with GrabadorTrayectorias(self.filename) as grabador:
+            # (dados, puntos, acción, recompensa, dados_sig, puntos_sig, terminado)
+            grabador.agregar([3, 3], [100, 100], [1, 1], [1.0, 1.0], [2, 2], [150, 150], [0, 0])
+            grabador.agregar([2], [150], [0], [-1.0], [6], [0], [0])
+            grabador.agregar([6], [0], [0], [5.0], [6], [0], [1])
+            grabador.agregar([3], [100], [1], [0.0], [2], [150], [0])
+
+        tabla, = entrenar_offline(self.filename, [(alpha, gamma)], tam_lote=2)
+        # Lotes de 2: [(3,100,T), (3,100,T)], [(2,150,P), (6,0,P)], [(3,100,T)].
+        q = {}
+        # Primer lote: el par repetido se acerca dos veces al objetivo 1 desde 0.
+        q[(3, 100, 1)] = alpha * 1.0
+        q[(3, 100, 1)] += alpha * (1.0 - q[(3, 100, 1)])
+        # Segundo lote: (6,0,P) termina el episodio y no suma el valor del estado siguiente.
+        q[(2, 150, 0)] = alpha * (-1.0 + gamma * 0.0)
+        q[(6, 0, 0)] = alpha * 5.0
+        # Tercer lote: el estado siguiente (2, 150) ya vale max(q[(2,150,0)], 0) = 0.
+        q[(3, 100, 1)] += alpha * (0.0 + gamma * max(q[(2, 150, 0)], 0.0) - q[(3, 100, 1)])
+
+        self.assertEqual(tabla.filas_usadas, 150 // 50 + 1)
+        esperada = np.zeros_like(tabla.valores)
+        for (dados, puntos, accion), valor in q.items():
+            esperada[puntos // 50, dados, accion] = valor
+        np.testing.assert_allclose(tabla.valores, esperada)
+
+    def test_terminal_suma_el_siguiente_como_online(self):
+        alpha, gamma = 0.5, 0.9
+        with GrabadorTrayectorias(self.filename) as grabador:
+            grabador.agregar([4], [50], [0], [2.0], [5], [0], [0])
+            grabador.agregar([1], [0], [1], [0.0], [4], [50], [0])
+            # Al terminar, el estado siguiente es el inicial de la partida nueva.
+            grabador.agregar([4], [50], [0], [10.0], [4], [50], [1])
+
+        tabla, = entrenar_offline(self.filename, [(alpha, gamma)], tam_lote=1)
+        q_plantarse = alpha * 2.0
+        q_tirar = alpha * gamma * q_plantarse
+        # La transición terminal también suma gamma por el valor del estado siguiente.
+        q_plantarse += alpha * (10.0 + gamma * q_plantarse - q_plantarse)
+        self.assertAlmostEqual(tabla.valores[1, 4, 0], q_plantarse)
+        self.assertAlmostEqual(tabla.valores[0, 1, 1], q_tirar)
+
+if __name__ == '__main__':
+    unittest.main()
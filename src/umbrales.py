@@ -0,0 +1,165 @@
+import json
+import argparse
+import numpy as np
+from jugador import Jugador
+from utils import puntaje_y_no_usados, JUGADA_PLANTARSE, JUGADA_TIRAR
+from simulador import PASO_PUNTOS
+from qlearning import JugadorEntrenado
+
+
+def compilar_tramos(valores: np.ndarray) -> list[list[tuple[int, int]]]:
+    '''
+    Comprime la política greedy de una tabla de Q-values (filas, 7, 2) en
+    tramos: para cada cantidad de dados, la lista de (puntos desde los que
+    vale, jugada). Es exacta: ante un empate se planta, igual que
+    JugadorEntrenado.
+    '''
+    tirar = valores[:, :, 1] > valores[:, :, 0]
+    tramos = []
+    for dados in range(7):
+        columna = tirar[:, dados]
+        cambios = np.flatnonzero(np.diff(columna)) + 1
+        tramos.append([(int(fila) * PASO_PUNTOS, JUGADA_TIRAR if columna[fila] else JUGADA_PLANTARSE)
+                       for fila in np.concatenate([[0], cambios])])
+    return tramos
+
+
+def compilar_umbrales(valores: np.ndarray, visitados: np.ndarray | None = None,
+                      valor_inicial: float = 0.0) -> tuple[np.ndarray, list[tuple]]:
+    '''
+    Aproxima la política greedy de una tabla de Q-values por un umbral por
+    cantidad de dados: se tira si los puntos del turno son menos que el umbral.
+    Solo se miran los estados visitados; para cada cantidad de dados se elige
+    el umbral que menos estados contradice.
+
+    Args:
+        valores (np.ndarray): Q-values con forma (filas, 7, 2), o (totales, filas, 7, 2)
+            si dependen del puntaje total.
+        visitados (np.ndarray, optional): Estados visitados, con la forma de valores sin el
+            último eje (por ejemplo, AgenteQLearning.visitados). Si es None, se toman como
+            visitados los estados con algún Q-value distinto de valor_inicial.
+        valor_inicial (float, optional): Q-value de los estados sin visitar (el q_inicial
+            del entrenamiento). Defaults to 0.0.
+
+    Returns:
+        tuple[np.ndarray, list[tuple]]: Los umbrales en puntos, con forma (7,) o
+            (totales, 7), y los estados en los que la tabla no es monótona y el
+            umbral decide distinto: (dados, puntos_turno, jugada de la tabla),
+            con el puntaje total adelante si la tabla lo tiene.
+    '''
+    if valores.ndim == 4:
+        umbrales, no_monotonos = [], []
+        for fila_total, valores_total in enumerate(valores):
+            visitados_total = visitados[fila_total] if visitados is not None else None
+            umbrales_total, no_monotonos_total = compilar_umbrales(valores_total, visitados_total, valor_inicial)
+            umbrales.append(umbrales_total)
+            no_monotonos += [(fila_total * PASO_PUNTOS,) + estado for estado in no_monotonos_total]
+        return np.array(umbrales), no_monotonos
+
+    tirar = valores[:, :, 1] > valores[:, :, 0]
+    visitado = visitados if visitados is not None else (valores != valor_inicial).any(axis=2)
+    umbrales = np.zeros(7, dtype=np.int64)
+    no_monotonos = []
+    for dados in range(7):
+        filas = np.flatnonzero(visitado[:, dados])
+        if len(filas) == 0:
+            continue
+        decisiones = tirar[filas, dados]
+        # errores[k]: estados que contradice el umbral en filas[k] (con k = len, después del último).
+        plantarse_antes = np.concatenate([[0], np.cumsum(~decisiones)])
+        tirar_despues = np.concatenate([np.cumsum(decisiones[::-1])[::-1], [0]])
+        k = int(np.argmin(plantarse_antes + tirar_despues))
+        fila_umbral = filas[k] if k < len(filas) else filas[-1] + 1
+        umbrales[dados] = fila_umbral * PASO_PUNTOS
+        for fila, decision in zip(filas, decisiones):
+            if decision != (fila < fila_umbral):
+                no_monotonos.append((dados, int(fila) * PASO_PUNTOS, JUGADA_TIRAR if decision else JUGADA_PLANTARSE))
+    return umbrales, no_monotonos
+
+
+def guardar_umbrales(umbrales: np.ndarray, filename: str):
+    '''
+    Guarda los umbrales (en puntos) en un JSON chico.
+    '''
+    with open(filename, 'w') as jsonfile:
+        json.dump({'umbrales': np.asarray(umbrales).tolist()}, jsonfile)
+
+
+def leer_umbrales(filename: str) -> np.ndarray:
+    with open(filename, 'r') as jsonfile:
+        return np.array(json.load(jsonfile)['umbrales'], dtype=np.int64)
+
+
+class JugadorUmbral(Jugador):
+    def __init__(self, nombre: str, umbrales):
+        '''
+        Jugador que tira mientras los puntos del turno estén por debajo del
+        umbral de la cantidad de dados que le quedan: una sola comparación de
+        enteros por decisión.
+
+        Args:
+            nombre (str): Nombre del jugador.
+            umbrales: Umbrales en puntos (forma (7,) o (totales, 7)), o el archivo de guardar_umbrales.
+        '''
+
+        self.nombre = nombre
+        if isinstance(umbrales, str):
+            umbrales = leer_umbrales(umbrales)
+        self.umbrales = np.asarray(umbrales, dtype=np.int64)
+        self.con_total = self.umbrales.ndim == 2
+        self._umbrales = self.umbrales.tolist()
+
+    def jugar(self, puntaje_total: int, puntaje_turno: int, dados: list[int],
+              verbose: bool = False) -> tuple[int, list[int]]:
+        nuevos_puntos, no_usados = puntaje_y_no_usados(dados)
+        return self.jugar_con_puntaje(puntaje_total, puntaje_turno, dados, nuevos_puntos, no_usados)
+
+    def jugar_con_puntaje(self, puntaje_total: int, puntaje_turno: int, dados: list[int],
+                          nuevos_puntos: int, no_usados: list[int]) -> tuple[int, list[int]]:
+        umbrales = self._umbrales
+        if self.con_total:
+            umbrales = umbrales[min(puntaje_total // PASO_PUNTOS, len(umbrales) - 1)]
+        if puntaje_turno + nuevos_puntos < umbrales[len(no_usados)]:
+            return (JUGADA_TIRAR, no_usados)
+        return (JUGADA_PLANTARSE, [])
+
+
+def _imprimir_tramos(tramos: list[list[tuple[int, int]]], sangria: str = '') -> None:
+    for dados, tramos_dados in enumerate(tramos):
+        texto = ', '.join(f"{puntos}+: {'T' if jugada == JUGADA_TIRAR else 'P'}" for puntos, jugada in tramos_dados)
+        print(f'{sangria}{dados} dados: {texto}')
+
+
+def main(politica_filename, salida_filename, tramos=False, q_inicial=0.0):
+    valores = JugadorEntrenado('qlearning', politica_filename).a_arreglo()
+    umbrales, no_monotonos = compilar_umbrales(valores, valor_inicial=q_inicial)
+    print(f'Umbrales por cantidad de dados: {umbrales.tolist()}')
+    print(f'Estados visitados que no respetan el umbral: {len(no_monotonos)}')
+    for estado in no_monotonos:
+        print(f'  {estado}')
+    if tramos:
+        # La política exacta, sin aproximar: tirar (T) o plantarse (P) desde esos puntos del turno.
+        if valores.ndim == 4:
+            for fila_total, valores_total in enumerate(valores):
+                print(f'Puntaje total {fila_total * PASO_PUNTOS}:')
+                _imprimir_tramos(compilar_tramos(valores_total), '  ')
+        else:
+            _imprimir_tramos(compilar_tramos(valores))
+    if salida_filename is not None:
+        guardar_umbrales(umbrales, salida_filename)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compilar una política entrenada a un umbral de puntos por cantidad de dados.")
+
+    # Agregar argumentos
+    parser.add_argument('politica_filename', type=str, help='Archivo con la política entrenada (JSON o binario)')
+    parser.add_argument('-s', '--salida_filename', type=str, default=None, help='Archivo JSON donde guardar los umbrales')
+    parser.add_argument('-t', '--tramos', action='store_true', help='Imprimir también la política exacta en tramos de puntos por cantidad de dados')
+    parser.add_argument('--q_inicial', type=float, default=0.0, help='Q-value inicial del entrenamiento: los estados que lo conservan se toman como no visitados')
+
+    # Parsear los argumentos
+    args = parser.parse_args()
+
+    # Llamar a la función principal con los argumentos proporcionados
+    main(args.politica_filename, args.salida_filename, args.tramos, args.q_inicial)
@@ -1,3 +1,6 @@
+from functools import lru_cache
+from itertools import combinations_with_replacement
+
 PUNTAJE_ESCALERA: int = 3000
 PUNTAJE_3_PARES: int = 1500
 PUNTAJE_6_IGUALES: int = 10000
@@ -10,12 +13,14 @@ JUGADAS_STR = {
     JUGADA_TIRAR: "Tirar",
 }
 
-def puntaje_y_no_usados(ds: list[int]) -> tuple[int, list[int]]:
+def calcular_puntaje_y_no_usados(ds: list[int]) -> tuple[int, list[int]]:
     ''' Dada ds, una lista de enteros del 1 al 6 (dados), devuelve una tupla
         con el puntaje de los dados y los dados no usados (en orden).
         Precondición: len(ds)>0
         Ejemplo: para [2,1,3,1,4,5], devuelve (250, [2,3,4]) porque 100+100+50
         y no se usaron los dados 2, 3, 4.
+        Es el cálculo de referencia con el que se arma TABLA_PUNTAJES; en los
+        caminos calientes usar puntaje_y_no_usados.
     '''
     # Dejo en cants las veces que salió cada número.
     cants: dict[int, int] = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0, 6: 0}
@@ -50,6 +55,133 @@ def puntaje_y_no_usados(ds: list[int]) -> tuple[int, list[int]]:
     return (puntaje, sorted(no_usados))
 
 
+# Tabla de puntajes precalculada. Cada multiconjunto de dados se empaqueta en
+# un entero con la cantidad de veces que salió cada cara en 3 bits (de 0 a 6),
+# así que la clave de una tirada es la suma de los pesos de sus dados.
+PESOS_CARA: dict[int, int] = {cara: 1 << (3 * (cara - 1)) for cara in range(1, 7)}
+
+
+def empaquetar(ds: list[int]) -> int:
+    ''' Devuelve la clave empaquetada del vector de conteos de ds.
+        Ejemplo: [1, 1, 5] --> 2 * PESOS_CARA[1] + PESOS_CARA[5]
+    '''
+    return sum(map(PESOS_CARA.__getitem__, ds))
+
+
+def _armar_tabla_puntajes() -> dict[int, tuple[int, tuple[int, ...]]]:
+    tabla: dict[int, tuple[int, tuple[int, ...]]] = {}
+    for n in range(7):
+        for ds in combinations_with_replacement(range(1, 7), n):
+            puntaje, no_usados = calcular_puntaje_y_no_usados(list(ds))
+            tabla[empaquetar(ds)] = (puntaje, tuple(no_usados))
+    return tabla
+
+
+TABLA_PUNTAJES: dict[int, tuple[int, tuple[int, ...]]] = _armar_tabla_puntajes()
+
+
+def puntaje_y_no_usados(ds: list[int]) -> tuple[int, list[int]]:
+    ''' Dada ds, una lista de enteros del 1 al 6 (dados), devuelve una tupla
+        con el puntaje de los dados y los dados no usados (en orden).
+        Precondición: len(ds)>0
+        Ejemplo: para [2,1,3,1,4,5], devuelve (250, [2,3,4]) porque 100+100+50
+        y no se usaron los dados 2, 3, 4.
+        El resultado sale de TABLA_PUNTAJES, que tiene precalculados todos los
+        multiconjuntos de hasta 6 dados.
+    '''
+    puntaje, no_usados = TABLA_PUNTAJES[sum(map(PESOS_CARA.__getitem__, ds))]
+    return (puntaje, list(no_usados))
+
+
+def puntaje_por_conteo(clave: int) -> tuple[int, list[int]]:
+    ''' Igual que puntaje_y_no_usados, pero recibe directamente la clave
+        empaquetada (ver empaquetar).
+    '''
+    puntaje, no_usados = TABLA_PUNTAJES[clave]
+    return (puntaje, list(no_usados))
+
+
+def indice_tirada(ds: list[int]) -> int:
+    ''' Devuelve el índice de la tirada ordenada ds entre las 6**len(ds)
+        tiradas posibles, leyendo los dados como dígitos en base 6.
+        Ejemplo: [1, 1] --> 0, [2, 1] --> 1, [1, 2] --> 6, [6, 6] --> 35
+    '''
+    indice: int = 0
+    for d in reversed(ds):
+        indice = indice * 6 + (d - 1)
+    return indice
+
+
+@lru_cache(maxsize=None)
+def claves_por_indice(n: int) -> tuple[int, ...]:
+    ''' Devuelve, para cada índice de tirada de n dados, la clave empaquetada
+        de esa tirada. Se arma la primera vez que se pide.
+    '''
+    claves: list[int] = [0]
+    for _ in range(n):
+        claves = [clave + PESOS_CARA[cara] for cara in range(1, 7) for clave in claves]
+    return tuple(claves)
+
+
+def puntaje_por_indice(n: int, indice: int) -> tuple[int, list[int]]:
+    ''' Igual que puntaje_y_no_usados, pero recibe la cantidad de dados y el
+        índice de la tirada (ver indice_tirada).
+    '''
+    puntaje, no_usados = TABLA_PUNTAJES[claves_por_indice(n)[indice]]
+    return (puntaje, list(no_usados))
+
+
+@lru_cache(maxsize=None)
+def distribucion_tirada(n: int) -> tuple[tuple[int, int, float], ...]:
+    ''' Devuelve la distribución exacta de tirar n dados, como tuplas
+        (puntaje, cantidad de dados no usados, probabilidad), contando las
+        6**n tiradas posibles. Incluye la tirada que no suma (puntaje 0).
+    '''
+    cantidades: dict[tuple[int, int], int] = {}
+    for clave in claves_por_indice(n):
+        puntaje, no_usados = TABLA_PUNTAJES[clave]
+        resultado = (puntaje, len(no_usados))
+        cantidades[resultado] = cantidades.get(resultado, 0) + 1
+    return tuple((puntaje, restantes, cantidad / 6 ** n)
+                 for (puntaje, restantes), cantidad in sorted(cantidades.items()))
+
+
+class MuestreadorAlias:
+    def __init__(self, resultados: list[tuple]):
+        ''' Muestreador de una distribución discreta con el método de alias de
+            Vose: con un solo número uniforme elige en O(1) uno de los
+            resultados. resultados es una lista de tuplas cuyo último elemento
+            es la probabilidad; se devuelve la tupla sin ella.
+        '''
+        n: int = len(resultados)
+        self.valores: list[tuple] = [tuple(r[:-1]) for r in resultados]
+        self.umbral: list[float] = [1.0] * n
+        self.alias: list[int] = list(range(n))
+
+        escaladas: list[float] = [r[-1] * n for r in resultados]
+        chicas: list[int] = [i for i, p in enumerate(escaladas) if p < 1]
+        grandes: list[int] = [i for i, p in enumerate(escaladas) if p >= 1]
+        while chicas and grandes:
+            chica, grande = chicas.pop(), grandes.pop()
+            self.umbral[chica] = escaladas[chica]
+            self.alias[chica] = grande
+            escaladas[grande] -= 1 - escaladas[chica]
+            if escaladas[grande] < 1:
+                chicas.append(grande)
+            else:
+                grandes.append(grande)
+        # Lo que queda tiene probabilidad 1 salvo errores de redondeo.
+
+    def muestrear(self, u: float) -> tuple:
+        ''' Devuelve un resultado a partir de u, uniforme en [0, 1).
+        '''
+        u *= len(self.valores)
+        i: int = int(u)
+        if u - i < self.umbral[i]:
+            return self.valores[i]
+        return self.valores[self.alias[i]]
+
+
 def separar(xs: list[int], ys: list[int]) -> list[int]:
     ''' Devuelve la lista resultante de eliminar la primera instancia en xs 
         de cada elemento de ys.
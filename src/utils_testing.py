@@ -1,6 +1,17 @@
 import unittest
+import numpy as np
+from itertools import product
+from fuente_dados import FuenteDados
 from utils import (
     puntaje_y_no_usados,
+    calcular_puntaje_y_no_usados,
+    puntaje_por_conteo,
+    puntaje_por_indice,
+    empaquetar,
+    indice_tirada,
+    TABLA_PUNTAJES,
+    distribucion_tirada,
+    MuestreadorAlias,
     separar,
     PUNTAJE_ESCALERA,
     PUNTAJE_3_PARES,
@@ -89,6 +100,84 @@ class TestPuntajeYNoUsados(unittest.TestCase):
         self.assertEqual(puntaje_y_no_usados([5]), (50, []))
         self.assertEqual(puntaje_y_no_usados([6]), (0, [6]))
 
+class TestTablaPuntajes(unittest.TestCase):
+    def test_cantidad_de_multiconjuntos(self):
+        # 1 + 6 + 21 + 56 + 126 + 252 + 462 multiconjuntos de 0 a 6 dados.
+        self.assertEqual(len(TABLA_PUNTAJES), 924)
+
+    def test_exhaustivo_contra_referencia(self):
+        for n in range(1, 7):
+            for ds in product(range(1, 7), repeat=n):
+                ds = list(ds)
+                esperado = calcular_puntaje_y_no_usados(ds)
+                self.assertEqual(puntaje_y_no_usados(ds), esperado)
+                self.assertEqual(puntaje_por_conteo(empaquetar(ds)), esperado)
+                self.assertEqual(puntaje_por_indice(n, indice_tirada(ds)), esperado)
+
+    def test_separar_no_usados_conserva_el_puntaje(self):
+        # Es lo que permite a JuegoDiezMil no volver a puntuar cuando el jugador
+        # vuelve a tirar justo los dados no usados.
+        for n in range(1, 7):
+            for ds in product(range(1, 7), repeat=n):
+                ds = list(ds)
+                puntaje, no_usados = puntaje_y_no_usados(ds)
+                if puntaje > 0:
+                    self.assertEqual(puntaje_y_no_usados(separar(ds, no_usados)), (puntaje, []))
+
+    def test_no_usados_es_una_lista_nueva(self):
+        (_, no_usados) = puntaje_y_no_usados([2, 3])
+        no_usados.append(4)
+        self.assertEqual(puntaje_y_no_usados([2, 3]), (0, [2, 3]))
+
+    def test_indice_tirada(self):
+        self.assertEqual(indice_tirada([1, 1]), 0)
+        self.assertEqual(indice_tirada([2, 1]), 1)
+        self.assertEqual(indice_tirada([1, 2]), 6)
+        self.assertEqual(indice_tirada([6, 6, 6]), 6 ** 3 - 1)
+
+class TestMuestreadorAlias(unittest.TestCase):
+    def test_reconstruye_distribucion_tirada(self):
+        for n in range(7):
+            distribucion = distribucion_tirada(n)
+            muestreador = MuestreadorAlias(list(distribucion))
+            columnas = len(muestreador.valores)
+            masa = {}
+            for i in range(columnas):
+                propio, otro = muestreador.valores[i], muestreador.valores[muestreador.alias[i]]
+                masa[propio] = masa.get(propio, 0) + muestreador.umbral[i] / columnas
+                masa[otro] = masa.get(otro, 0) + (1 - muestreador.umbral[i]) / columnas
+            for puntaje, restantes, prob in distribucion:
+                self.assertAlmostEqual(masa[(puntaje, restantes)], prob)
+
+    def test_muestrear_extremos(self):
+        # La columna de 'a' queda con umbral 0.5 y alias 'b': 'a' sale solo para u < 0.25.
+        muestreador = MuestreadorAlias([('a', 0.25), ('b', 0.75)])
+        self.assertEqual(muestreador.muestrear(0.0), ('a',))
+        self.assertEqual(muestreador.muestrear(0.2499), ('a',))
+        self.assertEqual(muestreador.muestrear(0.2501), ('b',))
+        self.assertEqual(muestreador.muestrear(0.999999), ('b',))
+
+class TestFuenteDados(unittest.TestCase):
+    def _secuencia(self, fuente: FuenteDados) -> list:
+        # Con bloques chicos, la secuencia cruza varias recargas.
+        return [fuente.caras(5) for _ in range(20)] + [fuente.moneda() for _ in range(20)] + [fuente.uniforme() for _ in range(20)]
+
+    def test_misma_semilla_misma_secuencia(self):
+        self.assertEqual(self._secuencia(FuenteDados(7, tam_bloque=16)), self._secuencia(FuenteDados(7, tam_bloque=16)))
+        self.assertNotEqual(self._secuencia(FuenteDados(7, tam_bloque=16)), self._secuencia(FuenteDados(8, tam_bloque=16)))
+
+    def test_hijos_reproducibles_e_independientes(self):
+        hijos = FuenteDados(7).hijos(3)
+        otros = FuenteDados(7).hijos(3)
+        self.assertEqual([h.caras(50) for h in hijos], [o.caras(50) for o in otros])
+
+        a, b = (np.array(h.caras(60000)) for h in FuenteDados(7).hijos(2))
+        # Si son independientes, coinciden en 1/6 de las caras y no están correlacionados.
+        self.assertAlmostEqual((a == b).mean(), 1 / 6, delta=0.01)
+        self.assertLess(abs(np.corrcoef(a, b)[0, 1]), 0.02)
+        padre = np.array(FuenteDados(7).caras(60000))
+        self.assertAlmostEqual((a == padre).mean(), 1 / 6, delta=0.01)
+
 class TestSepararDados(unittest.TestCase):
     def test_separar_0_dados(self):
         self.assertEqual(separar([1, 2, 3, 4, 5, 6], []), [1, 2, 3, 4, 5, 6])